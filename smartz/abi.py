@@ -0,0 +1,98 @@
+import hashlib
+
+from smartz.profiling import phase
+from smartz.schema import freeze
+
+
+def function_signatures(abi_array):
+    """
+    Signatures of callable entries of a contract ABI: name(type1,type2) for functions,
+    empty string for the fallback function.
+    """
+    signatures = []
+    for entry in abi_array:
+        kind = entry.get('type', 'function')
+        if kind == 'function':
+            signatures.append('{}({})'.format(
+                entry['name'], ','.join(arg['type'] for arg in entry.get('inputs', ()))
+            ))
+        elif kind == 'fallback':
+            signatures.append('')
+    return signatures
+
+
+def abi_hash(abi_array):
+    """Hash of sorted function signatures, equal for ABIs with the same set of callable functions."""
+    return hashlib.sha256('\n'.join(sorted(function_signatures(abi_array))).encode('utf-8')).hexdigest()
+
+
+def bundle_key(abi_array):
+    """Key of post_construct_bundle() results, None without an ABI."""
+    return abi_hash(abi_array) if abi_array else None
+
+
+@phase('specs')
+def post_construct_bundle(cache, function_specs, dashboard_functions, abi_array):
+    """
+    post_construct() result with function_specs and dashboard_functions narrowed down
+    to the functions present in abi_array.
+
+    function_specs is keyed by function name (the fallback function is ''). Results are frozen and stored
+    in `cache` (smartz.cache.LRUCache) by abi_hash, so repeat calls for the same contract variant are a lookup.
+    Without an ABI full specs are returned.
+    """
+    key = bundle_key(abi_array)
+    bundle = cache.get(key)
+    if bundle is not None:
+        return bundle
+
+    if key is None:
+        names = function_specs
+    else:
+        names = frozenset(signature.partition('(')[0] for signature in function_signatures(abi_array))
+
+    bundle = freeze({
+        'result': 'success',
+        'function_specs': {name: spec for name, spec in function_specs.items() if name in names},
+        'dashboard_functions': [name for name in dashboard_functions if name in names],
+    })
+    cache.put(key, bundle)
+    return bundle
+
+
+def _encode_word(abi_type, value):
+    if abi_type.startswith('uint'):
+        bits = int(abi_type[4:] or 256)
+        if not 0 <= value < 2 ** bits:
+            raise ValueError('{} out of range: {}'.format(abi_type, value))
+        return value.to_bytes(32, 'big')
+    if abi_type == 'bool':
+        return int(bool(value)).to_bytes(32, 'big')
+    if abi_type == 'address':
+        return bytes.fromhex(value[2:] if value.startswith('0x') else value).rjust(32, b'\0')
+    raise ValueError('unsupported static type: {}'.format(abi_type))
+
+
+def encode_args(types, values):
+    """
+    ABI-encodes constructor arguments (to be appended to contract bytecode), returns hex string without 0x.
+
+    Supports uint<N>, bool, address, string and bytes.
+    """
+    if len(types) != len(values):
+        raise ValueError('expected {} values, got {}'.format(len(types), len(values)))
+
+    head = []
+    tail = []
+    tail_offset = 32 * len(types)
+    for abi_type, value in zip(types, values):
+        if abi_type in ('string', 'bytes'):
+            data = value.encode('utf-8') if isinstance(value, str) else bytes(value)
+            head.append(tail_offset.to_bytes(32, 'big'))
+            encoded = len(data).to_bytes(32, 'big') + data + b'\0' * (-len(data) % 32)
+            tail.append(encoded)
+            tail_offset += len(encoded)
+        else:
+            head.append(_encode_word(abi_type, value))
+
+    return b''.join(head + tail).hex()
@@ -0,0 +1,98 @@
+import weakref
+
+from smartz.abi import bundle_key
+from smartz.cache import construct_key
+from smartz.profiling import instrumented_call, uninstrumented
+
+
+# per event loop: {constructor class: (limit, asyncio.Semaphore)}
+_semaphores = weakref.WeakKeyDictionary()
+
+
+def _semaphore(cls):
+    # asyncio is imported by the async methods only, constructors get this mixin in synchronous processes too
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    limits = _semaphores.setdefault(loop, {})
+    limit, semaphore = limits.get(cls, (None, None))
+    if limit != cls.ASYNC_CONCURRENCY:
+        limit = cls.ASYNC_CONCURRENCY
+        semaphore = asyncio.Semaphore(limit)
+        limits[cls] = (limit, semaphore)
+    return semaphore
+
+
+def _render(constructor, fields):
+    """Uncached rendering, executed in the executor (module level, so it can be sent to process pools)."""
+    return constructor.__class__._render.__wrapped__(constructor, fields)
+
+
+def _post_construct(constructor, fields, abi_array):
+    # the call is reported by post_construct_async()
+    return uninstrumented(constructor.__class__.post_construct)(constructor, fields, abi_array)
+
+
+class AsyncConstructMixin:
+    """
+    Adds asyncio counterparts of ConstructorInstance methods which never block the event loop.
+
+    Cheap work is done inline: get_params()/get_version() payloads, validation and cache hits.
+    Rendering and building post_construct() bundles run in ASYNC_EXECUTOR (None is the loop's default
+    executor), at most ASYNC_CONCURRENCY calls per constructor class and event loop at a time.
+    Cancelling the awaiting task drops calls which haven't started yet in the executor.
+    construct_async() and post_construct_async() are reported to smartz.profiling hooks (and so to
+    smartz.metrics) as construct() and post_construct() calls.
+    """
+
+    # concurrent.futures executor for rendering, e.g. a process pool shared by all constructors
+    ASYNC_EXECUTOR = None
+
+    # maximum number of calls of a constructor class running in ASYNC_EXECUTOR at once
+    ASYNC_CONCURRENCY = 8
+
+    async def get_version_async(self):
+        return self.get_version()
+
+    async def get_params_async(self):
+        return self.get_params()
+
+    async def validate_async(self, fields):
+        return self.validate(fields)
+
+    @instrumented_call
+    async def construct_async(self, fields):
+        result = self.validate(fields)
+        if result['result'] != 'success':
+            return result
+
+        cls = self.__class__
+        key = construct_key(self, fields)
+        if key is not None:
+            cached = cls.CACHE.get(key)
+            if cached is not None:
+                return dict(cached)
+
+        result = await self._offload(_render, fields)
+        if key is not None and result.get('result') == 'success':
+            cls.CACHE.put(key, result)
+            result = dict(result)
+        return result
+
+    @instrumented_call
+    async def post_construct_async(self, fields, abi_array):
+        cache = self.__class__.POST_CONSTRUCT_CACHE
+        key = bundle_key(abi_array)
+        bundle = cache.get(key)
+        if bundle is None:
+            bundle = await self._offload(_post_construct, fields, abi_array)
+            # the executor may be a process pool with its own caches
+            cache.put(key, bundle)
+        return bundle
+
+    async def _offload(self, func, *args):
+        import asyncio
+
+        async with _semaphore(self.__class__):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.__class__.ASYNC_EXECUTOR, func, self, *args)
@@ -0,0 +1,162 @@
+"""
+Batch construction.
+
+    python -m smartz.batch <constructor> [input.jsonl] [--workers N] [--chunk-size 16]
+
+reads `fields` objects as JSON lines from the input file (stdin by default) and writes
+{"construct": <result>, "post_construct": <result>} JSON lines to stdout, one for every input line in input order.
+post_construct is present for successful constructs only and is computed without an ABI;
+blank and invalid lines get error results.
+"""
+
+import collections
+import functools
+import itertools
+import json
+import os
+import sys
+
+
+def safe_construct(constructor, fields):
+    """construct() which reports exceptions as an error result instead of raising."""
+    try:
+        return constructor.construct(fields)
+    except Exception as exc:
+        return {
+            "result": "error",
+            "errors": {'': '{}: {}'.format(exc.__class__.__name__, exc)}
+        }
+
+
+def _construct_chunk(constructor, chunk):
+    return [safe_construct(constructor, fields) for fields in chunk]
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class BatchConstructMixin:
+    """
+    Adds construct_many() to a ConstructorInstance subclass.
+    """
+
+    # batches smaller than this are constructed in the calling process
+    BATCH_INLINE_THRESHOLD = 64
+
+    # number of fields sent to a worker process at once
+    BATCH_CHUNK_SIZE = 16
+
+    def construct_many(self, iterable_of_fields, executor=None, max_workers=None):
+        """
+        Constructs every fields object of iterable_of_fields, returns list of results in the same order.
+
+        Failing items (including unexpected exceptions) produce error results and don't fail the batch.
+        Large batches are spread over `executor` (a concurrent.futures executor, preferably a process pool
+        which is reused between calls) or over a temporary ProcessPoolExecutor(max_workers).
+        """
+        iterator = iter(iterable_of_fields)
+        head = list(itertools.islice(iterator, self.BATCH_INLINE_THRESHOLD))
+        if len(head) < self.BATCH_INLINE_THRESHOLD:
+            return _construct_chunk(self, head)
+
+        chunks = _chunks(itertools.chain(head, iterator), self.BATCH_CHUNK_SIZE)
+        work = functools.partial(_construct_chunk, self)
+
+        if executor is not None:
+            return list(itertools.chain.from_iterable(executor.map(work, chunks)))
+
+        # imported here: constructors get this mixin, but most of their users never build a pool
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers) as pool:
+            return list(itertools.chain.from_iterable(pool.map(work, chunks)))
+
+
+def _process_lines(name, lines):
+    """Turns JSON lines of fields into JSON lines of results, executed in worker processes."""
+    from smartz.registry import registry
+
+    constructor = registry.get(name)
+    return [json.dumps(_process_line(constructor, line), separators=(',', ':')) for line in lines]
+
+
+def _process_line(constructor, line):
+    if not line.strip():
+        # output lines correspond to input lines, blank ones included
+        return {'construct': {"result": "error", "errors": {'': 'empty line'}}}
+
+    try:
+        fields = json.loads(line)
+    except ValueError as exc:
+        return {'construct': {"result": "error", "errors": {'': 'invalid JSON: {}'.format(exc)}}}
+
+    result = safe_construct(constructor, fields)
+    record = {'construct': result}
+    if result.get('result') == 'success':
+        record['post_construct'] = constructor.post_construct(fields, None)
+    return record
+
+
+def run(name, lines, output, workers=None, chunk_size=BatchConstructMixin.BATCH_CHUNK_SIZE):
+    """
+    Writes results for JSON `lines` of fields to `output` (a text file), in order.
+
+    Chunks of lines are processed by `workers` processes (0 means in this process); at most a few chunks
+    per worker are in flight, so memory use doesn't depend on the input size.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from smartz.registry import registry
+
+    chunks = _chunks(lines, chunk_size)
+    registry.warm_up([name])
+
+    if workers == 0:
+        for chunk in chunks:
+            _write(output, _process_lines(name, chunk))
+        return
+
+    workers = workers or os.cpu_count() or 1
+    pending = collections.deque()
+    with ProcessPoolExecutor(workers) as pool:
+        for chunk in chunks:
+            pending.append(pool.submit(_process_lines, name, chunk))
+            if len(pending) >= 4 * workers:
+                _write(output, pending.popleft().result())
+
+        while pending:
+            _write(output, pending.popleft().result())
+
+
+def _write(output, lines):
+    output.write('\n'.join(lines))
+    output.write('\n')
+
+
+def main(argv=None):
+    import argparse
+
+    from smartz.registry import registry
+
+    parser = argparse.ArgumentParser(description='Construct contracts for JSON lines of fields')
+    parser.add_argument('constructor', choices=registry.names())
+    parser.add_argument('input', nargs='?', default='-', help='JSON lines file (default: stdin)')
+    parser.add_argument('--workers', type=int, help='worker processes (default: number of CPUs, 0: no workers)')
+    parser.add_argument('--chunk-size', type=int, default=BatchConstructMixin.BATCH_CHUNK_SIZE,
+                        help='lines sent to a worker at once')
+    args = parser.parse_args(argv)
+
+    if args.input == '-':
+        run(args.constructor, sys.stdin, sys.stdout, args.workers, args.chunk_size)
+    else:
+        with open(args.input, encoding='utf-8') as fh:
+            run(args.constructor, fh, sys.stdout, args.workers, args.chunk_size)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
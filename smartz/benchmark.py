@@ -0,0 +1,456 @@
+"""
+Benchmarks of the constructor lifecycle: get_params, construct and post_construct for every dividend token
+variant (is_mintable x capped x is_pausable x premint) and for multisig wallets with 1..MAX_OWNERS owners,
+plus import time and resident memory of the constructor modules (measured in fresh processes).
+
+    python -m smartz.benchmark [--iterations 200] [--rounds 9] [--output results.json]
+                               [--baseline smartz/benchmark_baseline.json] [--tolerance 0.1] [--noise-factor 1.5]
+                               [--slack-us 0.5] [--update-baseline]
+
+Field sets are generated randomly from the constructors' own schemas. post_construct is called with the ABI
+of the contract constructed for the same fields and a cleared bundle cache, i.e. on the cache miss path.
+
+Every case is timed in several rounds interleaved with the other cases, each next to a calibration workload
+which compensates for machine speed. Results (p50 latency relative to the calibration: the median of rounds
+and their relative spread, throughput, p99 latency, peak allocation) are written as JSON and compared with
+the baseline; the exit code is 1 if any case got slower than the allowance, which is the larger of the tolerance
+and noise-factor times the spread of the case. Refresh the baseline with --update-baseline after intended
+performance changes.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from smartz import dividend_token_constructor, multisig_wallet_constructor
+from smartz.validator import resolve_ref
+
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+
+DEFAULT_OWNER_COUNTS = (1, 2, 3, 5, 10, 25, 50, 100, 175, 250)
+
+_PATTERN_TOKEN_RE = re.compile(r'(\[[^\]]+\]|\\.|[^\[\\])(\+|\*|\{\d+(?:,\d+)?\})?')
+
+_COMMENT_RE = re.compile(r'//[^\n]*|/\*.*?\*/', re.S)
+_CONTRACT_RE = re.compile(r'\b(?:contract|interface|library)\s+(\w+)')
+_FUNCTION_RE = re.compile(r'\bfunction\s*(\w*)\s*\(([^)]*)\)([^{;]*)')
+_STATE_GETTER_RE = re.compile(r'^\s*(?:mapping\s*\(\s*(\w+)\s*=>[^;]*\)|([\w\[\]]+))\s+public\s+(?:constant\s+)?(\w+)',
+                              re.M)
+
+
+def _char_class(token):
+    if not token.startswith('['):
+        return token[-1]
+
+    chars = []
+    body = token[1:-1]
+    idx = 0
+    while idx < len(body):
+        if idx + 2 < len(body) and body[idx + 1] == '-':
+            chars.extend(chr(code) for code in range(ord(body[idx]), ord(body[idx + 2]) + 1))
+            idx += 3
+        else:
+            chars.append(body[idx])
+            idx += 1
+    return ''.join(chars)
+
+
+def _random_string(schema, rng):
+    """Random string for schemas with simple ^...$ patterns made of char classes and quantifiers."""
+    pattern = schema.get('pattern', '^[a-zA-Z0-9]+$')
+    if not (pattern.startswith('^') and pattern.endswith('$')):
+        raise ValueError('unsupported pattern: {}'.format(pattern))
+
+    tokens = []
+    for token, quantifier in _PATTERN_TOKEN_RE.findall(pattern[1:-1]):
+        if not quantifier:
+            low = high = 1
+        elif quantifier == '+':
+            low, high = 1, None
+        elif quantifier == '*':
+            low, high = 0, None
+        else:
+            bounds = quantifier[1:-1].split(',')
+            low = int(bounds[0])
+            high = int(bounds[-1])
+        tokens.append((_char_class(token), low, high))
+
+    fixed = sum(low for _, low, _ in tokens)
+    length = rng.randint(max(schema.get('minLength', 1), fixed), max(schema.get('maxLength', 32), fixed))
+    extra = length - fixed
+
+    result = []
+    for chars, low, high in tokens:
+        count = low
+        if high is None:
+            count += extra
+            extra = 0
+        result.extend(rng.choice(chars) for _ in range(count))
+    return ''.join(result)
+
+
+def random_value(schema, rng, items_count=None):
+    schema = resolve_ref(schema)
+    kind = schema['type']
+
+    if kind == 'integer':
+        return rng.randint(schema.get('minimum', 0), schema.get('maximum', 2 ** 32))
+    if kind == 'boolean':
+        return rng.random() < 0.5
+    if kind == 'string':
+        return _random_string(schema, rng)
+    if kind == 'array':
+        if items_count is None:
+            items_count = rng.randint(schema.get('minItems', 0), schema.get('maxItems', 10))
+        return [random_value(schema['items'], rng) for _ in range(items_count)]
+
+    raise ValueError('unsupported schema type: {}'.format(kind))
+
+
+def random_fields(constructor, rng, overrides=None, omit=(), items_count=None, attempts=1000):
+    """
+    Random fields valid for constructor (checked by constructor.validate), generated from its schema.
+
+    overrides: fixed values, omit: optional fields to leave out, items_count: length of generated arrays.
+    """
+    properties = constructor.get_params()['schema']['properties']
+    for _ in range(attempts):
+        fields = {}
+        for name, schema in properties.items():
+            if name in omit:
+                continue
+            if overrides and name in overrides:
+                fields[name] = overrides[name]
+            else:
+                fields[name] = random_value(schema, rng, items_count)
+
+        if constructor.validate(fields)['result'] == 'success':
+            return fields
+
+    raise RuntimeError('failed to generate valid fields for {}'.format(constructor.__class__.__module__))
+
+
+def _abi_type(name):
+    return {'uint': 'uint256', 'int': 'int256'}.get(name, name)
+
+
+def source_abi(source):
+    """
+    Approximate ABI of the contracts in a Solidity source: public and external functions (with input types)
+    and getters of public state variables. Stands in for compiler output, which isn't available here.
+    """
+    source = _COMMENT_RE.sub('', source)
+    contracts = set(_CONTRACT_RE.findall(source))
+
+    entries = {}
+    for name, params, modifiers in _FUNCTION_RE.findall(source):
+        if {'internal', 'private'} & set(modifiers.split()) or name in contracts:
+            continue
+        if not name:
+            entries['()'] = {'type': 'fallback', 'payable': 'payable' in modifiers.split()}
+            continue
+        inputs = [{'type': _abi_type(param.split()[0])} for param in params.split(',') if param.strip()]
+        entries['{}({})'.format(name, ','.join(item['type'] for item in inputs))] = {
+            'type': 'function', 'name': name, 'inputs': inputs,
+        }
+
+    for key_type, value_type, name in _STATE_GETTER_RE.findall(source):
+        if key_type:
+            inputs = [{'type': _abi_type(key_type)}]
+        else:
+            inputs = [{'type': 'uint256'}] if value_type.endswith(']') else []
+        entries.setdefault('{}({})'.format(name, ','.join(item['type'] for item in inputs)), {
+            'type': 'function', 'name': name, 'inputs': inputs, 'constant': True,
+        })
+
+    return [entries[signature] for signature in sorted(entries)]
+
+
+def calibrate(repeat=5):
+    """Time (us) of a fixed pure-Python workload, used to scale baseline numbers to the current machine speed."""
+    def workload():
+        parts = []
+        for idx in range(2000):
+            parts.append('result[{}] = address({});'.format(idx, idx * 7))
+        return '\n'.join(parts)
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        workload()
+        timings.append(time.perf_counter() - started)
+    return round(min(timings) * 1e6, 2)
+
+
+def relative_spread(values):
+    """Interquartile range of values relative to their median."""
+    if len(values) < 2:
+        return 0.0
+    q1, median, q3 = statistics.quantiles(values, n=4)
+    return (q3 - q1) / median
+
+
+def _timed_pass(func, args_list, setup):
+    """Sorted latencies of calls of func over args_list, setup() is called before each call untimed."""
+    latencies = []
+    for args in args_list:
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        func(*args)
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return latencies
+
+
+def _peak_alloc(func, args_list, setup):
+    peak = 0
+    tracemalloc.start()
+    try:
+        for args in args_list[:5]:
+            if setup is not None:
+                setup()
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            func(*args)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def measure(cases, rounds=9):
+    """
+    Times cases, (name, func, args_list, setup called before every call or None) tuples, in `rounds` passes
+    over args_list each. Passes are interleaved round by round, so a slow period of the machine hits one pass
+    of several cases rather than every pass of one case, and each pass is timed next to a calibration.
+
+    Returns {name: stats}: the median of per-pass p50 latencies relative to their calibrations with the spread
+    of those (see relative_spread), throughput and p99 latency of all calls and peak allocation of a single call.
+    """
+    cases = list(cases)
+    for name, func, args_list, setup in cases:
+        # warm-up
+        _timed_pass(func, args_list[:3], setup)
+
+    calibrations = {name: [] for name, _, _, _ in cases}
+    relative_p50s = {name: [] for name, _, _, _ in cases}
+    latencies = {name: [] for name, _, _, _ in cases}
+    for _ in range(rounds):
+        for name, func, args_list, setup in cases:
+            calibration = calibrate(repeat=3)
+            pass_latencies = _timed_pass(func, args_list, setup)
+
+            calibrations[name].append(calibration)
+            relative_p50s[name].append(pass_latencies[len(pass_latencies) // 2] * 1e6 / calibration)
+            latencies[name].extend(pass_latencies)
+
+    results = {}
+    for name, func, args_list, setup in cases:
+        all_latencies = sorted(latencies[name])
+        calibration = statistics.median(calibrations[name])
+        relative_p50 = statistics.median(relative_p50s[name])
+        results[name] = {
+            'calibration_us': calibration,
+            'iterations': len(args_list),
+            'rounds': rounds,
+            'relative_p50': round(relative_p50, 8),
+            'relative_spread': round(relative_spread(relative_p50s[name]), 4),
+            'throughput_per_sec': round(len(all_latencies) / sum(all_latencies), 1),
+            'p50_us': round(relative_p50 * calibration, 2),
+            'p99_us': round(all_latencies[min(len(all_latencies) - 1, int(len(all_latencies) * 0.99))] * 1e6, 2),
+            'peak_alloc_bytes': _peak_alloc(func, args_list, setup),
+        }
+    return results
+
+
+_DIVIDEND_DEFAULTS = {'is_constant_gas_dividends': False, 'is_pull_dividends': False, 'is_packed_storage': False}
+_MULTISIG_DEFAULTS = {'is_packed_storage': False}
+
+
+def _post_construct_args(constructor, fields_list):
+    """post_construct() arguments: fields and the ABI of the contract constructed from them."""
+    return [(fields, source_abi(constructor.construct(fields)['source'])) for (fields,) in fields_list]
+
+
+def dividend_cases(iterations, rng):
+    """Yields (case, func, args_list, setup called before every call or None)."""
+    constructor = dividend_token_constructor.Constructor()
+    yield 'dividend.get_params', constructor.get_params, [()] * iterations, None
+
+    for is_mintable, capped, is_pausable, premint in itertools.product((False, True), repeat=4):
+        omit = [name for name, present in (('max_tokens_count', capped), ('premint', premint)) if not present]
+        omit.append('dividends_gas_budget')
+        # accounting, payout and storage layout options stay at their defaults to keep cases comparable
+        overrides = dict(_DIVIDEND_DEFAULTS, is_mintable=is_mintable, is_pausable=is_pausable)
+        fields_list = [
+            (random_fields(constructor, rng, overrides, omit),) for _ in range(iterations)
+        ]
+        suffix = '[is_mintable={:d},capped={:d},is_pausable={:d},premint={:d}]'.format(
+            is_mintable, capped, is_pausable, premint
+        )
+
+        yield 'dividend.construct' + suffix, constructor.construct, fields_list, None
+        yield 'dividend.post_construct' + suffix, constructor.post_construct, \
+            _post_construct_args(constructor, fields_list), constructor.POST_CONSTRUCT_CACHE.clear
+
+
+def multisig_cases(iterations, rng, owner_counts):
+    """Same as dividend_cases(), multisig wallets with each of owner_counts owners."""
+    constructor = multisig_wallet_constructor.Constructor()
+    yield 'multisig.get_params', constructor.get_params, [()] * iterations, None
+
+    for owners_count in owner_counts:
+        fields_list = []
+        for _ in range(iterations):
+            fields = random_fields(constructor, rng, dict(_MULTISIG_DEFAULTS, signs_count=rng.randint(1, owners_count)),
+                                   items_count=owners_count)
+            fields_list.append((fields,))
+
+        suffix = '[owners={}]'.format(owners_count)
+        yield 'multisig.construct' + suffix, constructor.construct, fields_list, None
+        yield 'multisig.post_construct' + suffix, constructor.post_construct, \
+            _post_construct_args(constructor, fields_list), constructor.POST_CONSTRUCT_CACHE.clear
+
+
+_IMPORT_PROBE = """
+import json, os, resource, time
+
+def rss_kb():
+    try:
+        with open('/proc/self/statm') as fh:
+            return int(fh.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+started = time.perf_counter()
+rss_before = rss_kb()
+from smartz import {module} as module
+imported = time.perf_counter()
+rss_imported = rss_kb()
+for name in dir(module.Constructor):
+    template = getattr(module.Constructor, name)
+    if hasattr(template, 'load') and hasattr(template, 'loaded'):
+        template.load()
+loaded = time.perf_counter()
+print(json.dumps({{
+    'import_ms': round((imported - started) * 1e3, 2),
+    'import_rss_kb': rss_imported - rss_before,
+    'template_load_ms': round((loaded - imported) * 1e3, 2),
+    'template_load_rss_kb': rss_kb() - rss_imported,
+}}))
+"""
+
+
+def measure_import(module):
+    """Import time and RSS growth of a constructor module (and of loading its templates) in a fresh process."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(path for path in sys.path if path))
+    output = subprocess.run([sys.executable, '-c', _IMPORT_PROBE.format(module=module)],
+                            env=env, stdout=subprocess.PIPE, check=True).stdout
+    return json.loads(output.decode('utf-8'))
+
+
+def compare(report, baseline, tolerance=0.1, noise_factor=1.5, slack_us=0.5):
+    """
+    Returns list of (case, expected p50, current p50, allowed relative slowdown) for cases whose relative p50
+    exceeds the baseline one by more than the allowance: the larger of tolerance and noise_factor times
+    the relative spread of the case (the larger of both runs'), plus slack_us for timer resolution.
+    Latencies are in us of the current run, the baseline is scaled by the calibration.
+
+    The median of 9 passes moves between runs by less than half of the spread of the passes, so the default
+    allowance is about three times the noise of the comparison.
+    """
+    regressions = []
+    for case, stats in report['results'].items():
+        expected = baseline['results'].get(case)
+        if expected is None or 'relative_p50' not in expected:
+            continue
+
+        allowed = max(tolerance, noise_factor * max(stats['relative_spread'], expected['relative_spread']))
+        expected_us = expected['relative_p50'] * stats['calibration_us']
+        actual_us = stats['relative_p50'] * stats['calibration_us']
+        if actual_us > expected_us * (1 + allowed) + slack_us:
+            regressions.append((case, round(expected_us, 2), round(actual_us, 2), round(allowed, 4)))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark smartz constructors')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--rounds', type=int, default=9, help='timed passes over the iterations of each case')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--owner-counts', help='comma separated multisig owner counts, "all" for 1..MAX_OWNERS')
+    parser.add_argument('--output', help='write results JSON to this file')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--tolerance', type=float, default=0.1, help='minimum allowed relative p50 slowdown')
+    parser.add_argument('--noise-factor', type=float, default=1.5,
+                        help='allowed relative p50 slowdown in relative spreads of the case')
+    parser.add_argument('--slack-us', type=float, default=0.5, help='allowed absolute p50 slowdown (us)')
+    parser.add_argument('--update-baseline', action='store_true')
+    args = parser.parse_args(argv)
+
+    if args.owner_counts == 'all':
+        owner_counts = range(1, multisig_wallet_constructor.Constructor.MAX_OWNERS + 1)
+    elif args.owner_counts:
+        owner_counts = [int(count) for count in args.owner_counts.split(',')]
+    else:
+        owner_counts = DEFAULT_OWNER_COUNTS
+
+    # measure rendering itself, not the optional result cache
+    dividend_token_constructor.Constructor.CACHE = None
+    multisig_wallet_constructor.Constructor.CACHE = None
+
+    rng = random.Random(args.seed)
+    results = measure(itertools.chain(dividend_cases(args.iterations, rng),
+                                      multisig_cases(args.iterations, rng, owner_counts)), args.rounds)
+    for case in results:
+        print('{:<80} p50 {:>10.2f}us ±{:>5.1f}%  p99 {:>10.2f}us  {:>10.1f}/s  peak {:>9}B'.format(
+            case, results[case]['p50_us'], results[case]['relative_spread'] * 100, results[case]['p99_us'],
+            results[case]['throughput_per_sec'], results[case]['peak_alloc_bytes']))
+
+    imports = {}
+    for module in ('dividend_token_constructor', 'multisig_wallet_constructor'):
+        imports[module] = measure_import(module)
+        print('import {:<68} {import_ms:>8.2f}ms  +{import_rss_kb}KB RSS, templates {template_load_ms:.2f}ms '
+              '+{template_load_rss_kb}KB RSS'.format(module, **imports[module]))
+
+    report = {
+        'python': sys.version.split()[0],
+        'iterations': args.iterations,
+        'rounds': args.rounds,
+        'imports': imports,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(report, fh, indent=2, sort_keys=True)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as fh:
+            json.dump(report, fh, indent=2, sort_keys=True)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        return 0
+
+    with open(args.baseline) as fh:
+        baseline = json.load(fh)
+
+    regressions = compare(report, baseline, args.tolerance, args.noise_factor, args.slack_us)
+    for case, expected, actual, allowed in regressions:
+        print('REGRESSION {}: p50 {:.2f}us -> {:.2f}us, allowed +{:.1f}%'.format(
+            case, expected, actual, allowed * 100), file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
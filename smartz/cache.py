@@ -0,0 +1,107 @@
+import functools
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from smartz.profiling import phase
+
+
+class LRUCache:
+    """
+    Bounded thread-safe LRU mapping with optional per-entry time to live (in seconds).
+    """
+
+    def __init__(self, maxsize=1024, ttl=None):
+        if maxsize < 1:
+            raise ValueError('maxsize must be positive')
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires is None or expires > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+    def __len__(self):
+        return len(self._data)
+
+
+def fields_key(namespace, canonical_fields):
+    """Content address of a canonical fields dict."""
+    payload = json.dumps([namespace, canonical_fields], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+@phase('cache_key')
+def construct_key(constructor, fields):
+    """Key of `fields` in constructor's CACHE, None if the constructor has no cache."""
+    cls = constructor.__class__
+    if cls.CACHE is None:
+        return None
+    return fields_key(cls.__module__, constructor.canonical_fields(fields))
+
+
+def cached_construct(construct):
+    """
+    Wraps the rendering part of Constructor.construct with the optional class-level CACHE.
+
+    The constructor has to provide canonical_fields(fields): a dict which is equal for any two `fields`
+    which render to the same result. Only successful results are cached.
+    """
+
+    @functools.wraps(construct)
+    def wrapper(self, fields):
+        key = construct_key(self, fields)
+        if key is None:
+            return construct(self, fields)
+
+        cache = self.__class__.CACHE
+        result = cache.get(key)
+        if result is None:
+            result = construct(self, fields)
+            if result.get('result') != 'success':
+                return result
+            cache.put(key, result)
+
+        return dict(result)
+
+    return wrapper
@@ -0,0 +1,297 @@
+"""
+Compile service: a pool of long-lived solc-js worker processes.
+
+    pool = CompilePool('node_modules/solc', workers=2)
+    contracts = pool.compile(construct_result['source'])   # {contract name: {'abi': [...], 'bytecode': '...'}}
+    pool.shutdown()
+
+Loading the compiler takes much longer than compiling a generated contract, so workers are started once and
+reused. Sources submitted within batch_window seconds of each other are compiled in one standard JSON input;
+if such a batch fails, its sources are recompiled one by one, so that an error in one of them doesn't affect
+the others. Workers which time out are killed, and every worker is replaced after max_jobs compilations
+(solc-js doesn't release memory). Results are cached by hash of the source and compiler settings; with a
+smartz.store.SourceStore they are also saved next to stored sources and survive restarts.
+"""
+
+import hashlib
+import json
+import os
+import queue
+import subprocess
+import threading
+import time
+from concurrent.futures import Future
+
+from smartz.cache import LRUCache
+from smartz.schema import freeze
+
+
+# reads standard JSON inputs from stdin, one per line, and writes outputs in the same way
+_SOLC_JS_WORKER = """
+var solc = require(process.argv[1]);
+var compile = solc.compileStandardWrapper || solc.compile;
+require('readline').createInterface({input: process.stdin, terminal: false}).on('line', function (line) {
+    process.stdout.write(JSON.stringify(JSON.parse(compile(line))) + '\\n');
+});
+"""
+
+
+class CompileError(Exception):
+    """Compilation failed; `errors` holds solc error messages."""
+
+    def __init__(self, errors):
+        super().__init__('\n'.join(errors))
+        self.errors = errors
+
+
+class CompileTimeout(CompileError):
+    pass
+
+
+class SolcWorker:
+    """solc-js process compiling standard JSON inputs one at a time."""
+
+    def __init__(self, solc_js):
+        self.process = subprocess.Popen(
+            ['node', '-e', _SOLC_JS_WORKER, os.path.abspath(solc_js)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE
+        )
+        self.jobs = 0
+
+        self._lines = queue.Queue()
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self):
+        for line in self.process.stdout:
+            self._lines.put(line)
+        self._lines.put(None)
+
+    @property
+    def alive(self):
+        return self.process.poll() is None
+
+    def compile(self, standard_input, timeout=None):
+        """Returns standard JSON output; raises CompileTimeout (killing the worker) or CompileError if it exited."""
+        self.jobs += 1
+        try:
+            self.process.stdin.write(json.dumps(standard_input).encode('utf-8') + b'\n')
+            self.process.stdin.flush()
+            line = self._lines.get(timeout=timeout)
+        except queue.Empty:
+            self.close()
+            raise CompileTimeout(['compilation timed out after {}s'.format(timeout)])
+        except OSError:
+            line = None
+
+        if line is None:
+            self.close()
+            raise CompileError(['solc worker exited with code {}'.format(self.process.returncode)])
+        return json.loads(line.decode('utf-8'))
+
+    def close(self):
+        if self.alive:
+            self.process.kill()
+        self.process.wait()
+        self.process.stdin.close()
+
+
+def source_key(source, settings):
+    return hashlib.sha256(json.dumps([settings, source], sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class CompilePool:
+
+    def __init__(self, solc_js=os.path.join('node_modules', 'solc'), workers=2, optimizer_runs=200,
+                 batch_window=0.005, max_batch=16, timeout=60, max_jobs=500, cache=None, store=None):
+        self.solc_js = solc_js
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self.max_jobs = max_jobs
+        self.cache = cache if cache is not None else LRUCache(1024)
+        self.store = store
+
+        self.settings = {'outputSelection': {'*': {'*': ['abi', 'evm.bytecode.object']}}}
+        if optimizer_runs:
+            self.settings['optimizer'] = {'enabled': True, 'runs': optimizer_runs}
+        # artifacts of sources in the store are saved under this tag
+        self.artifacts_tag = source_key('', self.settings)[:16]
+
+        self._requests = queue.Queue()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+        # workers are started (and solc loaded) right away
+        self._threads = [
+            threading.Thread(target=self._serve, args=(SolcWorker(solc_js),), daemon=True) for _ in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, source):
+        """Returns concurrent.futures.Future of {contract name: {'abi': ..., 'bytecode': ...}} for source."""
+        key = source_key(source, self.settings)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('compile pool is shut down')
+
+            future = self._pending.get(key)
+            if future is not None:
+                return future
+
+            future = Future()
+            result = self.cache.get(key)
+            if result is None and self.store is not None:
+                result = self.store.artifacts(self.store.key(source), self.artifacts_tag)
+                if result is not None:
+                    result = freeze(result)
+                    self.cache.put(key, result)
+            if result is not None:
+                future.set_result(result)
+                return future
+
+            self._pending[key] = future
+        self._requests.put((key, source, future))
+        return future
+
+    def compile(self, source, timeout=None):
+        """Compiles source, raises CompileError on failure."""
+        return self.submit(source).result(timeout)
+
+    def compile_contract(self, source, contract_name, timeout=None):
+        """{'abi': ..., 'bytecode': ...} of contract_name defined in source."""
+        contracts = self.compile(source, timeout)
+        if contract_name not in contracts:
+            raise CompileError(['contract {} not found'.format(contract_name)])
+        return contracts[contract_name]
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            self._closed = True
+        self._requests.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _serve(self, worker):
+        try:
+            while True:
+                batch = self._next_batch()
+                if batch is None:
+                    return
+
+                try:
+                    if worker is None:
+                        worker = SolcWorker(self.solc_js)
+                    worker = self._compile(worker, batch)
+                except Exception as exc:
+                    # unexpected failure (e.g. malformed solc output): the rest of the batch fails with it and
+                    # the worker, which may be out of sync with its process, is replaced for the next batch
+                    self._finish([request for request in batch if not request[2].done()], exception=exc)
+                    if worker is not None:
+                        worker.close()
+                    worker = None
+        finally:
+            if worker is not None:
+                worker.close()
+
+    def _next_batch(self):
+        request = self._requests.get()
+        if request is None:
+            # let other threads see it too
+            self._requests.put(None)
+            return None
+
+        batch = [request]
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if request is None:
+                self._requests.put(None)
+                break
+            batch.append(request)
+
+        cancelled = [request for request in batch if not request[2].set_running_or_notify_cancel()]
+        with self._lock:
+            for key, _, _ in cancelled:
+                self._pending.pop(key, None)
+        return [request for request in batch if request not in cancelled]
+
+    def _compile(self, worker, batch):
+        """Compiles batch of (key, source, future), resolves futures, returns the worker to use next."""
+        if not batch:
+            return worker
+
+        standard_input = {
+            'language': 'Solidity',
+            'sources': {key + '.sol': {'content': source} for key, source, _ in batch},
+            'settings': self.settings,
+        }
+        try:
+            output = worker.compile(standard_input, self.timeout)
+        except CompileError as exc:
+            self._finish(batch, exception=exc)
+            return SolcWorker(self.solc_js)
+        except ValueError as exc:
+            # output isn't JSON, the worker is out of sync with its process
+            worker.close()
+            self._finish(batch, exception=CompileError(['malformed solc output: {}'.format(exc)]))
+            return SolcWorker(self.solc_js)
+
+        if worker.jobs >= self.max_jobs:
+            worker.close()
+            worker = SolcWorker(self.solc_js)
+
+        errors = [error for error in output.get('errors', ()) if error.get('severity') == 'error']
+        if errors and len(batch) > 1:
+            # solc compiles all sources as a whole, find out which of them are broken
+            for request in batch:
+                worker = self._compile(worker, [request])
+            return worker
+
+        if errors:
+            self._finish(batch, exception=CompileError(
+                [error.get('formattedMessage') or error.get('message', '') for error in errors]
+            ))
+            return worker
+
+        for key, source, future in batch:
+            contracts = output.get('contracts', {}).get(key + '.sol', {})
+            try:
+                result = freeze({
+                    name: {'abi': contract['abi'], 'bytecode': contract['evm']['bytecode']['object']}
+                    for name, contract in contracts.items()
+                })
+            except (KeyError, TypeError) as exc:
+                self._finish([(key, source, future)], exception=CompileError(
+                    ['malformed solc output: missing {}'.format(exc)]
+                ))
+                continue
+
+            self.cache.put(key, result)
+            if self.store is not None:
+                try:
+                    self.store.put_artifacts(self.store.key(source), self.artifacts_tag, result)
+                except (KeyError, OSError):
+                    # the source isn't stored (or was released meanwhile); stored artifacts are only a cache
+                    pass
+            self._finish([(key, source, future)], result=result)
+        return worker
+
+    def _finish(self, batch, result=None, exception=None):
+        with self._lock:
+            for key, _, _ in batch:
+                self._pending.pop(key, None)
+
+        for _, _, future in batch:
+            if exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(result)
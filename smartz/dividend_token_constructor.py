@@ -1,4 +1,17 @@
+import hashlib
+import itertools
+import json
+import os
+
+from smartz.abi import encode_args, post_construct_bundle
+from smartz.aio import AsyncConstructMixin
 from smartz.api.constructor_engine import ConstructorInstance
+from smartz.batch import BatchConstructMixin
+from smartz.cache import LRUCache, cached_construct
+from smartz.profiling import instrumented_call, phase
+from smartz.schema import static_payload
+from smartz.template import TEMPLATES_DIR, Fragments
+from smartz.validator import schema_validator
 
 _DESCRIPTION_ = '''
 Contract allows receive payments in ETH and distribute them between divident token holders according to their relative token balances (share amounts). It's simple and useful instrument to organise incoming payments for DAO members. It can also be used to fix DAO member shares an redistribute them with simple transfers.
@@ -8,14 +21,96 @@ Every incoming payment is distributed accordingly to CURRENT token distribution,
 For example if Alice mint +1000 tokens on her address, then Alice, Bob and Eva has 1500, 200 and 300 tokens with total emission of 2000 tokens (75%, 10% and 15% respectively). Now next payment of 100ETH will be distributed as 75, 10 and 15 ETH respectively
 '''
 
+# fragments implemented differently by dividends accounting, see Constructor.ACCOUNTINGS
+_ACCOUNTING_FRAGMENTS = {
+    'emissions': {},
+    'per_share': {
+        name: 'per_share/' + name for name in ('DividendToken', 'MintableDividendToken', 'PullDividendToken')
+    },
+}
+
+# Template constants of the 'emissions' accounting DividendToken by storage layout, see Constructor.LAYOUTS
+_LAYOUT_CONSTANTS = {
+    'unpacked': {
+        'emission_amount_type': 'uint256',
+        'emission_range_check': '',
+    },
+
+    'packed': {
+        'emission_amount_type': 'uint128',
+        'emission_range_check': """
+        // both amounts share a single storage slot
+        require(_totalSupply < 2**128 && _totalBalanceWas < 2**128);""",
+    },
+}
+
+# defaults of variant options: accounting, payout, layout
+_DEFAULT_OPTIONS = ('emissions', 'push', 'unpacked')
+
+
+def variant_name(variant, accounting='emissions', payout='push', layout='unpacked'):
+    """
+    Name of a Token variant (of its precompiled artifact, in metrics): the contract Token inherits
+    (one of Constructor.VARIANTS), followed by the accounting, payout and layout which are not the default ones.
+    """
+    options = (accounting, payout, layout)
+    return '.'.join([variant] + [option for option, default in zip(options, _DEFAULT_OPTIONS) if option != default])
+
+
+class Constructor(AsyncConstructMixin, BatchConstructMixin, ConstructorInstance):
+    # optional smartz.cache.LRUCache for construct() results
+    CACHE = None
+
+    # 'inline' bakes token parameters into the source,
+    # 'constructor_args' passes them to Token as ABI-encoded constructor arguments, so there are only
+    # VARIANTS distinct sources which could be compiled ahead of time by smartz/precompile.py
+    MODE = 'inline'
+
+    VARIANTS = (
+        'DividendToken', 'MintableDividendToken', 'CappedDividendToken',
+        'PausableDividendToken', 'PausableMintableDividendToken', 'PausableCappedDividendToken',
+    )
 
-class Constructor(ConstructorInstance):
+    # dividends accounting: 'emissions' walks the token emissions made since the holder's previous payout
+    # (at most getMaxIterationsForRequestDividends() of them per call), 'per_share' keeps a magnified
+    # dividends-per-token accumulator, so payouts, transfers and mints cost constant gas
+    ACCOUNTINGS = ('emissions', 'per_share')
+
+    # dividends payout: 'push' sends dividends of both parties on every transfer (and to recipients of minted
+    # tokens), 'pull' only credits them there and sends them by requestDividends()
+    PAYOUTS = ('push', 'pull')
+
+    # storage layout of emissions: 'packed' keeps both fields of EmissionInfo in one slot, so each step of
+    # the emissions walk reads one storage slot instead of two; per_share accounting has no emissions to pack
+    LAYOUTS = ('unpacked', 'packed')
+
+    CAPPED_PARENTS = frozenset(('CappedDividendToken', 'PausableCappedDividendToken'))
+
+    PRECOMPILED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'precompiled', 'dividend_token')
+
+    # gas costs of requestDividends() by 'emissions' accounting variant, used for dividends_gas_budget
+    GAS_MODEL_PATH = os.path.join(TEMPLATES_DIR, 'dividend_token', 'gas_model.json')
+
+    # percent of the gas model estimate reserved on top of it: dividends_gas_budget has to cover the estimate
+    # multiplied by (100 + GAS_MARGIN_PERCENT) / 100
+    GAS_MARGIN_PERCENT = 10
+
+    # emissions a dividends request has to be able to process: a request processing only the emission it stopped
+    # on before never moves on to the next one
+    MIN_ITERATIONS = 2
+
+    _precompiled = {}
+
+    _gas_model = None
+
+    @static_payload
     def get_version(self):
         return {
             "result": "success",
             "version": 1
         }
 
+    @static_payload
     def get_params(self):
         json_schema = {
             "type": "object",
@@ -82,6 +177,31 @@ class Constructor(ConstructorInstance):
                     "title": "Is token pausable?",
                     "description": "Token owner will be able to pause token functions"
                 },
+                "is_constant_gas_dividends": {
+                    "type": "boolean",
+                    "default": False,
+                    "title": "Constant gas dividends",
+                    "description": "Dividend payouts, transfers and minting cost the same gas however many times tokens were minted. Otherwise every payout processes all emissions since the previous payout of the holder"
+                },
+                "is_pull_dividends": {
+                    "type": "boolean",
+                    "default": False,
+                    "title": "Pay dividends only on request",
+                    "description": "Token transfers and minting only record dividends of the parties, holders receive them by requesting dividends. Makes transfers cheaper and never sends ether to token recipients"
+                },
+                "dividends_gas_budget": {
+                    "type": "integer",
+                    "minimum": 21000,
+                    "maximum": 1000000000,
+                    "title": "Gas budget of dividends request",
+                    "description": "Maximum gas of a single dividends request (e.g. a part of the block gas limit of the target chain). Determines how many token emissions a request can process, remaining ones are processed by the next requests. Not used by constant gas dividends. Leave blank for 200 emissions per request"
+                },
+                "is_packed_storage": {
+                    "type": "boolean",
+                    "default": False,
+                    "title": "Packed storage",
+                    "description": "Store token emissions in half as many storage slots, which makes dividend payouts cheaper. Not used by constant gas dividends"
+                },
             }
         }
 
@@ -93,50 +213,42 @@ class Constructor(ConstructorInstance):
             "ui_schema": ui_schema
         }
 
-    def construct(self, fields):
-        errors = {}
-
-        parents = []
-        constructors_code = ''
-
-        is_capped = fields.get('max_tokens_count') is not None
-        is_mintable = fields.get('is_mintable')
-        is_pausable = fields.get('is_pausable')
-
-        if is_pausable:
-            if is_mintable and is_capped:
-                parents.append('PausableCappedDividendToken')
-                constructors_code += ' PausableCappedDividendToken({}*10**uint(decimals))'.format(fields['max_tokens_count'])
-            elif is_mintable:
-                parents.append('PausableMintableDividendToken')
-            else:
-                parents.append('PausableDividendToken')
-        else:
-            if is_mintable and is_capped:
-                parents.append('CappedDividendToken')
-                constructors_code += ' CappedDividendToken({}*10**uint(decimals))'.format(fields['max_tokens_count'])
-            elif is_mintable:
-                parents.append('MintableDividendToken')
-            else:
-                pass
-
-        constructor_inner_code = ''
-        if fields.get('premint'):
-            if fields.get('max_tokens_count') and fields.get('premint') > fields.get('max_tokens_count'):
-                errors['premint'] = "Premint count can't be more then maximum tokens count"
-
-            constructor_inner_code = """
-                uint premintAmount = {}*10**uint(decimals);
-                totalSupply_ = totalSupply_.add(premintAmount);
-                balances[msg.sender] = balances[msg.sender].add(premintAmount);
-                Transfer(address(0), msg.sender, premintAmount);
-
-                m_emissions.push(EmissionInfo({{
-                    totalSupply: totalSupply_,
-                    totalBalanceWas: 0
-                }}));
-
-            """.format(fields['premint'])
+    def canonical_fields(self, fields):
+        properties = self.get_params()['schema']['properties']
+
+        canonical = {
+            'name': fields['name'],
+            'symbol': fields['symbol'].upper(),
+            # missing premint means no premint and missing max_tokens_count means uncapped minting,
+            # so schema defaults are not applied to them
+            'premint': fields.get('premint') or None,
+            'max_tokens_count': fields.get('max_tokens_count'),
+            'dividends_gas_budget': fields.get('dividends_gas_budget'),
+        }
+        flags = ('is_mintable', 'is_pausable', 'is_constant_gas_dividends', 'is_pull_dividends', 'is_packed_storage')
+        for name in ('decimals',) + flags:
+            canonical[name] = fields.get(name, properties[name]['default'])
+        for name in flags:
+            canonical[name] = bool(canonical[name])
+        canonical['mode'] = self.__class__.MODE
+
+        return canonical
+
+    @instrumented_call
+    @phase('validate')
+    def validate(self, fields):
+        errors = schema_validator(self)(fields)
+
+        # '' is reported for fields which aren't an object, cross-field checks don't apply then
+        if '' not in errors and fields.get('premint') and fields.get('max_tokens_count') \
+                and 'premint' not in errors and 'max_tokens_count' not in errors \
+                and fields['premint'] > fields['max_tokens_count']:
+            errors['premint'] = "Premint count can't be more then maximum tokens count"
+
+        if not errors and fields.get('dividends_gas_budget') is not None:
+            error = self._gas_budget_error(fields)
+            if error is not None:
+                errors['dividends_gas_budget'] = error
 
         if errors:
             return {
@@ -144,832 +256,526 @@ class Constructor(ConstructorInstance):
                 "errors": errors
             }
 
-        source = self.__class__._TEMPLATE \
-            .replace('%name%', fields['name']) \
-            .replace('%symbol%', fields['symbol'].upper()) \
-            .replace('%decimals%', str(fields['decimals'])) \
-            .replace('%parents_code%', ', {}'.format(', '.join(parents)) if parents else '') \
-            .replace('%constructors_code%', constructors_code) \
-            .replace('%constructor_inner_code%', constructor_inner_code)
-
         return {
-            "result": "success",
-            "source": source,
-            "contract_name": "Token"
+            "result": "success"
         }
 
-    def post_construct(self, fields, abi_array):
+    def metric_values(self, fields):
+        """Values of constructor-specific metrics for valid fields, see smartz.metrics."""
+        return {'variant': variant_name(self._parent(fields) or 'DividendToken', *self._options(fields))}
 
-        function_titles = {
-            'pause': {
-                'title': 'Pause circulation',
-                'description': 'Disable any token transfers and minting. Callable only by token owner.',
-            },
-
-            'unpause': {
-                'title': 'Enable circulation',
-                'description': 'Enables token transfers and minting in case they were paused. Callable only by token owner.',
-            },
-
-            'mint': {
-                'title': 'Mint new tokens',
-                'description': 'Creates new tokens out-of-thin-air and gives them to specified address. Callable only by token owner.',
-                'inputs': [{
-                    'title': 'Address',
-                    'description': 'Transfer tokens to this address.',
-                }, {
-                    'title': 'Amount',
-                    'description': 'WARNING!! Amount must be specified in the smallest units of the token (f.e. if you have decimals=2 (like for USD) , then number 1100 in this form means 11.00$. ETH has decimals = 18) ',
-                }]
-            },
-
-            'finishMinting': {
-                'title': 'Finish minting',
-                'description': 'Disables any further token creation via minting. Callable only by token owner.',
-            },
-
-            'decreaseApproval': {
-                'title': 'Decrease approval',
-                'description': 'Decreases amount of your tokens which are allowed to be spent by specified address.',
-                'inputs': [{
-                    'title': 'Address',
-                    'description': 'Address which was allowed to spend tokens.',
-                }, {
-                    'title': 'Amount',
-                    'description': 'Amount must be specified in the smallest units of the token.',
-                }]
-            },
-
-            'increaseApproval': {
-                'title': 'Increase approval',
-                'description': 'Increases amount of your tokens which are allowed to be spent by specified address.',
-                'inputs': [{
-                    'title': 'Address',
-                    'description': 'Address which was allowed to spend tokens.',
-                }, {
-                    'title': 'Amount',
-                    'description': 'Amount must be specified in the smallest units of the token.',
-                }]
-            },
-
-            'allowance': {
-                'title': 'View allowance',
-                'description': 'View amount of tokens which some token holder allowed to spend by another address.',
-                'inputs': [{
-                    'title': 'Address of owner',
-                    'description': 'Address which allowed to spend his tokens.',
-                }, {
-                    'title': 'Address of spender',
-                    'description': 'Address which was allowed to spend tokens.',
-                }]
-            },
-
-            'approve': {
-                'title': 'Approve spending',
-                'description': 'Allow some amount of your tokens to be spent by specified address.',
-                'inputs': [{
-                    'title': 'Address',
-                    'description': 'Address to allow to spend tokens.',
-                }, {
-                    'title': 'Amount',
-                    'description': 'Amount must be specified in the smallest units of the token.',
-                }]
-            },
-
-            'transferFrom': {
-                'title': 'Transfer from',
-                'description': 'Transfers from one account to another. Account which tokens are transferred has to approve this spending.',
-                'inputs': [{
-                    'title': 'From',
-                    'description': 'Subtract tokens from this account.',
-                }, {
-                    'title': 'To',
-                    'description': 'Transfer tokens to this account.',
-                }, {
-                    'title': 'Amount',
-                    'description': 'Amount must be specified in the smallest units of the token.',
-                }]
-            },
-
-            'name': {
-                'title': 'Token name',
-                'description': 'Human-friendly name of the token.',
-            },
-
-            'symbol': {
-                'title': 'Token ticker',
-                'description': 'Abbreviated name of the token used on exchanges etc.',
-            },
-
-            'decimals': {
-                'title': 'Decimal places',
-                'description': 'Allowed digits in fractional part of the token. E.g. decimal places of US dollar is 2.',
-            },
-
-            'balanceOf': {
-                'title': 'Get balance',
-                'description': 'Gets the token balance of any address. Return value is specified in the smallest units of the token.',
-                'inputs': [{
-                    'title': 'Address',
-                }]
-            },
-
-            'transfer': {
-                'title': 'Transfer tokens',
-                'description': 'Transfers some amount of your tokens to another address.',
-                'inputs': [{
-                    'title': 'To',
-                    'description': 'Recipient address.',
-                }, {
-                    'title': 'Amount',
-                    'description': 'Amount must be specified in the smallest units of the token.',
-                }]
-            },
-
-            'totalSupply': {
-                'title': 'Total supply',
-                'description': 'Current total amount of the token. Specified in the smallest units of the token.',
-            },
-
-            'transferOwnership': {
-                'title': 'Transfer ownership',
-                'description': 'Transfers ownership of the token to another address. Ownership rights are required to perform some administrative operations.',
-                'inputs': [{
-                    'title': 'Address',
-                    'description': 'Address which\'ll receive ownership rights.',
-                }]
-            },
-
-            'mintingFinished': {
-                'title': 'Minting finished',
-                'description': 'If true no more tokens could be created.',
-            },
-
-            'cap': {
-                'title': 'Maximum tokens',
-                'description': 'Maximum number of tokens which could be created. Return value is specified in the smallest units of the token.',
-            },
-
-            'paused': {
-                'title': 'Paused',
-                'description': 'If true any token transfers are disabled.',
-            },
-
-            'owner': {
-                'title': 'Owner',
-                'description': 'Address of the token owner.',
-            },
-
-            'm_totalDividends': {
-                'title': 'Total amount of dividends',
-                'description': 'Total amount of unrequested dividends in contract',
-            },
-
-            'm_emissions': {
-                'title': 'Get emission info',
-                'description': 'Get information about new token emission events. New emission is created each time the tokens are minted',
-            },
-
-            'm_lastAccountEmission': {
-                'title': 'Get last token emission id for address',
-                'description': 'Get information about last token emission to address',
-            },
-
-            'm_lastDividends': {
-                'title': 'Get last dividends for address',
-                'description': 'Get information about last dividends paid to address',
-            },
-
-            'm_totalHangingDividends': {
-                'title': 'Total amount of hanging dividends',
-                'description': 'Total amount of hanging dividends in case when transfer to stakeholder is impossible',
-            },
-
-            'requestDividends': {
-                'title': 'Request dividends',
-                'description': 'Request dividends to be payed to sender. Received dividents are calculated from sender\'s share in total tokens amount during every reveive of ETH by token contract',
-            },
-
-            'requestHangingDividends': {
-                'title': 'Request hanging dividends',
-                'description': 'Internal. Request dividends, that was unable to pay to stakeholder, for example if transfer of ether to stakeholder\'s address was unsuccessful. Haning ether will be returned to contract owner. This function is allowed only for owner.',
-            },
-
-            '': {
-                'title': 'Deposit',
-                'description': 'Transfer ether to contract',
-            }
+    @instrumented_call
+    def construct(self, fields):
+        result = self.validate(fields)
+        if result['result'] != 'success':
+            return result
+
+        return self._render(fields)
+
+    def construct_stream(self, fields, binary=False):
+        """
+        Same as construct(), but instead of 'source' the result holds 'segments': an iterator over
+        pieces of the source, template parts are shared and never copied.
+        With binary=True segments are UTF-8 bytes-like objects served from the memory-mapped template.
+        """
+        result = self.validate(fields)
+        if result['result'] != 'success':
+            return result
+
+        renderer, values, result = self._prepare(fields)
+        result['segments'] = renderer.byte_segments(values) if binary else renderer.segments(values)
+        return result
+
+    @cached_construct
+    def _render(self, fields):
+        renderer, values, result = self._prepare(fields)
+        result['source'] = renderer.render(values)
+        return result
+
+    def _prepare(self, fields):
+        """Returns template, its values and the result without source for the current MODE."""
+        parent = self._parent(fields)
+        options = self._options(fields)
+        if self.__class__.MODE == 'constructor_args':
+            return self._prepare_with_args(fields, parent, options)
+        variant = variant_name(parent or 'DividendToken', *options)
+
+        constructors_code = ''
+        if parent in self.__class__.CAPPED_PARENTS:
+            constructors_code = ' {}({}*10**uint(decimals))'.format(parent, fields['max_tokens_count'])
+
+        constructor_inner_code = ''
+        if fields.get('premint'):
+            constructor_inner_code = """
+                uint premintAmount = {}*10**uint(decimals);
+                totalSupply_ = totalSupply_.add(premintAmount);
+                balances[msg.sender] = balances[msg.sender].add(premintAmount);
+                Transfer(address(0), msg.sender, premintAmount);{}
+
+            """.format(fields['premint'], self._premint_emission_code(options, ' ' * 16))
+
+        values = {
+            'name': fields['name'],
+            'symbol': fields['symbol'].upper(),
+            'decimals': str(fields['decimals']),
+            'parents_code': self._parents_code(parent, options),
+            'constructors_code': constructors_code,
+            'constructor_inner_code': constructor_inner_code,
+            'max_iterations_code': self._max_iterations_code(fields, variant, options),
         }
 
-        return {
+        return self.__class__._RENDERERS[variant], values, {
             "result": "success",
-            'function_specs': function_titles,
-            'dashboard_functions': ['symbol', 'totalSupply']
+            "contract_name": "Token"
         }
 
-    # language=Solidity
-    _TEMPLATE = """
-pragma solidity ^0.4.24;
-
-
-/**
- * @title SafeMath
- * @dev Math operations with safety checks that throw on error
- */
-library SafeMath {
-  function mul(uint256 a, uint256 b) internal pure returns (uint256) {
-    if (a == 0) {
-      return 0;
-    }
-    uint256 c = a * b;
-    assert(c / a == b);
-    return c;
-  }
-
-  function div(uint256 a, uint256 b) internal pure returns (uint256) {
-    // assert(b > 0); // Solidity automatically throws when dividing by 0
-    uint256 c = a / b;
-    // assert(a == b * c + a % b); // There is no case in which this doesn't hold
-    return c;
-  }
-
-  function sub(uint256 a, uint256 b) internal pure returns (uint256) {
-    assert(b <= a);
-    return a - b;
-  }
-
-  function add(uint256 a, uint256 b) internal pure returns (uint256) {
-    uint256 c = a + b;
-    assert(c >= a);
-    return c;
-  }
-}
-
-
-/**
- * @title Ownable
- * @dev The Ownable contract has an owner address, and provides basic authorization control
- * functions, this simplifies the implementation of "user permissions".
- */
-contract Ownable {
-  address public owner;
-
-
-  event OwnershipTransferred(address indexed previousOwner, address indexed newOwner);
-
-
-  /**
-   * @dev The Ownable constructor sets the original `owner` of the contract to the sender
-   * account.
-   */
-  function Ownable() public {
-    owner = msg.sender;
-  }
-
-  /**
-   * @dev Throws if called by any account other than the owner.
-   */
-  modifier onlyOwner() {
-    require(msg.sender == owner);
-    _;
-  }
-
-  /**
-   * @dev Allows the current owner to transfer control of the contract to a newOwner.
-   * @param newOwner The address to transfer ownership to.
-   */
-  function transferOwnership(address newOwner) public onlyOwner {
-    require(newOwner != address(0));
-    OwnershipTransferred(owner, newOwner);
-    owner = newOwner;
-  }
-
-}
-
-/**
- * @title ERC20Basic
- * @dev Simpler version of ERC20 interface
- * @dev see https://github.com/ethereum/EIPs/issues/179
- */
-contract ERC20Basic {
-  function totalSupply() public view returns (uint256);
-  function balanceOf(address who) public view returns (uint256);
-  function transfer(address to, uint256 value) public returns (bool);
-  event Transfer(address indexed from, address indexed to, uint256 value);
-}
-
-/**
- * @title ERC20 interface
- * @dev see https://github.com/ethereum/EIPs/issues/20
- */
-contract ERC20 is ERC20Basic {
-  function allowance(address owner, address spender) public view returns (uint256);
-  function transferFrom(address from, address to, uint256 value) public returns (bool);
-  function approve(address spender, uint256 value) public returns (bool);
-  event Approval(address indexed owner, address indexed spender, uint256 value);
-}
-
-
-/**
- * @title Basic token
- * @dev Basic version of StandardToken, with no allowances.
- */
-contract BasicToken is ERC20Basic {
-  using SafeMath for uint256;
-
-  mapping(address => uint256) balances;
-
-  uint256 totalSupply_;
-
-  /**
-  * @dev total number of tokens in existence
-  */
-  function totalSupply() public view returns (uint256) {
-    return totalSupply_;
-  }
-
-  /**
-  * @dev transfer token for a specified address
-  * @param _to The address to transfer to.
-  * @param _value The amount to be transferred.
-  */
-  function transfer(address _to, uint256 _value) public returns (bool) {
-    require(_to != address(0));
-    require(_value <= balances[msg.sender]);
-
-    // SafeMath.sub will throw if there is not enough balance.
-    balances[msg.sender] = balances[msg.sender].sub(_value);
-    balances[_to] = balances[_to].add(_value);
-    Transfer(msg.sender, _to, _value);
-    return true;
-  }
-
-  /**
-  * @dev Gets the balance of the specified address.
-  * @param _owner The address to query the the balance of.
-  * @return An uint256 representing the amount owned by the passed address.
-  */
-  function balanceOf(address _owner) public view returns (uint256 balance) {
-    return balances[_owner];
-  }
-
-}
-
-
-/**
- * @title Standard ERC20 token
- *
- * @dev Implementation of the basic standard token.
- * @dev https://github.com/ethereum/EIPs/issues/20
- * @dev Based on code by FirstBlood: https://github.com/Firstbloodio/token/blob/master/smart_contract/FirstBloodToken.sol
- */
-contract StandardToken is ERC20, BasicToken {
-
-  mapping (address => mapping (address => uint256)) internal allowed;
-
-
-  /**
-   * @dev Transfer tokens from one address to another
-   * @param _from address The address which you want to send tokens from
-   * @param _to address The address which you want to transfer to
-   * @param _value uint256 the amount of tokens to be transferred
-   */
-  function transferFrom(address _from, address _to, uint256 _value) public returns (bool) {
-    require(_to != address(0));
-    require(_value <= balances[_from]);
-    require(_value <= allowed[_from][msg.sender]);
-
-    balances[_from] = balances[_from].sub(_value);
-    balances[_to] = balances[_to].add(_value);
-    allowed[_from][msg.sender] = allowed[_from][msg.sender].sub(_value);
-    Transfer(_from, _to, _value);
-    return true;
-  }
-
-  /**
-   * @dev Approve the passed address to spend the specified amount of tokens on behalf of msg.sender.
-   *
-   * Beware that changing an allowance with this method brings the risk that someone may use both the old
-   * and the new allowance by unfortunate transaction ordering. One possible solution to mitigate this
-   * race condition is to first reduce the spender's allowance to 0 and set the desired value afterwards:
-   * https://github.com/ethereum/EIPs/issues/20#issuecomment-263524729
-   * @param _spender The address which will spend the funds.
-   * @param _value The amount of tokens to be spent.
-   */
-  function approve(address _spender, uint256 _value) public returns (bool) {
-    allowed[msg.sender][_spender] = _value;
-    Approval(msg.sender, _spender, _value);
-    return true;
-  }
-
-  /**
-   * @dev Function to check the amount of tokens that an owner allowed to a spender.
-   * @param _owner address The address which owns the funds.
-   * @param _spender address The address which will spend the funds.
-   * @return A uint256 specifying the amount of tokens still available for the spender.
-   */
-  function allowance(address _owner, address _spender) public view returns (uint256) {
-    return allowed[_owner][_spender];
-  }
-
-  /**
-   * @dev Increase the amount of tokens that an owner allowed to a spender.
-   *
-   * approve should be called when allowed[_spender] == 0. To increment
-   * allowed value is better to use this function to avoid 2 calls (and wait until
-   * the first transaction is mined)
-   * From MonolithDAO Token.sol
-   * @param _spender The address which will spend the funds.
-   * @param _addedValue The amount of tokens to increase the allowance by.
-   */
-  function increaseApproval(address _spender, uint _addedValue) public returns (bool) {
-    allowed[msg.sender][_spender] = allowed[msg.sender][_spender].add(_addedValue);
-    Approval(msg.sender, _spender, allowed[msg.sender][_spender]);
-    return true;
-  }
-
-  /**
-   * @dev Decrease the amount of tokens that an owner allowed to a spender.
-   *
-   * approve should be called when allowed[_spender] == 0. To decrement
-   * allowed value is better to use this function to avoid 2 calls (and wait until
-   * the first transaction is mined)
-   * From MonolithDAO Token.sol
-   * @param _spender The address which will spend the funds.
-   * @param _subtractedValue The amount of tokens to decrease the allowance by.
-   */
-  function decreaseApproval(address _spender, uint _subtractedValue) public returns (bool) {
-    uint oldValue = allowed[msg.sender][_spender];
-    if (_subtractedValue > oldValue) {
-      allowed[msg.sender][_spender] = 0;
-    } else {
-      allowed[msg.sender][_spender] = oldValue.sub(_subtractedValue);
-    }
-    Approval(msg.sender, _spender, allowed[msg.sender][_spender]);
-    return true;
-  }
-
-}
+    def _prepare_with_args(self, fields, parent, options):
+        arg_types = ['string', 'string', 'uint8', 'uint256']
+        arg_values = [fields['name'], fields['symbol'].upper(), fields['decimals'], fields.get('premint') or 0]
+        if parent in self.__class__.CAPPED_PARENTS:
+            arg_types.append('uint256')
+            arg_values.append(fields['max_tokens_count'])
 
-
-
-/**
- * @title Mintable token
- * @dev Simple ERC20 Token example, with mintable token creation
- * @dev Issue: * https://github.com/OpenZeppelin/zeppelin-solidity/issues/120
- * Based on code by TokenMarketNet: https://github.com/TokenMarketNet/ico/blob/master/contracts/MintableToken.sol
- */
-contract MintableToken is StandardToken, Ownable {
-  event Mint(address indexed to, uint256 amount);
-  event MintFinished();
-
-  bool public mintingFinished = false;
-
-
-  modifier canMint() {
-    require(!mintingFinished);
-    _;
-  }
-
-  /**
-   * @dev Function to mint tokens
-   * @param _to The address that will receive the minted tokens.
-   * @param _amount The amount of tokens to mint.
-   * @return A boolean that indicates if the operation was successful.
-   */
-  function mint(address _to, uint256 _amount) onlyOwner canMint public returns (bool) {
-    totalSupply_ = totalSupply_.add(_amount);
-    balances[_to] = balances[_to].add(_amount);
-    Mint(_to, _amount);
-    Transfer(address(0), _to, _amount);
-        
-    return true;
-  }
-
-  /**
-   * @dev Function to stop minting new tokens.
-   * @return True if the operation was successful.
-   */
-  function finishMinting() onlyOwner canMint public returns (bool) {
-    mintingFinished = true;
-    MintFinished();
-    return true;
-  }
-}
-
-
-/**
- * @title Pausable
- * @dev Base contract which allows children to implement an emergency stop mechanism.
- */
-contract Pausable is Ownable {
-  event Pause();
-  event Unpause();
-
-  bool public paused = false;
-
-
-  /**
-   * @dev Modifier to make a function callable only when the contract is not paused.
-   */
-  modifier whenNotPaused() {
-    require(!paused);
-    _;
-  }
-
-  /**
-   * @dev Modifier to make a function callable only when the contract is paused.
-   */
-  modifier whenPaused() {
-    require(paused);
-    _;
-  }
-
-  /**
-   * @dev called by the owner to pause, triggers stopped state
-   */
-  function pause() onlyOwner whenNotPaused public {
-    paused = true;
-    Pause();
-  }
-
-  /**
-   * @dev called by the owner to unpause, returns to normal state
-   */
-  function unpause() onlyOwner whenPaused public {
-    paused = false;
-    Unpause();
-  }
-}
-
-
-contract DividendToken is StandardToken, Ownable {
-    event PayDividend(address indexed to, uint256 amount);
-    event HangingDividend(address indexed to, uint256 amount) ;
-    event PayHangingDividend(uint256 amount) ;
-    event Deposit(address indexed sender, uint256 value);
-
-    /// @dev parameters of an extra token emission
-    struct EmissionInfo {
-        // new totalSupply after emission happened
-        uint256 totalSupply;
-
-        // total balance of Ether stored at the contract when emission happened
-        uint256 totalBalanceWas;
-    }
-
-    constructor () public
-    {
-        m_emissions.push(EmissionInfo({
-            totalSupply: totalSupply(),
-            totalBalanceWas: 0
-        }));
-    }
-
-    function() external payable {
-        if (msg.value > 0) {
-            emit Deposit(msg.sender, msg.value);
-            m_totalDividends = m_totalDividends.add(msg.value);
+        result = {
+            "result": "success",
+            "contract_name": "Token",
+            "constructor_args": encode_args(arg_types, arg_values),
         }
-    }
-
-    /// @notice Request dividends for current account.
-    function requestDividends() public {
-        payDividendsTo(msg.sender);
-    }
-
-    /// @notice Request hanging dividends to pwner.
-    function requestHangingDividends() onlyOwner public {
-        owner.transfer(m_totalHangingDividends);
-        emit PayHangingDividend(m_totalHangingDividends);
-        m_totalHangingDividends = 0;
-    }
-
-    /// @notice hook on standard ERC20#transfer to pay dividends
-    function transfer(address _to, uint256 _value) public returns (bool) {
-        payDividendsTo(msg.sender);
-        payDividendsTo(_to);
-        return super.transfer(_to, _value);
-    }
 
-    /// @notice hook on standard ERC20#transferFrom to pay dividends
-    function transferFrom(address _from, address _to, uint256 _value) public returns (bool) {
-        payDividendsTo(_from);
-        payDividendsTo(_to);
-        return super.transferFrom(_from, _to, _value);
-    }
+        variant = variant_name(parent or 'DividendToken', *options)
+        artifact = self.precompiled(variant)
+        if artifact is not None:
+            result['abi'] = artifact['abi']
+            result['bytecode'] = artifact['bytecode']
 
-    /// @dev adds dividends to the account _to
-    function payDividendsTo(address _to) internal {
-        (bool hasNewDividends, uint256 dividends, uint256 lastProcessedEmissionNum) = calculateDividendsFor(_to);
-        if (!hasNewDividends)
-            return;
+        return self.__class__._ARGS_RENDERERS[variant], self._variant_values(parent, options), result
 
-        if (0 != dividends) {
-            bool res = _to.send(dividends);
-            if (res) {
-                emit PayDividend(_to, dividends);
-            }
-            else{
-                // _to probably is a contract not able to receive ether
-                emit HangingDividend(_to, dividends);
-                m_totalHangingDividends = m_totalHangingDividends.add(dividends);
-            }
-        }
+    @phase('variant')
+    def _parent(self, fields):
+        """Returns parent contract of Token for the variant selected by fields (None for plain DividendToken)."""
+        is_capped = fields.get('max_tokens_count') is not None
+        is_mintable = fields.get('is_mintable')
+        is_pausable = fields.get('is_pausable')
 
-        m_lastAccountEmission[_to] = lastProcessedEmissionNum;
-        if (lastProcessedEmissionNum == getLastEmissionNum()) {
-            m_lastDividends[_to] = m_totalDividends;
-        }
-        else {
-            m_lastDividends[_to] = m_emissions[lastProcessedEmissionNum.add(1)].totalBalanceWas;
+        if is_pausable:
+            if is_mintable and is_capped:
+                return 'PausableCappedDividendToken'
+            elif is_mintable:
+                return 'PausableMintableDividendToken'
+            else:
+                return 'PausableDividendToken'
+        else:
+            if is_mintable and is_capped:
+                return 'CappedDividendToken'
+            elif is_mintable:
+                return 'MintableDividendToken'
+            else:
+                return None
+
+    @staticmethod
+    def _options(fields):
+        """(accounting, payout, layout) selected by fields."""
+        accounting = 'per_share' if fields.get('is_constant_gas_dividends') else 'emissions'
+        return (
+            accounting,
+            'pull' if fields.get('is_pull_dividends') else 'push',
+            'packed' if fields.get('is_packed_storage') and accounting == 'emissions' else 'unpacked',
+        )
+
+    @staticmethod
+    def _parents_code(parent, options):
+        """Contracts Token inherits besides DividendToken."""
+        parents = (['PullDividendToken'] if options[1] == 'pull' else []) + ([parent] if parent else [])
+        return ''.join(', ' + name for name in parents)
+
+    @classmethod
+    def gas_model(cls):
+        if cls._gas_model is None:
+            with open(cls.GAS_MODEL_PATH) as fh:
+                cls._gas_model = json.load(fh)
+        return cls._gas_model
+
+    @classmethod
+    def max_iterations(cls, variant, gas_budget):
+        """
+        Number of emissions requestDividends() of an 'emissions' accounting variant (see variant_name())
+        can process within gas_budget according to the gas model and its margin, 0 if even one doesn't fit.
+        """
+        costs = cls.gas_model()['variants'][variant]
+        usable = gas_budget * 100 // (100 + cls.GAS_MARGIN_PERCENT)
+        return max(0, (usable - costs['base']) // costs['iteration'])
+
+    @classmethod
+    def min_gas_budget(cls, variant):
+        """The smallest gas budget of an 'emissions' accounting variant, see MIN_ITERATIONS."""
+        costs = cls.gas_model()['variants'][variant]
+        return -(-(costs['base'] + cls.MIN_ITERATIONS * costs['iteration']) * (100 + cls.GAS_MARGIN_PERCENT) // 100)
+
+    def _gas_budget_error(self, fields):
+        if self.__class__.MODE == 'constructor_args':
+            return "Gas budget can't be set for precompiled tokens"
+
+        options = self._options(fields)
+        if options[0] != 'emissions':
+            return None
+
+        variant = variant_name(self._parent(fields) or 'DividendToken', *options)
+        if self.max_iterations(variant, fields['dividends_gas_budget']) < self.MIN_ITERATIONS:
+            return 'Gas budget must be at least {}'.format(self.min_gas_budget(variant))
+        return None
+
+    def _max_iterations_code(self, fields, variant, options):
+        """Token's override of the number of emissions processed per dividends request, if gas budget is set."""
+        if fields.get('dividends_gas_budget') is None or options[0] != 'emissions':
+            return ''
+
+        iterations = self.max_iterations(variant, fields['dividends_gas_budget'])
+        # calculateDividendsFor() processes one emission more than this limit
+        return """
+
+    /// @dev fits dividends requests into {} gas
+    function getMaxIterationsForRequestDividends() internal pure returns (uint256) {{
+        return {};
+    }}""".format(fields['dividends_gas_budget'], iterations - 1)
+
+    @staticmethod
+    def _premint_emission_code(options, indent):
+        """Records premint as the first emission; only 'emissions' accounting keeps a list of them."""
+        if options[0] != 'emissions':
+            return ''
+        return '\n\n{}pushEmission(totalSupply_, 0);'.format(indent)
+
+    @classmethod
+    def variant_names(cls):
+        """Names of all Token variants, see variant_name()."""
+        return list(cls._VARIANT_KEYS)
+
+    @classmethod
+    def variant_key(cls, variant):
+        """(contract Token inherits or DividendToken, accounting, payout, layout) of a variant name."""
+        return cls._VARIANT_KEYS[variant]
+
+    @classmethod
+    def variant_source(cls, parent, accounting='emissions', payout='push', layout='unpacked'):
+        """constructor_args mode source of a variant; it doesn't depend on token parameters."""
+        options = (accounting, payout, layout)
+        return cls._ARGS_RENDERERS[variant_name(parent or 'DividendToken', *options)].render(
+            cls._variant_values(parent, options)
+        )
+
+    @classmethod
+    def _variant_values(cls, parent, options):
+        is_capped = parent in cls.CAPPED_PARENTS
+        return {
+            'parents_code': cls._parents_code(parent, options),
+            'cap_param': ', uint256 _cap' if is_capped else '',
+            'constructors_code': ' {}(_cap*10**uint(_decimals))'.format(parent) if is_capped else '',
+            'premint_emission_code': cls._premint_emission_code(options, ' ' * 12),
         }
-    }
-
-    /// @dev calculates dividends for the account _for
-    /// @return (true if state has to be updated, dividend amount (could be 0!), lastProcessedEmissionNum)
-    function calculateDividendsFor(address _for) view internal returns (
-        bool hasNewDividends,
-        uint256 dividends,
-        uint256 lastProcessedEmissionNum
-    ) {
-        uint256 lastEmissionNum = getLastEmissionNum();
-        uint256 lastAccountEmissionNum = m_lastAccountEmission[_for];
-        assert(lastAccountEmissionNum <= lastEmissionNum);
-
-        uint256 totalBalanceWasWhenLastPay = m_lastDividends[_for];
-
-        assert(m_totalDividends >= totalBalanceWasWhenLastPay);
-
-        // If no new ether was collected since last dividends claim
-        if (m_totalDividends == totalBalanceWasWhenLastPay)
-            return (false, 0, lastAccountEmissionNum);
-
-        uint256 initialBalance = balances[_for];    // beware of recursion!
-
-        // if no tokens owned by account
-        if (0 == initialBalance)
-            return (true, 0, lastEmissionNum);
-
-        // We start with last processed emission because some ether could be collected before next emission
-        // we pay all remaining ether collected and continue with all the next emissions
-        uint256 iter = 0;
-        uint256 iterMax = getMaxIterationsForRequestDividends();
-
-        for (uint256 emissionToProcess = lastAccountEmissionNum; emissionToProcess <= lastEmissionNum; emissionToProcess++) {
-            if (iter++ > iterMax)
-                break;
-
-            lastAccountEmissionNum = emissionToProcess;
-            EmissionInfo storage emission = m_emissions[emissionToProcess];
 
-            if (0 == emission.totalSupply)
-                continue;
-
-            uint256 totalEtherDuringEmission;
-            // last emission we stopped on
-            if (emissionToProcess == lastEmissionNum) {
-                totalEtherDuringEmission = m_totalDividends.sub(totalBalanceWasWhenLastPay);
-            }
-            else {
-                totalEtherDuringEmission = m_emissions[emissionToProcess.add(1)].totalBalanceWas.sub(totalBalanceWasWhenLastPay);
-                totalBalanceWasWhenLastPay = m_emissions[emissionToProcess.add(1)].totalBalanceWas;
-            }
-
-            uint256 dividend = totalEtherDuringEmission.mul(initialBalance).div(emission.totalSupply);
-            dividends = dividends.add(dividend);
+    @classmethod
+    def precompiled(cls, variant):
+        """
+        Precompiled artifact of a constructor_args mode variant (named by variant_name()) or None,
+        see smartz/precompile.py.
+        Artifacts built from a different variant source are ignored.
+        """
+        if variant not in cls._precompiled:
+            path = os.path.join(cls.PRECOMPILED_DIR, variant + '.json')
+            artifact = None
+            if os.path.exists(path):
+                with open(path) as fh:
+                    artifact = json.load(fh)
+
+                parent, accounting, payout, layout = cls.variant_key(variant)
+                source = cls.variant_source(None if parent == 'DividendToken' else parent, accounting, payout, layout)
+                if artifact['source_sha256'] != hashlib.sha256(source.encode('utf-8')).hexdigest():
+                    artifact = None
+            cls._precompiled[variant] = artifact
+
+        return cls._precompiled[variant]
+
+    @instrumented_call
+    def post_construct(self, fields, abi_array):
+        cls = self.__class__
+        return post_construct_bundle(cls.POST_CONSTRUCT_CACHE, cls._FUNCTION_SPECS, cls._DASHBOARD_FUNCTIONS, abi_array)
+
+    _FUNCTION_SPECS = {
+        'pause': {
+            'title': 'Pause circulation',
+            'description': 'Disable any token transfers and minting. Callable only by token owner.',
+        },
+
+        'unpause': {
+            'title': 'Enable circulation',
+            'description': 'Enables token transfers and minting in case they were paused. Callable only by token owner.',
+        },
+
+        'mint': {
+            'title': 'Mint new tokens',
+            'description': 'Creates new tokens out-of-thin-air and gives them to specified address. Callable only by token owner.',
+            'inputs': [{
+                'title': 'Address',
+                'description': 'Transfer tokens to this address.',
+            }, {
+                'title': 'Amount',
+                'description': 'WARNING!! Amount must be specified in the smallest units of the token (f.e. if you have decimals=2 (like for USD) , then number 1100 in this form means 11.00$. ETH has decimals = 18) ',
+            }]
+        },
+
+        'finishMinting': {
+            'title': 'Finish minting',
+            'description': 'Disables any further token creation via minting. Callable only by token owner.',
+        },
+
+        'decreaseApproval': {
+            'title': 'Decrease approval',
+            'description': 'Decreases amount of your tokens which are allowed to be spent by specified address.',
+            'inputs': [{
+                'title': 'Address',
+                'description': 'Address which was allowed to spend tokens.',
+            }, {
+                'title': 'Amount',
+                'description': 'Amount must be specified in the smallest units of the token.',
+            }]
+        },
+
+        'increaseApproval': {
+            'title': 'Increase approval',
+            'description': 'Increases amount of your tokens which are allowed to be spent by specified address.',
+            'inputs': [{
+                'title': 'Address',
+                'description': 'Address which was allowed to spend tokens.',
+            }, {
+                'title': 'Amount',
+                'description': 'Amount must be specified in the smallest units of the token.',
+            }]
+        },
+
+        'allowance': {
+            'title': 'View allowance',
+            'description': 'View amount of tokens which some token holder allowed to spend by another address.',
+            'inputs': [{
+                'title': 'Address of owner',
+                'description': 'Address which allowed to spend his tokens.',
+            }, {
+                'title': 'Address of spender',
+                'description': 'Address which was allowed to spend tokens.',
+            }]
+        },
+
+        'approve': {
+            'title': 'Approve spending',
+            'description': 'Allow some amount of your tokens to be spent by specified address.',
+            'inputs': [{
+                'title': 'Address',
+                'description': 'Address to allow to spend tokens.',
+            }, {
+                'title': 'Amount',
+                'description': 'Amount must be specified in the smallest units of the token.',
+            }]
+        },
+
+        'transferFrom': {
+            'title': 'Transfer from',
+            'description': 'Transfers from one account to another. Account which tokens are transferred has to approve this spending.',
+            'inputs': [{
+                'title': 'From',
+                'description': 'Subtract tokens from this account.',
+            }, {
+                'title': 'To',
+                'description': 'Transfer tokens to this account.',
+            }, {
+                'title': 'Amount',
+                'description': 'Amount must be specified in the smallest units of the token.',
+            }]
+        },
+
+        'name': {
+            'title': 'Token name',
+            'description': 'Human-friendly name of the token.',
+        },
+
+        'symbol': {
+            'title': 'Token ticker',
+            'description': 'Abbreviated name of the token used on exchanges etc.',
+        },
+
+        'decimals': {
+            'title': 'Decimal places',
+            'description': 'Allowed digits in fractional part of the token. E.g. decimal places of US dollar is 2.',
+        },
+
+        'balanceOf': {
+            'title': 'Get balance',
+            'description': 'Gets the token balance of any address. Return value is specified in the smallest units of the token.',
+            'inputs': [{
+                'title': 'Address',
+            }]
+        },
+
+        'transfer': {
+            'title': 'Transfer tokens',
+            'description': 'Transfers some amount of your tokens to another address.',
+            'inputs': [{
+                'title': 'To',
+                'description': 'Recipient address.',
+            }, {
+                'title': 'Amount',
+                'description': 'Amount must be specified in the smallest units of the token.',
+            }]
+        },
+
+        'totalSupply': {
+            'title': 'Total supply',
+            'description': 'Current total amount of the token. Specified in the smallest units of the token.',
+        },
+
+        'transferOwnership': {
+            'title': 'Transfer ownership',
+            'description': 'Transfers ownership of the token to another address. Ownership rights are required to perform some administrative operations.',
+            'inputs': [{
+                'title': 'Address',
+                'description': 'Address which\'ll receive ownership rights.',
+            }]
+        },
+
+        'mintingFinished': {
+            'title': 'Minting finished',
+            'description': 'If true no more tokens could be created.',
+        },
+
+        'cap': {
+            'title': 'Maximum tokens',
+            'description': 'Maximum number of tokens which could be created. Return value is specified in the smallest units of the token.',
+        },
+
+        'paused': {
+            'title': 'Paused',
+            'description': 'If true any token transfers are disabled.',
+        },
+
+        'owner': {
+            'title': 'Owner',
+            'description': 'Address of the token owner.',
+        },
+
+        'm_totalDividends': {
+            'title': 'Total amount of dividends',
+            'description': 'Total amount of unrequested dividends in contract',
+        },
+
+        'm_emissions': {
+            'title': 'Get emission info',
+            'description': 'Get information about new token emission events. New emission is created each time the tokens are minted',
+        },
+
+        'm_lastAccountEmission': {
+            'title': 'Get last token emission id for address',
+            'description': 'Get information about last token emission to address',
+        },
+
+        'm_lastDividends': {
+            'title': 'Get last dividends for address',
+            'description': 'Get information about last dividends paid to address',
+        },
+
+        'm_totalHangingDividends': {
+            'title': 'Total amount of hanging dividends',
+            'description': 'Total amount of hanging dividends in case when transfer to stakeholder is impossible',
+        },
+
+        'm_magnifiedDividendPerShare': {
+            'title': 'Dividends per token',
+            'description': 'Total amount of dividends received per token, multiplied by 2**128',
+        },
+
+        'm_withdrawnDividends': {
+            'title': 'Get paid dividends for address',
+            'description': 'Total amount of dividends paid to address',
+        },
+
+        'm_unpaidDividends': {
+            'title': 'Get unpaid dividends for address',
+            'description': 'Dividends credited to address on transfers and not requested yet',
+        },
+
+        'dividendsOf': {
+            'title': 'Get pending dividends for address',
+            'description': 'Dividends the address receives on its next dividends request, and the number of token emissions left to process after it (while it is not 0, more requests are needed to receive all dividends)',
+            'inputs': [{
+                'title': 'Address',
+            }]
+        },
+
+        'requestDividends': {
+            'title': 'Request dividends',
+            'description': 'Request dividends to be payed to sender. Received dividents are calculated from sender\'s share in total tokens amount during every reveive of ETH by token contract',
+        },
+
+        'requestHangingDividends': {
+            'title': 'Request hanging dividends',
+            'description': 'Internal. Request dividends, that was unable to pay to stakeholder, for example if transfer of ether to stakeholder\'s address was unsuccessful. Haning ether will be returned to contract owner. This function is allowed only for owner.',
+        },
+
+        '': {
+            'title': 'Deposit',
+            'description': 'Transfer ether to contract',
         }
-
-        return (true, dividends, lastAccountEmissionNum);
     }
 
-    function getLastEmissionNum() private view returns (uint256) {
-        return m_emissions.length - 1;
+    _DASHBOARD_FUNCTIONS = ('symbol', 'totalSupply', 'dividendsOf')
+
+    # post_construct() results by ABI hash
+    POST_CONSTRUCT_CACHE = LRUCache(256)
+
+    # contracts Token may inherit; a variant's source contains only the contracts its parent needs
+    _FRAGMENTS = Fragments('dividend_token/fragments', (
+        ('pragma', ()),
+        ('SafeMath', ('pragma',)),
+        ('Ownable', ('pragma',)),
+        ('ERC20Basic', ('pragma',)),
+        ('ERC20', ('ERC20Basic',)),
+        ('BasicToken', ('ERC20Basic', 'SafeMath')),
+        ('StandardToken', ('ERC20', 'BasicToken')),
+        ('MintableToken', ('StandardToken', 'Ownable')),
+        ('Pausable', ('Ownable',)),
+        ('DividendToken', ('StandardToken', 'Ownable', 'SafeMath')),
+        ('PullDividendToken', ('DividendToken',)),
+        ('MintableDividendToken', ('DividendToken', 'MintableToken')),
+        ('CappedDividendToken', ('MintableDividendToken',)),
+        ('PausableDividendToken', ('DividendToken', 'Pausable')),
+        ('PausableMintableDividendToken', ('PausableDividendToken', 'MintableDividendToken')),
+        ('PausableCappedDividendToken', ('PausableDividendToken', 'CappedDividendToken')),
+    ))
+
+    # variant name -> (parent of Token or DividendToken, accounting, payout, layout)
+    _VARIANT_KEYS = {
+        variant_name(*key): key for key in itertools.product(VARIANTS, ACCOUNTINGS, PAYOUTS, LAYOUTS)
+        if key[1] == 'emissions' or key[3] == 'unpacked'
     }
 
-    /// @dev to prevent gasLimit problems with many mintings
-    function getMaxIterationsForRequestDividends() internal pure returns (uint256) {
-        return 200;
+    _VARIANT_ROOTS = {
+        name: ('DividendToken', parent) + (('PullDividendToken',) if payout == 'pull' else ())
+        for name, (parent, _, payout, _) in _VARIANT_KEYS.items()
     }
 
-    /// @notice record of issued dividend emissions
-    EmissionInfo[] public m_emissions;
-
-    /// @dev for each token holder: last emission (index in m_emissions) which was processed for this holder
-    mapping(address => uint256) public m_lastAccountEmission;
-
-    /// @dev for each token holder: last ether balance was when requested dividends
-    mapping(address => uint256) public m_lastDividends;
-
-
-    uint256 public m_totalHangingDividends;
-    uint256 public m_totalDividends;
-}
-
-
-contract MintableDividendToken is DividendToken, MintableToken {
-    event EmissionHappened(uint256 totalSupply, uint256 totalBalanceWas);
-
-    function mint(address _to, uint256 _amount) onlyOwner canMint public returns (bool) {
-        payDividendsTo(_to);
-        
-        bool res = super.mint(_to, _amount);
-
-        m_emissions.push(EmissionInfo({
-            totalSupply: totalSupply_,
-            totalBalanceWas: m_totalDividends
-        }));
-
-        emit EmissionHappened(totalSupply(), m_totalDividends);        
-        return res;
-    }
-}
-
-contract CappedDividendToken is MintableDividendToken {
-    uint256 public cap;
-
-    function CappedDividendToken(uint256 _cap) public {
-        require(_cap > 0);
-        cap = _cap;
-    }
-
-    /**
-     * @dev Function to mint tokens
-     * @param _to The address that will receive the minted tokens.
-     * @param _amount The amount of tokens to mint.
-     * @return A boolean that indicates if the operation was successful.
-     */
-    function mint(address _to, uint256 _amount) onlyOwner canMint public returns (bool) {
-        require(totalSupply_.add(_amount) <= cap);
-        
-        return super.mint(_to, _amount);
+    _VARIANT_REPLACED = {
+        name: _ACCOUNTING_FRAGMENTS[accounting] for name, (_, accounting, _, _) in _VARIANT_KEYS.items()
     }
-}
-
 
-contract PausableDividendToken is DividendToken, Pausable {
-    /// @notice Request dividends for current account.
-    function requestDividends() whenNotPaused public {
-        super.requestDividends();
+    _VARIANT_CONSTANTS = {
+        name: _LAYOUT_CONSTANTS[layout] if accounting == 'emissions' else {}
+        for name, (_, accounting, _, layout) in _VARIANT_KEYS.items()
     }
 
-    function transfer(address _to, uint256 _value) public whenNotPaused returns (bool) {
-        return super.transfer(_to, _value);
-    }
+    _RENDERERS = _FRAGMENTS.variants(_VARIANT_ROOTS, [
+        'dividend_token/token.sol'
+    ], ('name', 'symbol', 'decimals', 'parents_code', 'constructors_code', 'constructor_inner_code',
+        'max_iterations_code'),
+        replaced_by_variant=_VARIANT_REPLACED, constants_by_variant=_VARIANT_CONSTANTS)
 
-    function transferFrom(address _from, address _to, uint256 _value) public whenNotPaused returns (bool) {
-        return super.transferFrom(_from, _to, _value);
-    }
-
-    function approve(address _spender, uint256 _value) public whenNotPaused returns (bool) {
-        return super.approve(_spender, _value);
-    }
-
-    function increaseApproval(address _spender, uint _addedValue) public whenNotPaused returns (bool success) {
-        return super.increaseApproval(_spender, _addedValue);
-    }
-    
-    function decreaseApproval(address _spender, uint _subtractedValue) public whenNotPaused returns (bool success) {
-        return super.decreaseApproval(_spender, _subtractedValue);
-    }    
-}
-
-
-contract PausableMintableDividendToken is PausableDividendToken, MintableDividendToken {
-    function mint(address _to, uint256 _amount) whenNotPaused public returns (bool) {
-        return super.mint(_to, _amount);
-    }
-}
-
-
-contract PausableCappedDividendToken is PausableDividendToken, CappedDividendToken {
-    function PausableCappedDividendToken(uint256 _cap) 
-        public 
-        CappedDividendToken(_cap)
-    {
-    }
-    
-    function mint(address _to, uint256 _amount) whenNotPaused public returns (bool) {
-        return super.mint(_to, _amount);
-    }
-}
-
-
-contract Token is DividendToken %parents_code% {
-    string public constant name = '%name%';
-    string public constant symbol = '%symbol%';
-    uint8 public constant decimals = %decimals%;
-
-    function Token()
-        public
-        payable
-        %constructors_code%
-    {
-        %constructor_inner_code%
-        %payment_code%
-    }
-
-}
-
-
-    """
+    _ARGS_RENDERERS = _FRAGMENTS.variants(_VARIANT_ROOTS, [
+        'dividend_token/args_token.sol'
+    ], ('parents_code', 'cap_param', 'constructors_code', 'premint_emission_code'),
+        replaced_by_variant=_VARIANT_REPLACED, constants_by_variant=_VARIANT_CONSTANTS)
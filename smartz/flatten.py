@@ -0,0 +1,268 @@
+"""
+Flattens contracts to build/flattened/, replacing flatten.sh.
+
+    python -m smartz.flatten [--contracts contracts] [--output build/flattened] [--jobs N]
+                             [--remap prefix=path ...] [--external solidity_flattener]
+
+Builds the import graph of the contracts, and re-flattens only files whose content or transitive imports
+changed since the previous run (outputs are keyed by a hash of all sources they include, the keys are stored
+in <output>/.flatten-cache.json). Outputs of removed contracts are deleted.
+
+By default files are flattened in-process: imported files are concatenated in dependency order with import
+statements removed and pragmas deduplicated. --external runs the given solidity_flattener-compatible command
+per file instead, --jobs of them at a time.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+
+DEFAULT_REMAPPINGS = ('openzeppelin-solidity', 'zeppelin-solidity', 'mixbytes-solidity')
+
+CACHE_FILE = '.flatten-cache.json'
+
+# bumped when the output of the built-in flattener changes
+FLATTENER_VERSION = 1
+
+IMPORT_RE = re.compile(r'^[ \t]*import\s+(?:[^;"\']*?\s)?["\']([^"\']+)["\'][^;]*;[ \t]*(?:\r?\n)?', re.M)
+
+PRAGMA_RE = re.compile(r'^[ \t]*pragma\s[^;]*;[ \t]*(?:\r?\n)?', re.M)
+
+
+class FlattenError(Exception):
+    pass
+
+
+class SourceGraph:
+    """Solidity sources and their imports, resolved like solc does with `remappings` ({prefix: directory})."""
+
+    def __init__(self, base_dir='.', remappings=None):
+        self.base_dir = os.path.abspath(base_dir)
+        self.remappings = sorted((remappings or {}).items(), key=lambda item: -len(item[0]))
+
+        self._sources = {}
+        self._hashes = {}
+        self._imports = {}
+        self._closures = {}
+
+    def resolve(self, importer, path):
+        if path.startswith('./') or path.startswith('../'):
+            return os.path.normpath(os.path.join(os.path.dirname(importer), path))
+        for prefix, directory in self.remappings:
+            if path.startswith(prefix):
+                return os.path.normpath(os.path.join(os.path.abspath(directory), path[len(prefix):].lstrip('/')))
+        return os.path.normpath(os.path.join(self.base_dir, path))
+
+    def source(self, path):
+        text = self._sources.get(path)
+        if text is None:
+            try:
+                with open(path, 'rb') as fh:
+                    data = fh.read()
+            except OSError as exc:
+                raise FlattenError('failed to read {}: {}'.format(path, exc.strerror))
+            text = self._sources[path] = data.decode('utf-8')
+            self._hashes[path] = hashlib.sha256(data).hexdigest()
+        return text
+
+    def imports(self, path):
+        imports = self._imports.get(path)
+        if imports is None:
+            imports = self._imports[path] = tuple(
+                self.resolve(path, match.group(1)) for match in IMPORT_RE.finditer(self.source(path))
+            )
+        return imports
+
+    def closure(self, path):
+        """path and all files it imports transitively, dependencies first."""
+        path = os.path.abspath(path)
+        closure = self._closures.get(path)
+        if closure is None:
+            closure = []
+            visited = set()
+
+            def visit(current):
+                visited.add(current)
+                for imported in self.imports(current):
+                    if imported in visited:
+                        continue
+                    if not os.path.isfile(imported):
+                        raise FlattenError('{}: import not found: {}'.format(self.display_path(current), imported))
+                    visit(imported)
+                closure.append(current)
+
+            visit(path)
+            closure = self._closures[path] = tuple(closure)
+        return closure
+
+    def key(self, path, flattener='builtin'):
+        """Hash of everything which affects the flattened path."""
+        digest = hashlib.sha256('{}:{}\n'.format(flattener, FLATTENER_VERSION).encode('utf-8'))
+        for dependency in self.closure(path):
+            self.source(dependency)
+            digest.update('{} {}\n'.format(self.display_path(dependency), self._hashes[dependency]).encode('utf-8'))
+        return digest.hexdigest()
+
+    def display_path(self, path):
+        relative = os.path.relpath(path, self.base_dir)
+        return path if relative.startswith('..') else relative
+
+    def flatten(self, path):
+        """Source of path with all imports inlined."""
+        pragmas = []
+        parts = []
+        for dependency in self.closure(path):
+            text = self.source(dependency)
+            for match in PRAGMA_RE.finditer(text):
+                pragma = match.group(0).strip()
+                if pragma not in pragmas:
+                    pragmas.append(pragma)
+
+            body = PRAGMA_RE.sub('', IMPORT_RE.sub('', text)).strip()
+            parts.append('// File: {}\n\n{}\n'.format(self.display_path(dependency), body))
+
+        return '\n'.join(pragmas) + '\n\n\n' + '\n\n'.join(parts)
+
+
+def find_contracts(directory):
+    paths = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        paths.extend(os.path.join(root, name) for name in sorted(files) if name.endswith('.sol'))
+    return paths
+
+
+def _write(path, text):
+    tmp_path = '{}.tmp{}'.format(path, os.getpid())
+    with open(tmp_path, 'w', encoding='utf-8') as fh:
+        fh.write(text)
+    os.replace(tmp_path, path)
+
+
+def _run_external(command, graph, path, output_path, log_path):
+    args = [command, '--solc-allow-paths', graph.base_dir]
+    for prefix, directory in graph.remappings:
+        args.extend(['--solc-paths', '{}={}'.format(prefix, os.path.abspath(directory))])
+    args.extend(['--output', output_path, path])
+
+    with open(log_path, 'ab') as log:
+        subprocess.run(args, stdout=subprocess.DEVNULL, stderr=log, check=True)
+
+
+def flatten_all(contracts_dir, output_dir, remappings=None, jobs=None, external=None, base_dir='.'):
+    """
+    Flattens contracts_dir/**/*.sol into output_dir, skipping up-to-date outputs.
+    Returns (flattened, up_to_date, failed) lists of contract paths.
+    """
+    graph = SourceGraph(base_dir, remappings)
+    os.makedirs(output_dir, exist_ok=True)
+    cache_path = os.path.join(output_dir, CACHE_FILE)
+    log_path = os.path.join(output_dir, 'flatten.log')
+
+    try:
+        with open(cache_path) as fh:
+            cache = json.load(fh)
+    except (OSError, ValueError):
+        cache = {}
+
+    contracts = find_contracts(contracts_dir)
+    outputs = {}
+    for path in contracts:
+        name = os.path.basename(path)
+        if name in outputs:
+            raise FlattenError('{} and {} would be flattened to the same file'.format(outputs[name], path))
+        outputs[name] = path
+
+    # outputs of removed contracts
+    for name in set(cache) - set(outputs):
+        if os.path.exists(os.path.join(output_dir, name)):
+            os.unlink(os.path.join(output_dir, name))
+        del cache[name]
+
+    flattener = 'external:' + external if external else 'builtin'
+    up_to_date = []
+    stale = []
+    failed = []
+    keys = {}
+    for name, path in sorted(outputs.items()):
+        try:
+            keys[name] = graph.key(path, flattener)
+        except FlattenError as exc:
+            failed.append((path, str(exc)))
+            cache.pop(name, None)
+            continue
+
+        if cache.get(name) == keys[name] and os.path.exists(os.path.join(output_dir, name)):
+            up_to_date.append(path)
+        else:
+            stale.append(name)
+
+    def flatten_one(name):
+        path = outputs[name]
+        output_path = os.path.join(output_dir, name)
+        try:
+            if external:
+                _run_external(external, graph, path, output_path, log_path)
+            else:
+                _write(output_path, graph.flatten(path))
+        except (FlattenError, OSError, subprocess.CalledProcessError) as exc:
+            return name, str(exc)
+        return name, None
+
+    flattened = []
+    with ThreadPoolExecutor(jobs or os.cpu_count() or 1) as executor:
+        for name, error in executor.map(flatten_one, stale):
+            if error is None:
+                flattened.append(outputs[name])
+                cache[name] = keys[name]
+            else:
+                failed.append((outputs[name], error))
+                cache.pop(name, None)
+
+    _write(cache_path, json.dumps(cache, indent=1, sort_keys=True))
+    return flattened, up_to_date, failed
+
+
+def _remapping(value):
+    prefix, sep, directory = value.partition('=')
+    if not sep or not prefix:
+        raise argparse.ArgumentTypeError('expected prefix=path')
+    return prefix, directory
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Flatten contracts incrementally')
+    parser.add_argument('--contracts', default='contracts', help='directory of contracts to flatten')
+    parser.add_argument('--output', default=os.path.join('build', 'flattened'), help='output directory')
+    parser.add_argument('--jobs', type=int, help='files flattened at once (default: number of CPUs)')
+    parser.add_argument('--node-modules', default='node_modules',
+                        help='directory of {} packages'.format(', '.join(DEFAULT_REMAPPINGS)))
+    parser.add_argument('--remap', type=_remapping, action='append', default=[], metavar='PREFIX=PATH',
+                        help='import remapping, in addition to node modules packages')
+    parser.add_argument('--external', metavar='COMMAND', help='flatten with solidity_flattener-compatible COMMAND')
+    args = parser.parse_args(argv)
+
+    remappings = {name: os.path.join(args.node_modules, name) for name in DEFAULT_REMAPPINGS}
+    remappings.update(args.remap)
+
+    try:
+        flattened, up_to_date, failed = flatten_all(args.contracts, args.output, remappings, args.jobs, args.external)
+    except FlattenError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+
+    for path, error in failed:
+        print('failed to flatten {}: {}'.format(path, error), file=sys.stderr)
+    print('flattened {}, up to date {}, failed {}'.format(len(flattened), len(up_to_date), len(failed)),
+          file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""
+Usage and latency metrics of constructors in the Prometheus text format.
+
+    from smartz import metrics
+    metrics.enable()                      # observe calls in this process, see smartz.profiling
+    text = metrics.render()               # pull
+    metrics.start_http_server(9108)       # or serve GET /metrics from a daemon thread
+
+Exported metrics:
+
+    smartz_requests_total{constructor,method,result}       calls by result: success, error or exception
+    smartz_request_duration_seconds{constructor,method}    latency histogram
+    smartz_field_errors_total{constructor,method,field}    validation errors by field
+    smartz_variant_total{constructor,variant}              successful constructs by contract variant
+    smartz_owners{constructor}                             histogram of owner counts of successful constructs
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from smartz.profiling import add_hook, remove_hook
+
+
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+OWNERS_BUCKETS = (1, 2, 3, 5, 10, 25, 50, 100, 175, 250)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join('{}="{}"'.format(name, _escape(value)) for name, value in pairs) + '}'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount=1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues):
+        return self._values.get(labelvalues, 0)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self):
+        lines = ['# HELP {} {}'.format(self.name, self.documentation), '# TYPE {} counter'.format(self.name)]
+        with self._lock:
+            for labelvalues, value in sorted(self._values.items()):
+                lines.append('{}{} {}'.format(self.name, _labels(self.labelnames, labelvalues), _number(value)))
+        return lines
+
+
+class Histogram:
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+        # labelvalues -> [per-bucket counts (the last one is +Inf), sum]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labelvalues):
+        with self._lock:
+            entry = self._values.get(labelvalues)
+            if entry is None:
+                entry = self._values[labelvalues] = [[0] * (len(self.buckets) + 1), 0]
+
+            counts = entry[0]
+            for idx, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[idx] += 1
+                    break
+            else:
+                counts[-1] += 1
+            entry[1] += value
+
+    def count(self, *labelvalues):
+        entry = self._values.get(labelvalues)
+        return sum(entry[0]) if entry is not None else 0
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self):
+        lines = ['# HELP {} {}'.format(self.name, self.documentation), '# TYPE {} histogram'.format(self.name)]
+        with self._lock:
+            for labelvalues, (counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + ('+Inf',), counts):
+                    cumulative += count
+                    labels = _labels(self.labelnames, labelvalues, [('le', _number(bound))])
+                    lines.append('{}_bucket{} {}'.format(self.name, labels, cumulative))
+
+                labels = _labels(self.labelnames, labelvalues)
+                lines.append('{}_sum{} {}'.format(self.name, labels, _number(total)))
+                lines.append('{}_count{} {}'.format(self.name, labels, cumulative))
+        return lines
+
+
+REQUESTS = Counter('smartz_requests_total', 'Constructor calls', ('constructor', 'method', 'result'))
+
+DURATION = Histogram('smartz_request_duration_seconds', 'Constructor call latency', ('constructor', 'method'))
+
+FIELD_ERRORS = Counter('smartz_field_errors_total', 'Validation errors by field', ('constructor', 'method', 'field'))
+
+VARIANTS = Counter('smartz_variant_total', 'Successful constructs by contract variant', ('constructor', 'variant'))
+
+OWNERS = Histogram('smartz_owners', 'Number of owners of successful constructs', ('constructor',), OWNERS_BUCKETS)
+
+METRICS = (REQUESTS, DURATION, FIELD_ERRORS, VARIANTS, OWNERS)
+
+
+def constructor_name(constructor):
+    """'dividend_token' for an instance of smartz.dividend_token_constructor.Constructor."""
+    name = constructor.__class__.__module__.rsplit('.', 1)[-1]
+    return name[:-len('_constructor')] if name.endswith('_constructor') else name
+
+
+def observe(constructor, method, fields, result, seconds, error=None):
+    """
+    Records a call of constructor's `method` which returned `result` (or raised `error`, an exception class name).
+
+    Constructor-specific values come from the optional constructor.metric_values(fields) which is called for
+    successful constructs and may return 'variant' and 'owners'.
+    """
+    name = constructor_name(constructor)
+    if error is not None:
+        status = 'exception'
+    else:
+        status = result.get('result', 'error') if isinstance(result, dict) else 'error'
+
+    REQUESTS.inc(name, method, status)
+    DURATION.observe(seconds, name, method)
+
+    if status == 'error' and isinstance(result, dict):
+        for field in result.get('errors', ()):
+            FIELD_ERRORS.inc(name, method, field)
+    elif status == 'success' and method == 'construct' and hasattr(constructor, 'metric_values'):
+        values = constructor.metric_values(fields)
+        if 'variant' in values:
+            VARIANTS.inc(name, values['variant'])
+        if 'owners' in values:
+            OWNERS.observe(values['owners'], name)
+
+
+def _hook(record):
+    fields = record['args'][0] if record['args'] else None
+    observe(record['constructor'], record['method'], fields, record['result'], record['seconds'], record['error'])
+
+
+def enable():
+    """Starts observing constructor calls made in this process."""
+    add_hook(_hook)
+
+
+def disable():
+    remove_hook(_hook)
+
+
+def clear():
+    for metric in METRICS:
+        metric.clear()
+
+
+def render():
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+
+        body = render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_http_server(port, host='127.0.0.1'):
+    """Serves GET /metrics from a daemon thread, returns the server."""
+    server = HTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
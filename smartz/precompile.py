@@ -0,0 +1,91 @@
+"""
+Compiles the constructor_args mode variants of the dividend token ahead of time.
+
+    python -m smartz.precompile [--payment-code FILE] [--solc-js node_modules/solc] [--optimizer-runs 200]
+
+Artifacts are written to smartz/precompiled/dividend_token/<variant name>.json and are returned by
+dividend_token_constructor.Constructor.construct() (together with ABI-encoded constructor arguments)
+when its MODE is 'constructor_args'. An artifact is used only while the variant source it was built from
+is unchanged, so artifacts have to be rebuilt after template changes.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+from smartz.compiler import SolcWorker
+from smartz.dividend_token_constructor import Constructor
+
+
+def compile_standard_json(sources, solc_js, optimizer_runs):
+    """Compiles {name: source} with solc-js, returns standard JSON output."""
+    settings = {
+        'outputSelection': {'*': {'*': ['abi', 'evm.bytecode.object']}},
+    }
+    if optimizer_runs:
+        settings['optimizer'] = {'enabled': True, 'runs': optimizer_runs}
+
+    standard_input = {
+        'language': 'Solidity',
+        'sources': {name: {'content': source} for name, source in sources.items()},
+        'settings': settings,
+    }
+
+    worker = SolcWorker(solc_js)
+    try:
+        return worker.compile(standard_input)
+    finally:
+        worker.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Precompile dividend token variants')
+    parser.add_argument('--payment-code', help='file with Solidity code substituted for %%payment_code%%')
+    parser.add_argument('--solc-js', default=os.path.join('node_modules', 'solc'), help='path to solc-js package')
+    parser.add_argument('--optimizer-runs', type=int, default=200, help='0 disables optimizer')
+    parser.add_argument('--output', default=Constructor.PRECOMPILED_DIR, help='artifacts directory')
+    args = parser.parse_args(argv)
+
+    payment_code = ''
+    if args.payment_code:
+        with open(args.payment_code) as fh:
+            payment_code = fh.read()
+
+    templates = {}
+    sources = {}
+    for variant in Constructor.variant_names():
+        parent, accounting, payout, layout = Constructor.variant_key(variant)
+        template = Constructor.variant_source(None if parent == 'DividendToken' else parent, accounting, payout, layout)
+        templates[variant] = template
+        sources[variant + '.sol'] = template.replace('%payment_code%', payment_code)
+
+    output = compile_standard_json(sources, args.solc_js, args.optimizer_runs)
+
+    errors = [error for error in output.get('errors', ()) if error.get('severity') == 'error']
+    if errors:
+        for error in errors:
+            print(error.get('formattedMessage', error.get('message')), file=sys.stderr)
+        return 1
+
+    os.makedirs(args.output, exist_ok=True)
+    for variant, template in templates.items():
+        contract = output['contracts'][variant + '.sol']['Token']
+        artifact = {
+            'variant': variant,
+            'source_sha256': hashlib.sha256(template.encode('utf-8')).hexdigest(),
+            'payment_code_sha256': hashlib.sha256(payment_code.encode('utf-8')).hexdigest(),
+            'optimizer_runs': args.optimizer_runs,
+            'abi': contract['abi'],
+            'bytecode': contract['evm']['bytecode']['object'],
+        }
+        with open(os.path.join(args.output, variant + '.json'), 'w') as fh:
+            json.dump(artifact, fh, indent=2, sort_keys=True)
+        print('{}: {} bytes of bytecode'.format(variant, len(artifact['bytecode']) // 2))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
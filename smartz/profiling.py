@@ -0,0 +1,277 @@
+"""
+Opt-in instrumentation of constructor calls.
+
+validate(), construct() and post_construct() calls are split into phases (validate, cache_key, variant, render,
+placeholder_check, specs). While hooks are registered each call produces a record:
+
+    {
+        'call': 'smartz.dividend_token_constructor.construct',
+        'constructor': <Constructor instance>,
+        'method': 'construct',
+        'args': (fields,),
+        'result': {...},        # None if the call raised
+        'error': None,          # exception class name if the call raised
+        'seconds': 0.00021,
+        'blocks': 37,           # net number of memory blocks allocated during the call
+        'phases': {'validate': {'seconds': 0.00004, 'blocks': 0, 'count': 1}, ...},
+    }
+
+which is passed to every hook. Phases may nest (placeholder_check is a part of render), their timings
+are inclusive and repeated phases are summed up.
+
+    with instrumented(records.append, sample_every=100, directory='/tmp/profiles'):
+        ...
+
+Sampling runs every N-th call under cProfile and dumps the stats to directory/<call>-<pid>-<n>.prof.
+Instrumented functions are swapped for their timing wrappers only while hooks or sampling are enabled,
+so disabled instrumentation costs nothing.
+
+asyncio counterparts of the methods (construct_async() etc., see smartz.aio) are reported as calls of the
+synchronous method ('method': 'construct'). Their records hold the wall time of the whole call, and phases
+only of the work done inline in the event loop; they aren't sampled.
+"""
+
+import contextlib
+import functools
+import itertools
+import os
+import sys
+import threading
+import time
+
+
+_hooks = []
+_sampling = None  # (every, directory, counter, profiler class)
+_active = False
+_lock = threading.Lock()
+# record of the instrumented call in progress, per thread and per asyncio task;
+# a contextvars.ContextVar created on the first activation, wrappers aren't installed before that
+_record = None
+
+# code flag of `async def` functions
+_CO_COROUTINE = 0x80
+
+# functions decorated by instrumented_call() and phase()
+_instrumented = []
+
+
+class _Instrumented:
+    """Original function plus its wrapper, installed in place of the function while instrumentation is active."""
+
+    def __init__(self, func, wrapper):
+        self.func = func
+        self.wrapper = wrapper
+        self.owner = None
+
+    def __set_name__(self, owner, name):
+        # methods: replace the marker in the class body with the function itself
+        self.owner = owner
+        self.install()
+
+    def install(self):
+        target = self.wrapper if _active else self.func
+        if self.owner is not None:
+            setattr(self.owner, self.func.__name__, target)
+            return
+
+        # module-level functions: patch the defining module and modules which imported the function
+        for module in list(sys.modules.values()):
+            namespace = getattr(module, '__dict__', None)
+            if namespace is not None and namespace.get(self.func.__name__) in (self.func, self.wrapper):
+                namespace[self.func.__name__] = target
+
+
+def _unwrap(func):
+    """Allows stacking of decorators: returns the original function and the function to call."""
+    if isinstance(func, _Instrumented):
+        _instrumented.remove(func)
+        return func.func, func.wrapper
+    return func, func
+
+
+def _instrument(func, wrapper):
+    functools.update_wrapper(wrapper, func)
+    instrumented = _Instrumented(func, wrapper)
+    _instrumented.append(instrumented)
+    if func.__qualname__ != func.__name__:
+        # defined in a class body, __set_name__ follows
+        return instrumented
+    return wrapper if _active else func
+
+
+def _is_async(func):
+    return bool(func.__code__.co_flags & _CO_COROUTINE)
+
+
+def _update():
+    global _active, _record
+    active = bool(_hooks) or _sampling is not None
+    if active and _record is None:
+        import contextvars
+        _record = contextvars.ContextVar('smartz_profiling_record', default=None)
+    if active != _active:
+        _active = active
+        for instrumented in _instrumented:
+            instrumented.install()
+
+
+def add_hook(callback):
+    """Registers callback(record) called after each instrumented call."""
+    with _lock:
+        _hooks.append(callback)
+        _update()
+
+
+def remove_hook(callback):
+    with _lock:
+        _hooks.remove(callback)
+        _update()
+
+
+def sample_profiles(every, directory=None):
+    """Runs every `every`-th call under cProfile, dumping stats to `directory`; every=None disables sampling."""
+    global _sampling
+    with _lock:
+        if every is None:
+            _sampling = None
+        else:
+            if every < 1:
+                raise ValueError('every must be positive')
+            os.makedirs(directory, exist_ok=True)
+            import cProfile
+            _sampling = (every, directory, itertools.count(1), cProfile.Profile)
+        _update()
+
+
+@contextlib.contextmanager
+def instrumented(callback=None, sample_every=None, directory=None):
+    """Enables the hook and/or profile sampling for the duration of the block."""
+    if callback is not None:
+        add_hook(callback)
+    if sample_every is not None:
+        sample_profiles(sample_every, directory)
+    try:
+        yield
+    finally:
+        if sample_every is not None:
+            sample_profiles(None)
+        if callback is not None:
+            remove_hook(callback)
+
+
+def _new_record(instance, func, args):
+    method = func.__name__
+    if _is_async(func) and method.endswith('_async'):
+        method = method[:-len('_async')]
+    return {
+        'call': '{}.{}'.format(instance.__class__.__module__, method), 'constructor': instance, 'method': method,
+        'args': args, 'result': None, 'error': None, 'phases': {},
+    }
+
+
+def _report(record):
+    for hook in list(_hooks):
+        hook(record)
+
+
+def instrumented_call(func):
+    """Decorates a constructor method (or its asyncio counterpart), each call of which is reported to hooks."""
+    func, call = _unwrap(func)
+
+    if _is_async(func):
+        async def async_wrapper(self, *args, **kwargs):
+            if _record.get() is not None:
+                return await call(self, *args, **kwargs)
+
+            record = _new_record(self, func, args)
+            token = _record.set(record)
+            blocks = sys.getallocatedblocks()
+            started = time.perf_counter()
+            try:
+                record['result'] = await call(self, *args, **kwargs)
+                return record['result']
+            except BaseException as exc:
+                record['error'] = exc.__class__.__name__
+                raise
+            finally:
+                record['seconds'] = time.perf_counter() - started
+                record['blocks'] = sys.getallocatedblocks() - blocks
+                _record.reset(token)
+                _report(record)
+
+        return _instrument(func, async_wrapper)
+
+    def wrapper(self, *args, **kwargs):
+        if _record.get() is not None:
+            return call(self, *args, **kwargs)
+
+        record = _new_record(self, func, args)
+        name = record['call']
+        sampling = _sampling
+        profile = None
+        if sampling is not None:
+            sample = next(sampling[2])
+            if sample % sampling[0] == 0:
+                profile = sampling[3]()
+
+        token = _record.set(record)
+        blocks = sys.getallocatedblocks()
+        started = time.perf_counter()
+        try:
+            if profile is None:
+                record['result'] = call(self, *args, **kwargs)
+            else:
+                record['result'] = profile.runcall(call, self, *args, **kwargs)
+            return record['result']
+        except BaseException as exc:
+            record['error'] = exc.__class__.__name__
+            raise
+        finally:
+            record['seconds'] = time.perf_counter() - started
+            record['blocks'] = sys.getallocatedblocks() - blocks
+            _record.reset(token)
+
+            if profile is not None:
+                profile.dump_stats(os.path.join(sampling[1], '{}-{}-{}.prof'.format(name, os.getpid(), sample)))
+            _report(record)
+
+    return _instrument(func, wrapper)
+
+
+def uninstrumented(method):
+    """
+    The function behind a method decorated by instrumented_call(), for calls which are reported by their caller
+    (e.g. work of an asyncio method done in an executor thread).
+    """
+    for instrumented in _instrumented:
+        if method is instrumented.func or method is instrumented.wrapper:
+            return instrumented.func
+    return method
+
+
+def phase(name):
+    """Decorates a function or method as a phase of instrumented calls."""
+
+    def decorator(func):
+        func, call = _unwrap(func)
+
+        def wrapper(*args, **kwargs):
+            record = _record.get()
+            if record is None:
+                return call(*args, **kwargs)
+
+            blocks = sys.getallocatedblocks()
+            started = time.perf_counter()
+            try:
+                return call(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                allocated = sys.getallocatedblocks() - blocks
+                stats = record['phases'].setdefault(name, {'seconds': 0.0, 'blocks': 0, 'count': 0})
+                stats['seconds'] += elapsed
+                stats['blocks'] += allocated
+                stats['count'] += 1
+
+        return _instrument(func, wrapper)
+
+    return decorator
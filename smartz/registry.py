@@ -0,0 +1,96 @@
+import gc
+import glob
+import importlib
+import os
+import threading
+
+from smartz.template import Template, TemplateVariants
+from smartz.validator import schema_validator
+
+
+CONSTRUCTOR_SUFFIX = '_constructor'
+
+
+class ConstructorRegistry:
+    """
+    Finds constructor modules (<name>_constructor.py in the smartz package) without importing them.
+
+    Modules are imported on first use; warm_up() loads all of them together with their cached schemas,
+    compiled validators and parsed templates, e.g. in a parent process before forking workers.
+    """
+
+    def __init__(self, directory=None, package='smartz'):
+        self.directory = directory or os.path.dirname(os.path.abspath(__file__))
+        self.package = package
+
+        self._constructors = {}
+        self._lock = threading.RLock()
+
+    def names(self):
+        """Names of available constructors, e.g. 'dividend_token' for dividend_token_constructor.py."""
+        pattern = os.path.join(self.directory, '*{}.py'.format(CONSTRUCTOR_SUFFIX))
+        return sorted(os.path.basename(path)[:-len(CONSTRUCTOR_SUFFIX) - 3] for path in glob.glob(pattern))
+
+    def __contains__(self, name):
+        return self._normalize(name) in self.names()
+
+    @staticmethod
+    def _normalize(name):
+        return name[:-len(CONSTRUCTOR_SUFFIX)] if name.endswith(CONSTRUCTOR_SUFFIX) else name
+
+    def get(self, name):
+        """Constructor instance by name (with or without the _constructor suffix), imported on first use."""
+        name = self._normalize(name)
+        constructor = self._constructors.get(name)
+        if constructor is None:
+            with self._lock:
+                constructor = self._constructors.get(name)
+                if constructor is None:
+                    if name not in self.names():
+                        raise KeyError('unknown constructor: {}'.format(name))
+
+                    module = importlib.import_module('{}.{}{}'.format(self.package, name, CONSTRUCTOR_SUFFIX))
+                    constructor = module.Constructor()
+                    self._constructors[name] = constructor
+        return constructor
+
+    def loaded(self):
+        """Names of constructors imported so far."""
+        return sorted(self._constructors)
+
+    def reload(self):
+        """Re-imports loaded constructor modules (picking up code and template changes), returns their names."""
+        with self._lock:
+            names = self.loaded()
+            for name in names:
+                importlib.reload(importlib.import_module('{}.{}{}'.format(self.package, name, CONSTRUCTOR_SUFFIX)))
+            self._constructors.clear()
+        return names
+
+    def warm_up(self, names=None, freeze=False):
+        """
+        Imports constructors and builds everything they cache lazily: get_params()/get_version() payloads,
+        compiled validators and templates.
+
+        freeze=True moves all objects created so far to the permanent GC generation (gc.freeze()),
+        so that garbage collection in forked workers doesn't touch and copy shared pages.
+        """
+        for name in (names if names is not None else self.names()):
+            constructor = self.get(name)
+            cls = constructor.__class__
+
+            cls.get_params.payload(cls)
+            cls.get_version.payload(cls)
+            schema_validator(cls)
+
+            for attr in dir(cls):
+                value = getattr(cls, attr, None)
+                if isinstance(value, (Template, TemplateVariants)):
+                    value.load()
+
+        if freeze:
+            gc.freeze()
+
+
+# registry of constructors of the smartz package
+registry = ConstructorRegistry()
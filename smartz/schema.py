@@ -0,0 +1,73 @@
+import functools
+import hashlib
+import json
+
+
+class FrozenDict(dict):
+    """dict which rejects modification; still serializable by json and picklable."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError('{} is read-only'.format(self.__class__.__name__))
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _readonly
+    __ior__ = _readonly
+
+    def __reduce__(self):
+        return self.__class__, (dict(self),)
+
+
+class FrozenList(list):
+    """list which rejects modification; still a list for json, jsonschema and equality with plain lists."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError('{} is read-only'.format(self.__class__.__name__))
+
+    __setitem__ = __delitem__ = append = extend = insert = pop = remove = clear = sort = reverse = _readonly
+    __iadd__ = __imul__ = _readonly
+
+    def __reduce__(self):
+        return self.__class__, (list(self),)
+
+
+def freeze(value):
+    """Recursively converts dicts to FrozenDict and lists (and tuples) to FrozenList."""
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return FrozenList(freeze(item) for item in value)
+    return value
+
+
+class Payload:
+    """Read-only result of a constructor method together with its JSON encoding and ETag."""
+
+    def __init__(self, data):
+        self.data = freeze(data)
+        self.json = json.dumps(self.data, separators=(',', ':')).encode('utf-8')
+        self.etag = hashlib.sha256(self.json).hexdigest()
+
+
+def static_payload(build):
+    """
+    Method decorator for constructor methods whose result depends only on the class (get_params, get_version).
+
+    The method is evaluated once per class, later calls return the same frozen data.
+    The full Payload is available as Constructor.<method>.payload(constructor_or_class).
+    """
+    attr = '_{}_payload'.format(build.__name__)
+
+    def payload(instance_or_class):
+        cls = instance_or_class if isinstance(instance_or_class, type) else instance_or_class.__class__
+        result = cls.__dict__.get(attr)
+        if result is None:
+            instance = cls.__new__(cls) if instance_or_class is cls else instance_or_class
+            result = Payload(build(instance))
+            setattr(cls, attr, result)
+        return result
+
+    @functools.wraps(build)
+    def wrapper(self):
+        return payload(self).data
+
+    wrapper.payload = payload
+    return wrapper
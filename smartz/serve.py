@@ -0,0 +1,284 @@
+"""
+Long-running constructor service.
+
+    python -m smartz.serve [--unix PATH | --host 127.0.0.1 --port 8090] [--workers N] [--queue-size 16] [--timeout 30]
+
+Constructors are imported and warmed up once, then a pool of worker processes is forked from the warm parent.
+HTTP API (JSON bodies and responses):
+
+    GET  /                              list of constructors
+    GET  /metrics                       usage and latency metrics in the Prometheus text format
+    GET  /<constructor>/params          get_params(), supports ETag / If-None-Match
+    GET  /<constructor>/version         get_version(), supports ETag / If-None-Match
+    POST /<constructor>/validate        body: fields
+    POST /<constructor>/construct       body: fields
+    POST /<constructor>/post_construct  body: {"fields": {...}, "abi": [...]}
+
+params and version are served by the front process without touching workers. At most
+workers * queue-size requests wait for workers, the rest get 503 with Retry-After.
+SIGHUP gracefully reloads constructors: new workers are spawned and load the reloaded constructors while
+requests accepted by old workers complete. SIGTERM / SIGINT stop accepting requests and drain the pool.
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import socketserver
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from smartz import metrics
+from smartz.registry import registry
+
+
+logger = logging.getLogger('smartz.serve')
+
+_WORKER_METHODS = {
+    'validate': lambda constructor, body: constructor.validate(body),
+    'construct': lambda constructor, body: constructor.construct(body),
+    'post_construct': lambda constructor, body: constructor.post_construct(body.get('fields'), body.get('abi')),
+}
+
+
+def _run(name, method, body):
+    """Executed in worker processes."""
+    return _WORKER_METHODS[method](registry.get(name), body)
+
+
+def _warm_up():
+    """Initializer of spawned worker processes."""
+    registry.warm_up()
+
+
+class ConstructorService:
+    """Warm constructors plus a bounded pool of worker processes."""
+
+    def __init__(self, workers=None, queue_size=16, timeout=30):
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(self.workers * queue_size)
+        self._pool_lock = threading.Lock()
+        # reloads run one at a time; _reload_waiting is held by a requested reload which hasn't started yet
+        self._reload_lock = threading.RLock()
+        self._reload_waiting = threading.Lock()
+
+        registry.warm_up()
+        self._names = registry.names()
+        # no threads are running yet, so workers can be forked from the warmed-up parent
+        self._pool = self._start_pool('fork')
+
+    def _start_pool(self, start_method):
+        """Starts all workers now; workers which aren't forked warm up on their own."""
+        pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context(start_method),
+                                   initializer=None if start_method == 'fork' else _warm_up)
+        for future in [pool.submit(os.getpid) for _ in range(self.workers)]:
+            future.result()
+        return pool
+
+    def reload(self):
+        """Reloads constructors and starts new workers with them; concurrent calls run one by one."""
+        with self._reload_lock:
+            names = registry.reload()
+            registry.warm_up()
+            self._names = registry.names()
+            # forking a process with running server and pool threads may copy locks held by them
+            new_pool = self._start_pool('spawn')
+
+            with self._pool_lock:
+                old_pool, self._pool = self._pool, new_pool
+
+            # requests already submitted to old workers are completed
+            threading.Thread(target=old_pool.shutdown, kwargs={'wait': True}, daemon=True).start()
+            logger.info('reloaded constructors: %s', ', '.join(names))
+
+    def request_reload(self):
+        """
+        reload() in a background thread, for the SIGHUP handler. Requests made while another one waits to start
+        are coalesced with it, so a burst of signals results in at most one reload after the running one.
+        """
+        if not self._reload_waiting.acquire(blocking=False):
+            return
+
+        def run():
+            with self._reload_lock:
+                self._reload_waiting.release()
+                self.reload()
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def shutdown(self):
+        with self._pool_lock:
+            self._pool.shutdown(wait=True)
+
+    def names(self):
+        return self._names
+
+    def payload(self, name, method):
+        constructor = registry.get(name)
+        return getattr(constructor.__class__, method).payload(constructor)
+
+    def call(self, name, method, body):
+        """Runs method in a worker. Returns result or None if the queue is full; may raise TimeoutError."""
+        if not self._slots.acquire(blocking=False):
+            return None
+
+        started = time.perf_counter()
+        fields = body.get('fields') if method == 'post_construct' and isinstance(body, dict) else body
+        try:
+            result = self._submit(name, method, body)
+        except Exception as exc:
+            metrics.observe(registry.get(name), method, fields, None, time.perf_counter() - started,
+                            exc.__class__.__name__)
+            raise
+
+        metrics.observe(registry.get(name), method, fields, result, time.perf_counter() - started)
+        return result
+
+    def _submit(self, name, method, body):
+        try:
+            with self._pool_lock:
+                future = self._pool.submit(_run, name, method, body)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result(self.timeout)
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    # set by make_server()
+    service = None
+
+    def address_string(self):
+        # client_address is empty for unix sockets
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        logger.debug('%s %s', self.address_string(), format % args)
+
+    def _send(self, status, body=b'', headers=(), content_type='application/json'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for header, value in headers:
+            self.send_header(header, value)
+        self.end_headers()
+        if body and self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def _send_json(self, status, data, headers=()):
+        self._send(status, json.dumps(data, separators=(',', ':')).encode('utf-8'), headers)
+
+    def _route(self):
+        parts = [part for part in self.path.split('?', 1)[0].split('/') if part]
+        if len(parts) != 2 or parts[0] not in self.service.names():
+            return None, None
+        return parts
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] in ('', '/'):
+            return self._send_json(200, {'result': 'success', 'constructors': self.service.names()})
+        if self.path.split('?', 1)[0] == '/metrics':
+            return self._send(200, metrics.render().encode('utf-8'), content_type=metrics.CONTENT_TYPE)
+
+        name, method = self._route()
+        if name is None or method not in ('params', 'version'):
+            return self._send_json(404, {'result': 'error', 'error': 'not found'})
+
+        payload = self.service.payload(name, 'get_' + method)
+        etag = '"{}"'.format(payload.etag)
+        if self.headers.get('If-None-Match') == etag:
+            return self._send(304, headers=[('ETag', etag)])
+        self._send(200, payload.json, [('ETag', etag)])
+
+    do_HEAD = do_GET
+
+    def do_POST(self):
+        name, method = self._route()
+        if name is None or method not in _WORKER_METHODS:
+            return self._send_json(404, {'result': 'error', 'error': 'not found'})
+
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))).decode('utf-8'))
+        except ValueError as exc:
+            return self._send_json(400, {'result': 'error', 'error': 'invalid JSON: {}'.format(exc)})
+        if method == 'post_construct' and not isinstance(body, dict):
+            return self._send_json(400, {'result': 'error', 'error': 'body must be an object'})
+
+        try:
+            result = self.service.call(name, method, body)
+        except TimeoutError:
+            return self._send_json(504, {'result': 'error', 'error': 'timeout'})
+        except Exception as exc:
+            logger.exception('%s.%s failed', name, method)
+            return self._send_json(500, {'result': 'error', 'error': '{}: {}'.format(exc.__class__.__name__, exc)})
+
+        if result is None:
+            return self._send_json(503, {'result': 'error', 'error': 'overloaded'}, [('Retry-After', '1')])
+        self._send_json(200, result)
+
+
+class ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def make_server(service, host='127.0.0.1', port=8090, unix=None):
+    handler = type('BoundRequestHandler', (RequestHandler,), {'service': service})
+    if unix:
+        if os.path.exists(unix):
+            os.unlink(unix)
+        return ThreadingUnixHTTPServer(unix, handler)
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve smartz constructors')
+    parser.add_argument('--unix', help='listen on this unix socket instead of TCP')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--workers', type=int, help='worker processes (default: number of CPUs)')
+    parser.add_argument('--queue-size', type=int, default=16, help='pending requests per worker')
+    parser.add_argument('--timeout', type=float, default=30, help='seconds to wait for a worker result')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(name)s %(levelname)s %(message)s')
+
+    service = ConstructorService(args.workers, args.queue_size, args.timeout)
+    server = make_server(service, args.host, args.port, args.unix)
+
+    def stop(signum, frame):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGHUP, lambda signum, frame: service.request_reload())
+
+    logger.info('serving %s with %d workers on %s', ', '.join(service.names()), service.workers,
+                args.unix or '{}:{}'.format(args.host, args.port))
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        service.shutdown()
+        if args.unix and os.path.exists(args.unix):
+            os.unlink(args.unix)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
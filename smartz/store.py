@@ -0,0 +1,271 @@
+"""
+Content-addressed on-disk store of generated sources and their compiled artifacts.
+
+    store = SourceStore('/var/lib/smartz/sources', template_prefixes())
+    key = store.put(result['source'])
+    with store.open(key) as stored:
+        data = stored.read()
+
+Sources are keyed by the SHA-256 of their UTF-8 text and split into chunks: the longest known template prefix
+(SafeMath, ERC20, Ownable, ... which every source of a constructor starts with) and the per-request suffix.
+Chunks are stored once by their own hash, so the shared prefix takes disk space only once.
+
+Layout:
+
+    chunks/<sha256>                     chunk data, never modified
+    sources/<key>/<n>-<chunk sha256>    hard links to the chunks of the source, in order
+    sources/<key>/refs                  reference count of the source
+    sources/<key>/artifacts-<tag>.json  compiled artifacts, see smartz.compiler.CompilePool
+
+The link count of a chunk file is the number of sources using it plus one, so release() of the last reference
+to a source deletes the chunks nobody else uses. Mutations are serialized by a lock file and are safe for
+concurrent processes; reads are lock-free and memory-map the chunks.
+"""
+
+import fcntl
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+from smartz.registry import registry
+from smartz.template import Template, TemplateVariants
+
+
+def template_prefixes(names=None):
+    """Prefixes of templates of constructors (all registered constructors by default)."""
+    prefixes = set()
+    for name in (names if names is not None else registry.names()):
+        cls = registry.get(name).__class__
+        for attr in dir(cls):
+            value = getattr(cls, attr, None)
+            if isinstance(value, (Template, TemplateVariants)):
+                prefixes.update(template.prefix for template in value.templates() if template.prefix)
+    return sorted(prefixes, key=len, reverse=True)
+
+
+class StoredSource:
+    """Memory-mapped chunks of a stored source; use as a context manager or close()."""
+
+    def __init__(self, key, paths):
+        self.key = key
+        self._maps = []
+        for path in paths:
+            with open(path, 'rb') as fh:
+                try:
+                    self._maps.append(mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ))
+                except ValueError:
+                    # empty files can't be mapped
+                    self._maps.append(b'')
+
+    def segments(self):
+        """Chunks of the source as read-only memoryviews, without copying."""
+        return [memoryview(chunk) for chunk in self._maps]
+
+    def __len__(self):
+        return sum(len(chunk) for chunk in self._maps)
+
+    def read(self):
+        return b''.join(self._maps)
+
+    def text(self):
+        return self.read().decode('utf-8')
+
+    def close(self):
+        for chunk in self._maps:
+            if isinstance(chunk, mmap.mmap):
+                chunk.close()
+        self._maps = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SourceStore:
+
+    def __init__(self, directory, prefixes=()):
+        self.directory = directory
+        self.prefixes = sorted((prefix.encode('utf-8') if isinstance(prefix, str) else bytes(prefix)
+                                for prefix in prefixes), key=len, reverse=True)
+
+        self._chunks_dir = os.path.join(directory, 'chunks')
+        self._sources_dir = os.path.join(directory, 'sources')
+        os.makedirs(self._chunks_dir, exist_ok=True)
+        os.makedirs(self._sources_dir, exist_ok=True)
+
+    @staticmethod
+    def key(source):
+        data = source.encode('utf-8') if isinstance(source, str) else source
+        return hashlib.sha256(data).hexdigest()
+
+    def _source_dir(self, key):
+        return os.path.join(self._sources_dir, key)
+
+    @contextmanager
+    def _locked(self):
+        with open(os.path.join(self.directory, '.lock'), 'a') as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _split(self, data):
+        for prefix in self.prefixes:
+            if len(data) > len(prefix) and data.startswith(prefix):
+                return [prefix, data[len(prefix):]]
+        return [data]
+
+    def _write_chunk(self, chunk):
+        chunk_hash = hashlib.sha256(chunk).hexdigest()
+        path = os.path.join(self._chunks_dir, chunk_hash)
+        if not os.path.exists(path):
+            fd, tmp_path = tempfile.mkstemp(dir=self._chunks_dir, prefix='.tmp-')
+            with os.fdopen(fd, 'wb') as fh:
+                fh.write(chunk)
+            os.replace(tmp_path, path)
+        return chunk_hash, path
+
+    @staticmethod
+    def _read_refs(source_dir):
+        with open(os.path.join(source_dir, 'refs')) as fh:
+            return int(fh.read())
+
+    @staticmethod
+    def _write_refs(source_dir, refs):
+        tmp_path = os.path.join(source_dir, '.refs.tmp')
+        with open(tmp_path, 'w') as fh:
+            fh.write(str(refs))
+        os.replace(tmp_path, os.path.join(source_dir, 'refs'))
+
+    def put(self, source):
+        """Stores source (str or bytes), or adds a reference to an already stored one. Returns its key."""
+        data = source.encode('utf-8') if isinstance(source, str) else bytes(source)
+        key = self.key(data)
+        source_dir = self._source_dir(key)
+
+        with self._locked():
+            if os.path.isdir(source_dir):
+                self._write_refs(source_dir, self._read_refs(source_dir) + 1)
+                return key
+
+            tmp_dir = tempfile.mkdtemp(dir=self._sources_dir, prefix='.tmp-')
+            for idx, chunk in enumerate(self._split(data)):
+                chunk_hash, chunk_path = self._write_chunk(chunk)
+                os.link(chunk_path, os.path.join(tmp_dir, '{}-{}'.format(idx, chunk_hash)))
+            self._write_refs(tmp_dir, 1)
+            os.rename(tmp_dir, source_dir)
+        return key
+
+    def __contains__(self, key):
+        return os.path.isdir(self._source_dir(key))
+
+    def refs(self, key):
+        return self._read_refs(self._source_dir(key)) if key in self else 0
+
+    def _chunk_links(self, key):
+        source_dir = self._source_dir(key)
+        try:
+            names = [name for name in os.listdir(source_dir) if name[0].isdigit()]
+        except FileNotFoundError:
+            raise KeyError(key)
+        names.sort(key=lambda name: int(name.partition('-')[0]))
+        return [os.path.join(source_dir, name) for name in names]
+
+    def open(self, key):
+        """StoredSource of key; raises KeyError if the source isn't stored."""
+        return StoredSource(key, self._chunk_links(key))
+
+    def get(self, key):
+        """Source text of key."""
+        with self.open(key) as stored:
+            return stored.text()
+
+    def release(self, key):
+        """Drops a reference to the source, deletes it and chunks nobody else uses with the last one."""
+        source_dir = self._source_dir(key)
+        with self._locked():
+            if not os.path.isdir(source_dir):
+                raise KeyError(key)
+
+            refs = self._read_refs(source_dir) - 1
+            if refs > 0:
+                self._write_refs(source_dir, refs)
+                return refs
+
+            chunk_hashes = [os.path.basename(path).partition('-')[2] for path in self._chunk_links(key)]
+            shutil.rmtree(source_dir)
+            for chunk_hash in chunk_hashes:
+                self._release_chunk(chunk_hash)
+        return 0
+
+    def _release_chunk(self, chunk_hash):
+        path = os.path.join(self._chunks_dir, chunk_hash)
+        try:
+            if os.stat(path).st_nlink == 1:
+                os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    def collect(self):
+        """Deletes leftovers of interrupted writes and unreferenced chunks, returns number of deleted chunks."""
+        deleted = 0
+        with self._locked():
+            for name in os.listdir(self._sources_dir):
+                if name.startswith('.tmp-'):
+                    shutil.rmtree(os.path.join(self._sources_dir, name), ignore_errors=True)
+
+            for name in os.listdir(self._chunks_dir):
+                path = os.path.join(self._chunks_dir, name)
+                if name.startswith('.tmp-') or os.stat(path).st_nlink == 1:
+                    os.unlink(path)
+                    deleted += 1
+        return deleted
+
+    def put_artifacts(self, key, tag, artifacts):
+        """
+        Stores compiled artifacts (JSON-serializable) of a stored source under `tag` (e.g. compiler settings).
+        Raises KeyError if the source isn't stored.
+        """
+        source_dir = self._source_dir(key)
+        data = json.dumps(artifacts, sort_keys=True)
+
+        # under the lock, so that release() can't delete the source directory meanwhile
+        with self._locked():
+            if not os.path.isdir(source_dir):
+                raise KeyError(key)
+
+            fd, tmp_path = tempfile.mkstemp(dir=source_dir, prefix='.tmp-')
+            with os.fdopen(fd, 'w') as fh:
+                fh.write(data)
+            os.replace(tmp_path, os.path.join(source_dir, 'artifacts-{}.json'.format(tag)))
+
+    def artifacts(self, key, tag):
+        """Artifacts stored by put_artifacts() or None."""
+        try:
+            with open(os.path.join(self._source_dir(key), 'artifacts-{}.json'.format(tag))) as fh:
+                return json.load(fh)
+        except FileNotFoundError:
+            return None
+
+    def stats(self):
+        """Number of sources and chunks, bytes on disk in chunks and total size of stored sources."""
+        chunks = os.listdir(self._chunks_dir)
+        chunk_sizes = {name: os.stat(os.path.join(self._chunks_dir, name)).st_size for name in chunks}
+        sources = [name for name in os.listdir(self._sources_dir) if not name.startswith('.')]
+        source_bytes = 0
+        for key in sources:
+            source_bytes += sum(chunk_sizes.get(os.path.basename(path).partition('-')[2], 0)
+                                for path in self._chunk_links(key))
+        return {
+            'sources': len(sources),
+            'chunks': len(chunks),
+            'chunk_bytes': sum(chunk_sizes.values()),
+            'source_bytes': source_bytes,
+        }
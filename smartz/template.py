@@ -0,0 +1,253 @@
+import mmap
+import os
+import re
+import threading
+
+from smartz.profiling import phase
+
+
+# Solidity templates shipped with the package
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+
+
+class Template:
+    """
+    Solidity source template with %name% placeholders.
+
+    The text is split once into literal segments and placeholder slots, so rendering costs a single join
+    instead of a full copy of the template per substituted placeholder.
+    Placeholders listed in `passthrough` (e.g. %payment_code%, which is filled in by the constructor engine)
+    are kept as literal text, `constants` ({name: text}) are substituted once when the template is parsed,
+    e.g. to derive variants of a template which differ in a few lines.
+
+    Templates created by from_files() are read and checked on first use. Their files are memory-mapped
+    read-only, and byte_segments() serves literal parts straight from the mapping, so processes forked
+    from a warmed-up parent share these pages.
+    """
+
+    PLACEHOLDER_RE = re.compile(br'%([a-zA-Z_0-9]+)%')
+
+    def __init__(self, text, placeholders, passthrough=('payment_code',), constants=None):
+        self.placeholders = frozenset(placeholders)
+        self.passthrough = frozenset(passthrough)
+        self.constants = dict(constants or {})
+
+        self._paths = None
+        self._lock = threading.Lock()
+        self._parse([text.encode('utf-8')])
+
+    @classmethod
+    def from_files(cls, paths, placeholders, passthrough=('payment_code',), constants=None):
+        """Template which is the concatenation of files at `paths` (relative to TEMPLATES_DIR), loaded lazily."""
+        template = cls.__new__(cls)
+        template.placeholders = frozenset(placeholders)
+        template.passthrough = frozenset(passthrough)
+        template.constants = dict(constants or {})
+
+        template._paths = tuple(os.path.join(TEMPLATES_DIR, path) for path in paths)
+        template._lock = threading.Lock()
+        template._segments = None
+        return template
+
+    @property
+    def loaded(self):
+        return self._segments is not None
+
+    def load(self):
+        """Reads and checks template files, no-op for loaded templates."""
+        if self._segments is None:
+            with self._lock:
+                if self._segments is None:
+                    self._parse([self._map(path) for path in self._paths])
+        return self
+
+    @staticmethod
+    def _map(path):
+        with open(path, 'rb') as fh:
+            try:
+                return mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # empty files can't be mapped
+                return b''
+
+    def _parse(self, buffers):
+        byte_segments = []
+        slots = []
+        substituted = set()
+        for buffer in buffers:
+            view = memoryview(buffer)
+            literal_start = 0
+            for match in self.PLACEHOLDER_RE.finditer(buffer):
+                name = match.group(1).decode('ascii')
+                if name in self.passthrough:
+                    continue
+
+                byte_segments.append(view[literal_start:match.start()])
+                literal_start = match.end()
+                if name in self.constants:
+                    byte_segments.append(self.constants[name].encode('utf-8'))
+                    substituted.add(name)
+                    continue
+
+                slots.append((len(byte_segments), name))
+                byte_segments.append(None)
+            byte_segments.append(view[literal_start:])
+
+        found = frozenset(name for _, name in slots)
+        if found - self.placeholders:
+            raise AssertionError('not substituted: {}'.format(', '.join(sorted(found - self.placeholders))))
+        if self.placeholders - found:
+            raise AssertionError('failed to replace: {}'.format(', '.join(sorted(self.placeholders - found))))
+        if set(self.constants) - substituted:
+            raise AssertionError('failed to replace: {}'.format(', '.join(sorted(set(self.constants) - substituted))))
+
+        self._byte_segments = byte_segments
+        self._slots = slots
+        self._segments = [None if segment is None else str(segment, 'utf-8') for segment in byte_segments]
+
+    def templates(self):
+        return [self]
+
+    @property
+    def prefix(self):
+        """Literal text before the first placeholder, which every rendered source starts with (UTF-8 bytes)."""
+        self.load()
+        prefix = []
+        for segment in self._byte_segments:
+            if segment is None:
+                break
+            prefix.append(segment)
+        return b''.join(prefix)
+
+    @phase('placeholder_check')
+    def _check_values(self, values):
+        if len(values) != len(self.placeholders) or not self.placeholders.issuperset(values):
+            raise AssertionError('expected values for exactly: {}'.format(', '.join(sorted(self.placeholders))))
+
+    @phase('render')
+    def render(self, values):
+        """Renders template to a string. Values are strings or iterables of string segments."""
+        self.load()
+        self._check_values(values)
+
+        parts = list(self._segments)
+        for idx, name in self._slots:
+            value = values[name]
+            parts[idx] = value if isinstance(value, str) else ''.join(value)
+        return ''.join(parts)
+
+    def segments(self, values):
+        """
+        Renders template lazily: yields the template's own literal segments (shared, not copied)
+        interleaved with values. Values are strings or iterables of string segments.
+        """
+        self.load()
+        self._check_values(values)
+        return self._iter_segments(self._segments, values, lambda part: part)
+
+    def byte_segments(self, values):
+        """
+        Same as segments(), but yields UTF-8 bytes-like objects; literal parts of file templates are
+        memoryviews of the read-only mapping.
+        """
+        self.load()
+        self._check_values(values)
+        return self._iter_segments(self._byte_segments, values, lambda part: part.encode('utf-8'))
+
+    def _iter_segments(self, segments, values, convert):
+        slot_names = dict(self._slots)
+        for idx, segment in enumerate(segments):
+            if segment is None:
+                value = values[slot_names[idx]]
+                if isinstance(value, str):
+                    if value:
+                        yield convert(value)
+                else:
+                    for part in value:
+                        if part:
+                            yield convert(part)
+            elif len(segment):
+                yield segment
+
+
+class TemplateVariants:
+    """
+    Templates by variant name. Like Template, loaded lazily (all variants at once by load()).
+    """
+
+    def __init__(self, templates):
+        self._templates = dict(templates)
+
+    def __getitem__(self, variant):
+        return self._templates[variant]
+
+    def __contains__(self, variant):
+        return variant in self._templates
+
+    def templates(self):
+        return list(self._templates.values())
+
+    @property
+    def loaded(self):
+        return all(template.loaded for template in self._templates.values())
+
+    def load(self):
+        for template in self._templates.values():
+            template.load()
+        return self
+
+
+class Fragments:
+    """
+    Named Solidity fragments (<directory>/<name>.sol in TEMPLATES_DIR) with declared dependencies.
+
+    `dependencies` is a sequence of (name, names of fragments it requires) in the order fragments are emitted,
+    e.g. base contracts before contracts which inherit them. Templates composed from fragments contain only
+    the fragments their roots need.
+    """
+
+    def __init__(self, directory, dependencies):
+        self.directory = directory
+        self._order = [name for name, _ in dependencies]
+        self._requires = {name: tuple(required) for name, required in dependencies}
+
+        for name, required in self._requires.items():
+            unknown = [dependency for dependency in required if dependency not in self._requires]
+            if unknown:
+                raise ValueError('fragment {} requires unknown fragments: {}'.format(name, ', '.join(unknown)))
+
+    def closure(self, roots):
+        """Names of `roots` and fragments they require transitively, in emission order."""
+        needed = set()
+        pending = list(roots)
+        while pending:
+            name = pending.pop()
+            if name not in needed:
+                if name not in self._requires:
+                    raise KeyError('unknown fragment: {}'.format(name))
+                needed.add(name)
+                pending.extend(self._requires[name])
+        return [name for name in self._order if name in needed]
+
+    def paths(self, roots, replaced=None):
+        """
+        Paths of fragments required by roots. `replaced` maps fragment names to alternative files
+        (relative to the fragments directory, without .sol) which define the same contracts differently.
+        """
+        replaced = replaced or {}
+        return [os.path.join(self.directory, replaced.get(name, name) + '.sol') for name in self.closure(roots)]
+
+    def variants(self, roots_by_variant, tail_paths, placeholders, passthrough=('payment_code',),
+                 replaced_by_variant=None, constants_by_variant=None):
+        """
+        TemplateVariants of templates made of the fragments required by roots of each variant (with replaced
+        fragments of the variant from replaced_by_variant), followed by tail_paths (files with placeholders).
+        constants_by_variant holds Template constants of each variant.
+        """
+        replaced_by_variant = replaced_by_variant or {}
+        constants_by_variant = constants_by_variant or {}
+        return TemplateVariants(
+            (variant, Template.from_files(self.paths(roots, replaced_by_variant.get(variant)) + list(tail_paths),
+                                          placeholders, passthrough, constants_by_variant.get(variant)))
+            for variant, roots in roots_by_variant.items()
+        )
@@ -0,0 +1,26 @@
+
+contract Token is DividendToken %parents_code% {
+    string public name;
+    string public symbol;
+    uint8 public decimals;
+
+    function Token(string _name, string _symbol, uint8 _decimals, uint256 _premint%cap_param%)
+        public
+        payable
+        %constructors_code%
+    {
+        name = _name;
+        symbol = _symbol;
+        decimals = _decimals;
+
+        if (_premint > 0) {
+            uint premintAmount = _premint*10**uint(_decimals);
+            totalSupply_ = totalSupply_.add(premintAmount);
+            balances[msg.sender] = balances[msg.sender].add(premintAmount);
+            Transfer(address(0), msg.sender, premintAmount);%premint_emission_code%
+        }
+
+        %payment_code%
+    }
+
+}
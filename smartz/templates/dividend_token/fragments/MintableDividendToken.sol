@@ -0,0 +1,16 @@
+
+
+contract MintableDividendToken is DividendToken, MintableToken {
+    event EmissionHappened(uint256 totalSupply, uint256 totalBalanceWas);
+
+    function mint(address _to, uint256 _amount) onlyOwner canMint public returns (bool) {
+        payDividendsTo(_to);
+        
+        bool res = super.mint(_to, _amount);
+
+        pushEmission(totalSupply_, m_totalDividends);
+
+        emit EmissionHappened(totalSupply(), m_totalDividends);        
+        return res;
+    }
+}
@@ -0,0 +1,14 @@
+
+
+contract PausableCappedDividendToken is PausableDividendToken, CappedDividendToken {
+    function PausableCappedDividendToken(uint256 _cap) 
+        public 
+        CappedDividendToken(_cap)
+    {
+    }
+    
+    function mint(address _to, uint256 _amount) whenNotPaused public returns (bool) {
+        return super.mint(_to, _amount);
+    }
+}
+
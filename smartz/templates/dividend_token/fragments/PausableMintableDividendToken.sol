@@ -0,0 +1,7 @@
+
+
+contract PausableMintableDividendToken is PausableDividendToken, MintableDividendToken {
+    function mint(address _to, uint256 _amount) whenNotPaused public returns (bool) {
+        return super.mint(_to, _amount);
+    }
+}
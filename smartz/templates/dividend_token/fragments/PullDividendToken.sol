@@ -0,0 +1,44 @@
+
+
+contract PullDividendToken is DividendToken {
+    /// @notice Request dividends for current account.
+    function requestDividends() public {
+        payDividendsTo(msg.sender);
+
+        uint256 dividends = m_unpaidDividends[msg.sender];
+        if (0 == dividends)
+            return;
+
+        m_unpaidDividends[msg.sender] = 0;
+        msg.sender.transfer(dividends);
+        emit PayDividend(msg.sender, dividends);
+    }
+
+    /// @notice Dividends the account _owner receives on request now, credited ones included, and emissions left.
+    function dividendsOf(address _owner) public view returns (uint256 dividends, uint256 emissionsLeft) {
+        (dividends, emissionsLeft) = super.dividendsOf(_owner);
+        dividends = dividends.add(m_unpaidDividends[_owner]);
+    }
+
+    /// @dev credits dividends to the account _to, they are sent only by requestDividends
+    function payDividendsTo(address _to) internal {
+        (bool hasNewDividends, uint256 dividends, uint256 lastProcessedEmissionNum) = calculateDividendsFor(_to);
+        if (!hasNewDividends)
+            return;
+
+        if (0 != dividends) {
+            m_unpaidDividends[_to] = m_unpaidDividends[_to].add(dividends);
+        }
+
+        m_lastAccountEmission[_to] = lastProcessedEmissionNum;
+        if (lastProcessedEmissionNum == m_emissions.length - 1) {
+            m_lastDividends[_to] = m_totalDividends;
+        }
+        else {
+            m_lastDividends[_to] = m_emissions[lastProcessedEmissionNum.add(1)].totalBalanceWas;
+        }
+    }
+
+    /// @dev for each token holder: dividends credited and not requested yet
+    mapping(address => uint256) public m_unpaidDividends;
+}
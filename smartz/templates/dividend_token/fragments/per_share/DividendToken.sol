@@ -0,0 +1,111 @@
+
+
+contract DividendToken is StandardToken, Ownable {
+    event PayDividend(address indexed to, uint256 amount);
+    event HangingDividend(address indexed to, uint256 amount) ;
+    event PayHangingDividend(uint256 amount) ;
+    event Deposit(address indexed sender, uint256 value);
+
+    /// @dev dividends per token are stored multiplied by MAGNITUDE, so that small payments aren't lost to rounding
+    uint256 constant MAGNITUDE = 2**128;
+
+    function() external payable {
+        if (msg.value > 0) {
+            emit Deposit(msg.sender, msg.value);
+            m_totalDividends = m_totalDividends.add(msg.value);
+
+            if (0 == totalSupply_) {
+                // there are no holders to distribute to, the owner can take it with requestHangingDividends
+                m_totalHangingDividends = m_totalHangingDividends.add(msg.value);
+            }
+            else {
+                m_magnifiedDividendPerShare = m_magnifiedDividendPerShare.add(msg.value.mul(MAGNITUDE).div(totalSupply_));
+            }
+        }
+    }
+
+    /// @notice Request dividends for current account.
+    function requestDividends() public {
+        payDividendsTo(msg.sender);
+    }
+
+    /// @notice Dividends the account _owner receives on request now, no emissions are left to process here.
+    function dividendsOf(address _owner) public view returns (uint256 dividends, uint256 emissionsLeft) {
+        return (calculateDividendsFor(_owner), 0);
+    }
+
+    /// @notice Request hanging dividends to pwner.
+    function requestHangingDividends() onlyOwner public {
+        owner.transfer(m_totalHangingDividends);
+        emit PayHangingDividend(m_totalHangingDividends);
+        m_totalHangingDividends = 0;
+    }
+
+    /// @notice hook on standard ERC20#transfer to pay dividends
+    function transfer(address _to, uint256 _value) public returns (bool) {
+        payDividendsTo(msg.sender);
+        payDividendsTo(_to);
+        bool res = super.transfer(_to, _value);
+        moveDividendCorrections(msg.sender, _to, _value);
+        return res;
+    }
+
+    /// @notice hook on standard ERC20#transferFrom to pay dividends
+    function transferFrom(address _from, address _to, uint256 _value) public returns (bool) {
+        payDividendsTo(_from);
+        payDividendsTo(_to);
+        bool res = super.transferFrom(_from, _to, _value);
+        moveDividendCorrections(_from, _to, _value);
+        return res;
+    }
+
+    /// @dev adds dividends to the account _to
+    function payDividendsTo(address _to) internal {
+        uint256 dividends = calculateDividendsFor(_to);
+        if (0 == dividends)
+            return;
+
+        m_withdrawnDividends[_to] = m_withdrawnDividends[_to].add(dividends);
+
+        bool res = _to.send(dividends);
+        if (res) {
+            emit PayDividend(_to, dividends);
+        }
+        else{
+            // _to probably is a contract not able to receive ether
+            emit HangingDividend(_to, dividends);
+            m_totalHangingDividends = m_totalHangingDividends.add(dividends);
+        }
+    }
+
+    /// @dev calculates dividends accumulated by the account _for and not paid yet
+    function calculateDividendsFor(address _for) view internal returns (uint256) {
+        int256 magnifiedDividends = int256(m_magnifiedDividendPerShare.mul(balances[_for])) + m_magnifiedDividendCorrections[_for];
+        return uint256(magnifiedDividends).div(MAGNITUDE).sub(m_withdrawnDividends[_for]);
+    }
+
+    /// @dev keeps dividends accumulated before a transfer with their holders
+    function moveDividendCorrections(address _from, address _to, uint256 _value) internal {
+        int256 correction = int256(m_magnifiedDividendPerShare.mul(_value));
+        m_magnifiedDividendCorrections[_from] += correction;
+        m_magnifiedDividendCorrections[_to] -= correction;
+    }
+
+    /// @dev new tokens of _to are not entitled to dividends received before they were created
+    function correctDividendsOnEmission(address _to, uint256 _amount) internal {
+        m_magnifiedDividendCorrections[_to] -= int256(m_magnifiedDividendPerShare.mul(_amount));
+    }
+
+    /// @notice dividends received per token since the token creation, multiplied by 2**128
+    uint256 public m_magnifiedDividendPerShare;
+
+    /// @dev for each token holder: magnified dividends of tokens received or sent, relative to m_magnifiedDividendPerShare
+    mapping(address => int256) internal m_magnifiedDividendCorrections;
+
+    /// @dev for each token holder: dividends paid
+    mapping(address => uint256) public m_withdrawnDividends;
+
+
+    uint256 public m_totalHangingDividends;
+    uint256 public m_totalDividends;
+}
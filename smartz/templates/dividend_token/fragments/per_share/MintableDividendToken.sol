@@ -0,0 +1,13 @@
+
+
+contract MintableDividendToken is DividendToken, MintableToken {
+    event EmissionHappened(uint256 totalSupply, uint256 totalBalanceWas);
+
+    function mint(address _to, uint256 _amount) onlyOwner canMint public returns (bool) {
+        bool res = super.mint(_to, _amount);
+        correctDividendsOnEmission(_to, _amount);
+
+        emit EmissionHappened(totalSupply(), m_totalDividends);
+        return res;
+    }
+}
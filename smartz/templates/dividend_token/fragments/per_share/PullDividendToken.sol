@@ -0,0 +1,18 @@
+
+
+contract PullDividendToken is DividendToken {
+    /// @notice Request dividends for current account.
+    function requestDividends() public {
+        uint256 dividends = calculateDividendsFor(msg.sender);
+        if (0 == dividends)
+            return;
+
+        m_withdrawnDividends[msg.sender] = m_withdrawnDividends[msg.sender].add(dividends);
+        msg.sender.transfer(dividends);
+        emit PayDividend(msg.sender, dividends);
+    }
+
+    /// @dev dividends stay with the account until it requests them, its corrections keep them on transfers
+    function payDividendsTo(address) internal {
+    }
+}
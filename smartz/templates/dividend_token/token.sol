@@ -0,0 +1,19 @@
+
+contract Token is DividendToken %parents_code% {
+    string public constant name = '%name%';
+    string public constant symbol = '%symbol%';
+    uint8 public constant decimals = %decimals%;%max_iterations_code%
+
+    function Token()
+        public
+        payable
+        %constructors_code%
+    {
+        %constructor_inner_code%
+        %payment_code%
+    }
+
+}
+
+
+    
\ No newline at end of file
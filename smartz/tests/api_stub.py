@@ -0,0 +1,23 @@
+"""
+Stand-in for smartz.api.constructor_engine, which comes with the smartz platform rather than with this repository.
+
+install() appends the stubs directory to sys.path: smartz is a namespace package, so the stub is found as a part
+of it unless the real module comes first, and spawned worker processes inherit it. SOURCE does the same
+in subprocesses (e.g. `python -c SOURCE + '...'`).
+"""
+
+import os
+import sys
+
+
+STUBS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'stubs')
+
+SOURCE = """
+import sys
+sys.path.append({!r})
+""".format(STUBS_DIR)
+
+
+def install():
+    if STUBS_DIR not in sys.path:
+        sys.path.append(STUBS_DIR)
@@ -0,0 +1,10 @@
+import os
+import sys
+
+import api_stub
+
+
+# the repository root, smartz is imported from there
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+api_stub.install()
@@ -0,0 +1,5 @@
+"""Stand-in for the base class of constructors provided by the smartz platform."""
+
+
+class ConstructorInstance(object):
+    pass
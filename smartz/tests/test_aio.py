@@ -0,0 +1,70 @@
+import asyncio
+import unittest
+
+from smartz import metrics
+from smartz.dividend_token_constructor import Constructor as DividendTokenConstructor
+from smartz.multisig_wallet_constructor import Constructor as MultisigWalletConstructor
+from smartz.profiling import instrumented
+
+
+FIELDS = {'name': 'My Token', 'symbol': 'MTK', 'decimals': 2, 'premint': 5, 'is_mintable': True}
+
+
+class AsyncMetricsTest(unittest.TestCase):
+
+    def setUp(self):
+        metrics.clear()
+        metrics.enable()
+        self.addCleanup(metrics.clear)
+        self.addCleanup(metrics.disable)
+
+    def test_construct_async(self):
+        constructor = DividendTokenConstructor()
+        result = asyncio.run(constructor.construct_async(FIELDS))
+        self.assertEqual(result['result'], 'success')
+
+        self.assertEqual(metrics.REQUESTS.value('dividend_token', 'construct', 'success'), 1)
+        self.assertEqual(metrics.DURATION.count('dividend_token', 'construct'), 1)
+        self.assertEqual(metrics.VARIANTS.value('dividend_token', 'MintableDividendToken'), 1)
+        # the inline validation is a part of the construct call
+        self.assertEqual(metrics.REQUESTS.value('dividend_token', 'validate', 'success'), 0)
+
+    def test_construct_async_errors(self):
+        constructor = DividendTokenConstructor()
+        result = asyncio.run(constructor.construct_async(dict(FIELDS, decimals=19)))
+        self.assertEqual(result['result'], 'error')
+
+        self.assertEqual(metrics.REQUESTS.value('dividend_token', 'construct', 'error'), 1)
+        self.assertEqual(metrics.FIELD_ERRORS.value('dividend_token', 'construct', 'decimals'), 1)
+
+    def test_post_construct_async(self):
+        constructor = MultisigWalletConstructor()
+        abi = [{'type': 'function', 'name': 'm_numOwners', 'inputs': []}]
+        bundle = asyncio.run(constructor.post_construct_async({}, abi))
+        self.assertEqual(bundle['dashboard_functions'], ['m_numOwners'])
+
+        # reported once, although post_construct() runs in an executor thread
+        self.assertEqual(metrics.REQUESTS.value('multisig_wallet', 'post_construct', 'success'), 1)
+        self.assertEqual(metrics.DURATION.count('multisig_wallet', 'post_construct'), 1)
+
+    def test_concurrent_calls(self):
+        constructor = DividendTokenConstructor()
+
+        async def construct_all():
+            return await asyncio.gather(*[
+                constructor.construct_async(dict(FIELDS, premint=premint)) for premint in range(1, 11)
+            ])
+
+        records = []
+        with instrumented(records.append):
+            results = asyncio.run(construct_all())
+
+        self.assertTrue(all(result['result'] == 'success' for result in results))
+        self.assertEqual(metrics.REQUESTS.value('dividend_token', 'construct', 'success'), 10)
+        self.assertEqual(sorted(record['args'][0]['premint'] for record in records), list(range(1, 11)))
+        self.assertTrue(all(record['method'] == 'construct' for record in records))
+        self.assertTrue(all('validate' in record['phases'] for record in records))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from smartz import batch
+from smartz.dividend_token_constructor import Constructor as DividendTokenConstructor
+from smartz.multisig_wallet_constructor import Constructor as MultisigWalletConstructor
+
+
+ADDRESS = '0x' + '1' * 40
+
+
+class RecordingExecutor(ThreadPoolExecutor):
+
+    def __init__(self):
+        super().__init__(2)
+        self.chunks = []
+
+    def map(self, fn, *iterables, **kwargs):
+        chunks = list(iterables[0])
+        self.chunks.extend(chunks)
+        return super().map(fn, chunks, **kwargs)
+
+
+class ConstructManyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.constructor = MultisigWalletConstructor()
+        self.fields = [{'owners': [ADDRESS] * count, 'signs_count': count} for count in range(1, 6)]
+        self.expected = [self.constructor.construct(fields) for fields in self.fields]
+
+    def test_inline(self):
+        self.assertEqual(self.constructor.construct_many(iter(self.fields)), self.expected)
+        self.assertEqual(self.constructor.construct_many([]), [])
+
+    def test_executor(self):
+        self.constructor.BATCH_INLINE_THRESHOLD = 2
+        self.constructor.BATCH_CHUNK_SIZE = 2
+
+        with RecordingExecutor() as executor:
+            self.assertEqual(self.constructor.construct_many(self.fields, executor), self.expected)
+        self.assertEqual([len(chunk) for chunk in executor.chunks], [2, 2, 1])
+
+    def test_errors(self):
+        constructor = DividendTokenConstructor()
+        constructor.BATCH_INLINE_THRESHOLD = 2
+        fields = [{'name': 'My Token', 'symbol': 'MTK', 'decimals': 2}, None, {'name': 'My Token'}]
+
+        with ThreadPoolExecutor(2) as executor:
+            results = constructor.construct_many(fields, executor)
+
+        self.assertEqual([result['result'] for result in results], ['success', 'error', 'error'])
+        self.assertEqual(results[1]['errors'], {'': 'must be an object'})
+        self.assertIn('symbol', results[2]['errors'])
+
+    def test_unexpected_exceptions(self):
+        class Failing(MultisigWalletConstructor):
+            def construct(self, fields):
+                if fields is None:
+                    raise RuntimeError('boom')
+                return super().construct(fields)
+
+        results = Failing().construct_many([self.fields[0], None])
+        self.assertEqual(results[0], self.expected[0])
+        self.assertEqual(results[1], {'result': 'error', 'errors': {'': 'RuntimeError: boom'}})
+
+
+class BatchRunTest(unittest.TestCase):
+
+    LINES = [
+        json.dumps({'owners': [ADDRESS], 'signs_count': 1}) + '\n',
+        '\n',
+        '{"owners": \n',
+        json.dumps({'owners': [ADDRESS], 'signs_count': 2}) + '\n',
+        '  \n',
+        json.dumps({'owners': [ADDRESS, '0x' + '2' * 40], 'signs_count': 2}),
+    ]
+
+    def check(self, output):
+        records = [json.loads(line) for line in output.splitlines()]
+
+        # one record per input line, in order
+        self.assertEqual([record['construct']['result'] for record in records],
+                         ['success', 'error', 'error', 'error', 'error', 'success'])
+        self.assertEqual(records[1]['construct']['errors'], {'': 'empty line'})
+        self.assertTrue(records[2]['construct']['errors'][''].startswith('invalid JSON: '))
+        self.assertIn('signs_count', records[3]['construct']['errors'])
+        self.assertEqual(records[4]['construct']['errors'], {'': 'empty line'})
+
+        self.assertIn('post_construct', records[0])
+        self.assertNotIn('post_construct', records[1])
+        self.assertEqual(records[5]['construct'],
+                         MultisigWalletConstructor().construct({'owners': [ADDRESS, '0x' + '2' * 40],
+                                                                'signs_count': 2}))
+
+    def test_in_process(self):
+        output = io.StringIO()
+        batch.run('multisig_wallet', iter(self.LINES), output, workers=0, chunk_size=2)
+        self.check(output.getvalue())
+
+    def test_workers(self):
+        output = io.StringIO()
+        batch.run('multisig_wallet', iter(self.LINES), output, workers=2, chunk_size=1)
+        self.check(output.getvalue())
+
+    def test_main(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False) as fh:
+            fh.writelines(self.LINES)
+        self.addCleanup(os.unlink, fh.name)
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(batch.main(['multisig_wallet', fh.name, '--workers', '0']), 0)
+        self.check(output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
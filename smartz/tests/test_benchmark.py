@@ -0,0 +1,68 @@
+import unittest
+
+from smartz.abi import function_signatures
+from smartz.benchmark import compare, relative_spread, source_abi
+
+
+SOURCE = """
+pragma solidity ^0.4.24;
+
+contract Token {
+    string public constant name = 'Token';
+    mapping(address => uint256) public balances;
+    uint[] public emissions;
+    address internal m_owner;
+
+    function Token() public {}
+
+    // function commented(uint a) public {}
+    function transfer(address to, uint value) public returns (bool) {}
+    function pay() payable external {}
+    function add(uint a, uint b) internal pure returns (uint) {}
+    function() external payable {}
+}
+"""
+
+
+def stats(relative_p50, relative_spread, calibration_us=100.0):
+    return {'relative_p50': relative_p50, 'relative_spread': relative_spread, 'calibration_us': calibration_us}
+
+
+class CompareTest(unittest.TestCase):
+
+    def test_allowance(self):
+        baseline = {'results': {'quiet': stats(0.1, 0.01), 'noisy': stats(0.1, 0.2), 'removed': stats(0.1, 0)}}
+        report = {'results': {
+            # 10us at calibration 100us, 10% allowed
+            'quiet': stats(0.111, 0.01),
+            # 1.5 * 20% allowed
+            'noisy': stats(0.125, 0.01),
+            'new': stats(1, 0),
+        }}
+        self.assertEqual(compare(report, baseline, slack_us=0), [('quiet', 10.0, 11.1, 0.1)])
+        self.assertEqual(compare(report, baseline, slack_us=1), [])
+        self.assertEqual(compare(report, baseline, tolerance=0.2, noise_factor=1, slack_us=0),
+                         [('noisy', 10.0, 12.5, 0.2)])
+
+    def test_machine_speed(self):
+        # the same relative latency on a twice slower machine is not a regression
+        baseline = {'results': {'case': stats(0.1, 0.01, calibration_us=100)}}
+        report = {'results': {'case': stats(0.1, 0.01, calibration_us=200)}}
+        self.assertEqual(compare(report, baseline), [])
+
+    def test_relative_spread(self):
+        self.assertEqual(relative_spread([1.0]), 0.0)
+        self.assertEqual(relative_spread([2.0] * 9), 0.0)
+        self.assertAlmostEqual(relative_spread(range(1, 10)), 1.0)
+
+
+class SourceAbiTest(unittest.TestCase):
+
+    def test_source_abi(self):
+        self.assertEqual(sorted(function_signatures(source_abi(SOURCE))), [
+            '', 'balances(address)', 'emissions(uint256)', 'name()', 'pay()', 'transfer(address,uint256)',
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
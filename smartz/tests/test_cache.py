@@ -0,0 +1,101 @@
+import unittest
+from unittest import mock
+
+from smartz.cache import LRUCache, construct_key, fields_key
+from smartz.dividend_token_constructor import Constructor as DividendTokenConstructor
+from smartz.multisig_wallet_constructor import Constructor as MultisigWalletConstructor
+
+
+OWNER = '0x' + 'aB' * 20
+
+
+class LRUCacheTest(unittest.TestCase):
+
+    def test_eviction(self):
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        # 'b' is the least recently used one now
+        cache.put('c', 3)
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(cache.stats(), {'size': 2, 'maxsize': 2, 'hits': 3, 'misses': 1})
+
+    def test_ttl(self):
+        cache = LRUCache(2, ttl=10)
+        with mock.patch('smartz.cache.time.monotonic', return_value=100):
+            cache.put('a', 1)
+        with mock.patch('smartz.cache.time.monotonic', return_value=109):
+            self.assertEqual(cache.get('a'), 1)
+        with mock.patch('smartz.cache.time.monotonic', return_value=111):
+            self.assertEqual(cache.get('a', 'expired'), 'expired')
+        self.assertEqual(len(cache), 0)
+
+    def test_clear(self):
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        cache.get('a')
+        cache.clear()
+        self.assertEqual(cache.stats(), {'size': 0, 'maxsize': 2, 'hits': 0, 'misses': 0})
+
+    def test_invalid_size(self):
+        with self.assertRaises(ValueError):
+            LRUCache(0)
+
+    def test_fields_key(self):
+        self.assertEqual(fields_key('m', {'a': 1, 'b': [1, 2]}), fields_key('m', {'b': [1, 2], 'a': 1}))
+        self.assertNotEqual(fields_key('m', {'a': 1}), fields_key('n', {'a': 1}))
+
+
+class ConstructCacheTest(unittest.TestCase):
+
+    def cached(self, cls):
+        patcher = mock.patch.object(cls, 'CACHE', LRUCache(16))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return cls()
+
+    def test_no_cache(self):
+        self.assertIsNone(construct_key(MultisigWalletConstructor(), {'owners': [OWNER], 'signs_count': 1}))
+
+    def test_dividend_token_keys(self):
+        constructor = self.cached(DividendTokenConstructor)
+        fields = {'name': 'My Token', 'symbol': 'mtk', 'decimals': 18}
+
+        # defaults and symbol case don't change the result
+        same = dict(fields, symbol='MTK', is_mintable=False)
+        self.assertEqual(construct_key(constructor, fields), construct_key(constructor, same))
+        self.assertNotEqual(construct_key(constructor, fields), construct_key(constructor, dict(fields, premint=5)))
+
+        result = constructor.construct(fields)
+        self.assertEqual(constructor.construct(same), result)
+        self.assertEqual(constructor.CACHE.stats()['hits'], 1)
+
+        # callers get copies
+        result['source'] = ''
+        self.assertNotEqual(constructor.construct(fields)['source'], '')
+
+    def test_errors_are_not_cached(self):
+        constructor = self.cached(DividendTokenConstructor)
+        constructor.construct({'name': 'My Token', 'symbol': 'MTK', 'decimals': 19})
+        self.assertEqual(len(constructor.CACHE), 0)
+
+    def test_multisig_address_spelling(self):
+        constructor = self.cached(MultisigWalletConstructor)
+        fields = {'owners': [OWNER], 'signs_count': 1}
+        same = {'owners': [OWNER.lower()], 'signs_count': 1, 'thaw_ts': 0}
+
+        self.assertEqual(construct_key(constructor, fields), construct_key(constructor, same))
+        first = constructor.construct(fields)
+        self.assertEqual(constructor.construct(same), first)
+
+        # the source doesn't depend on which spelling was cached
+        self.assertIn('address({})'.format(OWNER.lower()), first['source'])
+        self.assertEqual(MultisigWalletConstructor.CACHE.stats()['hits'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
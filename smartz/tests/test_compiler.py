@@ -0,0 +1,89 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from smartz.compiler import CompileError, CompilePool
+from smartz.store import SourceStore
+
+
+# solc-js stand-in: every source compiles to contract Token with its text as bytecode, except for
+# sources containing MALFORMED (output without ABI)
+FAKE_SOLC_JS = """
+exports.compileStandardWrapper = function (input) {
+    var sources = JSON.parse(input).sources;
+    var contracts = {};
+    Object.keys(sources).forEach(function (name) {
+        var content = sources[name].content;
+        contracts[name] = content.indexOf('MALFORMED') >= 0 ? {Token: {}}
+            : {Token: {abi: [], evm: {bytecode: {object: content}}}};
+    });
+    return JSON.stringify({contracts: contracts});
+};
+"""
+
+
+class FailingStore(SourceStore):
+
+    def put_artifacts(self, key, tag, artifacts):
+        raise RuntimeError('store failure')
+
+
+@unittest.skipIf(shutil.which('node') is None, 'node is required')
+class CompilePoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+        self.solc_js = os.path.join(self.directory, 'solc')
+        os.makedirs(self.solc_js)
+        with open(os.path.join(self.solc_js, 'index.js'), 'w') as fh:
+            fh.write(FAKE_SOLC_JS)
+
+    def pool(self, **kwargs):
+        pool = CompilePool(self.solc_js, workers=1, batch_window=0, **kwargs)
+        self.addCleanup(pool.shutdown)
+        return pool
+
+    def test_compile(self):
+        self.assertEqual(self.pool().compile('contract A {}', timeout=10),
+                         {'Token': {'abi': [], 'bytecode': 'contract A {}'}})
+
+    def test_malformed_output(self):
+        pool = self.pool()
+        with self.assertRaises(CompileError):
+            pool.compile('MALFORMED', timeout=10)
+        # the worker keeps serving
+        self.assertEqual(pool.compile('contract B {}', timeout=10)['Token']['bytecode'], 'contract B {}')
+
+    def test_released_source(self):
+        store = SourceStore(os.path.join(self.directory, 'store'))
+        key = store.put('contract C {}')
+        store.release(key)
+
+        pool = self.pool(store=store)
+        self.assertEqual(pool.compile('contract C {}', timeout=10)['Token']['bytecode'], 'contract C {}')
+        with self.assertRaises(KeyError):
+            store.put_artifacts(key, pool.artifacts_tag, {})
+
+    def test_stored_artifacts(self):
+        store = SourceStore(os.path.join(self.directory, 'store'))
+        key = store.put('contract D {}')
+
+        pool = self.pool(store=store)
+        result = pool.compile('contract D {}', timeout=10)
+        self.assertEqual(store.artifacts(key, pool.artifacts_tag), result)
+
+    def test_unexpected_error(self):
+        pool = self.pool(store=FailingStore(os.path.join(self.directory, 'store')))
+        with self.assertRaises(RuntimeError):
+            pool.compile('contract E {}', timeout=10)
+
+        # the dispatcher thread survived and got a new worker
+        pool.store = None
+        self.assertEqual(pool.compile('contract F {}', timeout=10)['Token']['bytecode'], 'contract F {}')
+
+
+if __name__ == '__main__':
+    unittest.main()
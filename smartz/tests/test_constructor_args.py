@@ -0,0 +1,116 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from smartz.abi import encode_args
+from smartz.dividend_token_constructor import Constructor, variant_name
+
+
+FIELDS = {'name': 'My Token', 'symbol': 'mtk', 'decimals': 2, 'premint': 5}
+
+
+def word(value):
+    return '{:064x}'.format(value)
+
+
+class EncodeArgsTest(unittest.TestCase):
+
+    def test_static(self):
+        address = '0x' + '12' * 20
+        self.assertEqual(encode_args(['uint8', 'bool', 'address'], [255, True, address]),
+                         word(255) + word(1) + '0' * 24 + '12' * 20)
+
+    def test_dynamic(self):
+        # heads hold offsets of the data appended after all heads
+        self.assertEqual(encode_args(['uint256', 'string', 'bytes'], [1, 'abc', b'\x01' * 33]),
+                         word(1) + word(96) + word(160)
+                         + word(3) + 'abc'.encode('utf-8').hex().ljust(64, '0')
+                         + word(33) + ('01' * 33).ljust(128, '0'))
+        self.assertEqual(encode_args(['string'], ['']), word(32) + word(0))
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            encode_args(['uint8'], [256])
+        with self.assertRaises(ValueError):
+            encode_args(['uint256'], [-1])
+        with self.assertRaises(ValueError):
+            encode_args(['uint256'], [])
+        with self.assertRaises(ValueError):
+            encode_args(['int256'], [1])
+
+
+class ConstructorArgsModeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        for patcher in (mock.patch.object(Constructor, 'MODE', 'constructor_args'),
+                        mock.patch.object(Constructor, 'PRECOMPILED_DIR', self.directory),
+                        mock.patch.object(Constructor, '_precompiled', {})):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def write_artifact(self, variant, source):
+        with open(os.path.join(self.directory, variant + '.json'), 'w') as fh:
+            json.dump({
+                'variant': variant,
+                'source_sha256': hashlib.sha256(source.encode('utf-8')).hexdigest(),
+                'abi': [{'type': 'function', 'name': 'symbol'}],
+                'bytecode': '6060',
+            }, fh)
+
+    def test_variants(self):
+        names = Constructor.variant_names()
+        self.assertEqual(len(names), len(set(names)))
+        self.assertEqual(len(names), len(Constructor.VARIANTS) * 6)
+        self.assertEqual(variant_name('CappedDividendToken', 'emissions', 'pull', 'packed'),
+                         'CappedDividendToken.pull.packed')
+        self.assertEqual(Constructor.variant_key('CappedDividendToken.pull.packed'),
+                         ('CappedDividendToken', 'emissions', 'pull', 'packed'))
+
+    def test_construct(self):
+        result = Constructor().construct(FIELDS)
+
+        self.assertEqual(result['source'], Constructor.variant_source(None))
+        self.assertEqual(result['constructor_args'],
+                         encode_args(['string', 'string', 'uint8', 'uint256'], ['My Token', 'MTK', 2, 5]))
+        # nothing is precompiled
+        self.assertNotIn('abi', result)
+
+        # sources don't depend on token parameters
+        other = Constructor().construct(dict(FIELDS, name='Other Token', premint=7))
+        self.assertEqual(other['source'], result['source'])
+        self.assertNotEqual(other['constructor_args'], result['constructor_args'])
+
+    def test_capped(self):
+        fields = dict(FIELDS, is_mintable=True, max_tokens_count=100)
+        result = Constructor().construct(fields)
+        self.assertEqual(result['source'], Constructor.variant_source('CappedDividendToken'))
+        self.assertEqual(result['constructor_args'],
+                         encode_args(['string', 'string', 'uint8', 'uint256', 'uint256'],
+                                     ['My Token', 'MTK', 2, 5, 100]))
+
+    def test_precompiled(self):
+        self.write_artifact('DividendToken.pull', Constructor.variant_source(None, payout='pull'))
+        result = Constructor().construct(dict(FIELDS, is_pull_dividends=True))
+
+        self.assertEqual(result['abi'], [{'type': 'function', 'name': 'symbol'}])
+        self.assertEqual(result['bytecode'], '6060')
+
+    def test_outdated_artifact(self):
+        self.write_artifact('DividendToken', 'contract Old {}')
+        self.assertIsNone(Constructor.precompiled('DividendToken'))
+        self.assertNotIn('abi', Constructor().construct(FIELDS))
+
+    def test_gas_budget(self):
+        result = Constructor().construct(dict(FIELDS, dividends_gas_budget=10 ** 6))
+        self.assertEqual(result['result'], 'error')
+        self.assertIn('dividends_gas_budget', result['errors'])
+
+
+if __name__ == '__main__':
+    unittest.main()
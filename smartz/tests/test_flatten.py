@@ -0,0 +1,98 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from smartz.flatten import CACHE_FILE, FlattenError, SourceGraph, flatten_all
+
+
+SOURCES = {
+    'contracts/Token.sol': 'pragma solidity ^0.4.24;\n\nimport "./lib/Math.sol";\n'
+                           'import {Ownable} from "pkg/Ownable.sol";\n\ncontract Token is Ownable {}\n',
+    'contracts/lib/Math.sol': 'pragma solidity ^0.4.24;\nimport \'pkg/Ownable.sol\';\n\nlibrary Math {}\n',
+    'node_modules/pkg/Ownable.sol': 'pragma solidity ^0.4.24;\npragma experimental "v0.5.0";\n\ncontract Ownable {}\n',
+}
+
+
+class FlattenTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        for path, text in SOURCES.items():
+            self.write(path, text)
+
+        self.remappings = {'pkg': self.path('node_modules/pkg')}
+        self.output = self.path('build')
+
+    def path(self, path):
+        return os.path.join(self.directory, path)
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(self.path(path)), exist_ok=True)
+        with open(self.path(path), 'w') as fh:
+            fh.write(text)
+
+    def flatten_all(self):
+        return flatten_all(self.path('contracts'), self.output, self.remappings, base_dir=self.directory)
+
+    def test_closure(self):
+        graph = SourceGraph(self.directory, self.remappings)
+        self.assertEqual(graph.closure(self.path('contracts/Token.sol')), tuple(self.path(path) for path in [
+            'node_modules/pkg/Ownable.sol', 'contracts/lib/Math.sol', 'contracts/Token.sol',
+        ]))
+
+    def test_flatten(self):
+        text = SourceGraph(self.directory, self.remappings).flatten(self.path('contracts/Token.sol'))
+
+        self.assertTrue(text.startswith('pragma solidity ^0.4.24;\npragma experimental "v0.5.0";\n\n\n'))
+        self.assertEqual(text.count('pragma solidity'), 1)
+        self.assertNotIn('import', text)
+        self.assertLess(text.index('// File: node_modules/pkg/Ownable.sol'),
+                        text.index('// File: contracts/lib/Math.sol'))
+        self.assertTrue(text.endswith('// File: contracts/Token.sol\n\ncontract Token is Ownable {}\n'))
+
+    def test_missing_import(self):
+        self.write('contracts/Broken.sol', 'import "./Missing.sol";\n')
+        graph = SourceGraph(self.directory, self.remappings)
+        with self.assertRaisesRegex(FlattenError, 'contracts/Broken.sol: import not found'):
+            graph.closure(self.path('contracts/Broken.sol'))
+
+    def test_incremental(self):
+        token, math = self.path('contracts/Token.sol'), self.path('contracts/lib/Math.sol')
+        self.assertEqual(self.flatten_all(), ([math, token], [], []))
+        self.assertTrue(os.path.exists(os.path.join(self.output, CACHE_FILE)))
+        self.assertEqual(self.flatten_all(), ([], [math, token], []))
+
+        # a transitive import changed
+        self.write('node_modules/pkg/Ownable.sol', 'contract Ownable { address owner; }\n')
+        self.assertEqual(self.flatten_all(), ([math, token], [], []))
+        with open(os.path.join(self.output, 'Token.sol')) as fh:
+            self.assertIn('address owner;', fh.read())
+
+        # a deleted output is rebuilt
+        os.unlink(os.path.join(self.output, 'Math.sol'))
+        self.assertEqual(self.flatten_all(), ([math], [token], []))
+
+    def test_removed_and_failed(self):
+        self.flatten_all()
+        os.unlink(self.path('contracts/lib/Math.sol'))
+        self.write('contracts/Other.sol', 'contract Other {}\n')
+
+        flattened, up_to_date, failed = self.flatten_all()
+        self.assertEqual((flattened, up_to_date), ([self.path('contracts/Other.sol')], []))
+        self.assertEqual([path for path, error in failed], [self.path('contracts/Token.sol')])
+
+        # the output of the removed contract is deleted
+        self.assertFalse(os.path.exists(os.path.join(self.output, 'Math.sol')))
+        # failed outputs are retried on the next run
+        self.assertEqual(len(self.flatten_all()[2]), 1)
+
+    def test_name_clash(self):
+        self.write('contracts/other/Token.sol', 'contract Token {}\n')
+        with self.assertRaisesRegex(FlattenError, 'would be flattened to the same file'):
+            self.flatten_all()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from smartz import template
+from smartz.dividend_token_constructor import Constructor as DividendTokenConstructor
+from smartz.template import Fragments
+
+
+DEPENDENCIES = (
+    ('pragma', ()),
+    ('SafeMath', ('pragma',)),
+    ('Ownable', ('pragma',)),
+    ('Token', ('SafeMath',)),
+    ('OwnedToken', ('Token', 'Ownable')),
+)
+
+
+class FragmentsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.fragments = Fragments('fragments', DEPENDENCIES)
+
+    def test_closure(self):
+        self.assertEqual(self.fragments.closure(['Token']), ['pragma', 'SafeMath', 'Token'])
+        # emission order doesn't depend on the order of roots
+        self.assertEqual(self.fragments.closure(['Ownable', 'OwnedToken', 'Token']),
+                         ['pragma', 'SafeMath', 'Ownable', 'Token', 'OwnedToken'])
+        self.assertEqual(self.fragments.closure([]), [])
+
+        with self.assertRaisesRegex(KeyError, 'unknown fragment: Other'):
+            self.fragments.closure(['Token', 'Other'])
+
+    def test_unknown_dependencies(self):
+        with self.assertRaisesRegex(ValueError, 'fragment Token requires unknown fragments: SafeMath'):
+            Fragments('fragments', [('Token', ('SafeMath',))])
+
+    def test_paths(self):
+        self.assertEqual(self.fragments.paths(['Token'], {'SafeMath': 'alt/SafeMath'}), [
+            os.path.join('fragments', 'pragma.sol'),
+            os.path.join('fragments', 'alt/SafeMath.sol'),
+            os.path.join('fragments', 'Token.sol'),
+        ])
+
+    def test_variants(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        os.makedirs(os.path.join(directory, 'fragments', 'alt'))
+        for name in ('pragma', 'SafeMath', 'alt/SafeMath', 'Ownable', 'Token', 'OwnedToken'):
+            with open(os.path.join(directory, 'fragments', name + '.sol'), 'w') as fh:
+                fh.write('// {}\n'.format(name))
+        with open(os.path.join(directory, 'tail.sol'), 'w') as fh:
+            fh.write('contract %name% is %parent% {}\n')
+
+        with mock.patch.object(template, 'TEMPLATES_DIR', directory):
+            variants = self.fragments.variants(
+                {'plain': ('Token',), 'owned': ('OwnedToken',)}, ['tail.sol'], ['name'],
+                replaced_by_variant={'owned': {'SafeMath': 'alt/SafeMath'}},
+                constants_by_variant={'plain': {'parent': 'Token'}, 'owned': {'parent': 'OwnedToken'}},
+            )
+
+            self.assertEqual(variants['plain'].render({'name': 'A'}),
+                             '// pragma\n// SafeMath\n// Token\ncontract A is Token {}\n')
+            self.assertEqual(variants['owned'].render({'name': 'B'}),
+                             '// pragma\n// alt/SafeMath\n// Ownable\n// Token\n// OwnedToken\n'
+                             'contract B is OwnedToken {}\n')
+
+
+class DividendTokenFragmentsTest(unittest.TestCase):
+
+    def test_sources_contain_only_needed_contracts(self):
+        constructor = DividendTokenConstructor()
+        fields = {'name': 'My Token', 'symbol': 'MTK', 'decimals': 2}
+
+        plain = constructor.construct(fields)['source']
+        self.assertIn('contract DividendToken ', plain)
+        self.assertNotIn('contract MintableToken ', plain)
+        self.assertNotIn('contract Pausable ', plain)
+
+        capped = constructor.construct(dict(fields, is_mintable=True, max_tokens_count=10))['source']
+        self.assertIn('contract MintableToken ', capped)
+        self.assertIn('contract CappedDividendToken ', capped)
+        self.assertNotIn('contract Pausable ', capped)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+from api_stub import SOURCE
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CHECK = SOURCE + """
+import json
+import smartz.dividend_token_constructor, smartz.multisig_wallet_constructor
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+class ImportCostTest(unittest.TestCase):
+    """Importing a constructor doesn't pull in modules only needed by batch, async or profiling helpers."""
+
+    def test_constructors(self):
+        modules = json.loads(subprocess.check_output([sys.executable, '-c', CHECK], cwd=ROOT))
+
+        for name in ('concurrent.futures.process', 'multiprocessing', 'argparse', 'asyncio', 'cProfile', 'contextvars'):
+            self.assertNotIn(name, modules)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+
+from smartz.abi import abi_hash, bundle_key, function_signatures, post_construct_bundle
+from smartz.cache import LRUCache
+from smartz.dividend_token_constructor import Constructor as DividendTokenConstructor
+from smartz.multisig_wallet_constructor import Constructor as MultisigWalletConstructor
+
+
+SPECS = {
+    'transfer': {'title': 'Transfer'},
+    'balanceOf': {'title': 'Balance'},
+    '': {'title': 'Send ether'},
+}
+
+ABI = [
+    {'type': 'function', 'name': 'transfer', 'inputs': [{'type': 'address'}, {'type': 'uint256'}]},
+    {'type': 'event', 'name': 'Transfer', 'inputs': []},
+    {'type': 'constructor', 'inputs': []},
+]
+
+
+class AbiHashTest(unittest.TestCase):
+
+    def test_function_signatures(self):
+        abi = ABI + [{'type': 'fallback'}, {'name': 'totalSupply'}]
+        self.assertEqual(function_signatures(abi), ['transfer(address,uint256)', '', 'totalSupply()'])
+
+    def test_abi_hash(self):
+        # order and non-callable entries don't matter
+        reordered = [ABI[2], ABI[0]] + [{'type': 'event', 'name': 'Other'}]
+        self.assertEqual(abi_hash(ABI), abi_hash(reordered))
+        self.assertNotEqual(abi_hash(ABI), abi_hash(ABI + [{'type': 'fallback'}]))
+
+        self.assertIsNone(bundle_key(None))
+        self.assertIsNone(bundle_key([]))
+
+
+class PostConstructBundleTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = LRUCache(8)
+
+    def test_filtering(self):
+        bundle = post_construct_bundle(self.cache, SPECS, ('balanceOf', 'transfer'), ABI)
+        self.assertEqual(bundle, {
+            'result': 'success',
+            'function_specs': {'transfer': {'title': 'Transfer'}},
+            'dashboard_functions': ['transfer'],
+        })
+
+        bundle = post_construct_bundle(self.cache, SPECS, ('balanceOf',), ABI + [{'type': 'fallback'}])
+        self.assertEqual(set(bundle['function_specs']), {'transfer', ''})
+
+    def test_without_abi(self):
+        bundle = post_construct_bundle(self.cache, SPECS, ('balanceOf', 'transfer'), None)
+        self.assertEqual(bundle['function_specs'], SPECS)
+        self.assertEqual(bundle['dashboard_functions'], ['balanceOf', 'transfer'])
+
+    def test_cached_by_abi_hash(self):
+        first = post_construct_bundle(self.cache, SPECS, (), ABI)
+        second = post_construct_bundle(self.cache, SPECS, (), list(reversed(ABI)))
+
+        self.assertIs(second, first)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        # shared bundles are read-only
+        with self.assertRaises(TypeError):
+            first['dashboard_functions'].append('balanceOf')
+
+
+class ConstructorPostConstructTest(unittest.TestCase):
+
+    def test_dividend_token(self):
+        abi = [{'type': 'function', 'name': name, 'inputs': []} for name in ('requestDividends', 'symbol')]
+        bundle = DividendTokenConstructor().post_construct({}, abi)
+
+        self.assertEqual(set(bundle['function_specs']), {'requestDividends', 'symbol'})
+        self.assertEqual(bundle['dashboard_functions'], ['symbol'])
+
+    def test_multisig_wallet(self):
+        full = MultisigWalletConstructor().post_construct({}, None)
+        bundle = MultisigWalletConstructor().post_construct({}, [{'type': 'function', 'name': 'm_numOwners'}])
+
+        self.assertIn('changeRequirement', full['function_specs'])
+        self.assertEqual(set(bundle['function_specs']), {'m_numOwners'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from smartz.registry import ConstructorRegistry
+from smartz.template import Template, TemplateVariants
+
+
+MODULE = """
+class Constructor:
+    VERSION = {}
+"""
+
+
+class RegistryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = ConstructorRegistry()
+
+    def test_names(self):
+        self.assertEqual(self.registry.names(), ['dividend_token', 'multisig_wallet'])
+        self.assertIn('dividend_token', self.registry)
+        self.assertIn('dividend_token_constructor', self.registry)
+        self.assertNotIn('batch', self.registry)
+
+    def test_get(self):
+        constructor = self.registry.get('multisig_wallet')
+        self.assertIs(self.registry.get('multisig_wallet_constructor'), constructor)
+        self.assertEqual(self.registry.loaded(), ['multisig_wallet'])
+
+        with self.assertRaisesRegex(KeyError, 'unknown constructor: batch'):
+            self.registry.get('batch')
+
+    def test_warm_up(self):
+        self.registry.warm_up()
+        self.assertEqual(self.registry.loaded(), self.registry.names())
+
+        for name in self.registry.names():
+            cls = self.registry.get(name).__class__
+            templates = [value for value in vars(cls).values() if isinstance(value, (Template, TemplateVariants))]
+            self.assertTrue(templates)
+            self.assertTrue(all(template.loaded for template in templates))
+
+
+class ReloadTest(unittest.TestCase):
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        self.directory = os.path.join(root, 'registry_test_package')
+        os.mkdir(self.directory)
+
+        sys.path.insert(0, root)
+        self.addCleanup(sys.path.remove, root)
+        self.addCleanup(lambda: [sys.modules.pop(name) for name in list(sys.modules)
+                                 if name.startswith('registry_test_package')])
+
+        self.registry = ConstructorRegistry(self.directory, 'registry_test_package')
+
+    def write(self, version):
+        path = os.path.join(self.directory, 'demo_constructor.py')
+        with open(path, 'w') as fh:
+            fh.write(MODULE.format(version))
+        # don't depend on the mtime resolution for picking up changes
+        shutil.rmtree(os.path.join(self.directory, '__pycache__'), ignore_errors=True)
+
+    def test_reload(self):
+        self.write(1)
+        first = self.registry.get('demo')
+        self.assertEqual(first.VERSION, 1)
+
+        self.write(2)
+        self.assertIs(self.registry.get('demo'), first)
+        self.assertEqual(self.registry.reload(), ['demo'])
+
+        self.assertEqual(self.registry.loaded(), [])
+        self.assertEqual(self.registry.get('demo').VERSION, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import json
+import pickle
+import unittest
+
+from smartz.dividend_token_constructor import Constructor as DividendTokenConstructor
+from smartz.multisig_wallet_constructor import Constructor as MultisigWalletConstructor
+from smartz.schema import FrozenDict, FrozenList, Payload, freeze
+
+
+class FreezeTest(unittest.TestCase):
+
+    def test_plain_json_structures(self):
+        frozen = freeze({'required': ['a', 'b'], 'items': ({'type': 'string'},)})
+
+        self.assertIsInstance(frozen, FrozenDict)
+        self.assertIsInstance(frozen['required'], list)
+        self.assertIsInstance(frozen['items'], list)
+        self.assertEqual(frozen, {'required': ['a', 'b'], 'items': [{'type': 'string'}]})
+        self.assertEqual(json.loads(json.dumps(frozen)), frozen)
+
+    def test_read_only(self):
+        frozen = freeze({'required': ['a']})
+
+        with self.assertRaises(TypeError):
+            frozen['required'].append('b')
+        with self.assertRaises(TypeError):
+            frozen['required'][0] = 'b'
+        with self.assertRaises(TypeError):
+            frozen['required'] += ['b']
+        self.assertEqual(frozen['required'], ['a'])
+
+    def test_unhashable(self):
+        # like dict and list: equal payloads would have to hash equally
+        for frozen in (freeze({'a': 1}), freeze([1])):
+            with self.assertRaises(TypeError):
+                hash(frozen)
+
+    def test_pickle(self):
+        frozen = freeze({'required': ['a'], 'nested': [[1, 2]]})
+        restored = pickle.loads(pickle.dumps(frozen))
+
+        self.assertEqual(restored, frozen)
+        self.assertIsInstance(restored['nested'][0], FrozenList)
+
+    def test_payload(self):
+        payload = Payload({'required': ['a']})
+        self.assertEqual(payload.json, b'{"required":["a"]}')
+
+
+class ConstructorPayloadsTest(unittest.TestCase):
+
+    def test_json_round_trip(self):
+        for constructor in (DividendTokenConstructor(), MultisigWalletConstructor()):
+            for result in (constructor.get_params(), constructor.get_version(), constructor.post_construct({}, None)):
+                self.assertEqual(json.loads(json.dumps(result)), result)
+
+    def test_schema_arrays_are_lists(self):
+        schema = MultisigWalletConstructor().get_params()['schema']
+        self.assertIsInstance(schema['required'], list)
+        self.assertEqual(schema['required'], ['signs_count', 'owners'])
+
+
+if __name__ == '__main__':
+    unittest.main()
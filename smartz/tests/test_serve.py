@@ -0,0 +1,124 @@
+import http.client
+import json
+import multiprocessing
+import threading
+import time
+import unittest
+from unittest import mock
+
+from smartz import serve
+from smartz.registry import registry
+from smartz.serve import ConstructorService, make_server
+
+
+FIELDS = {'owners': ['0x' + '1' * 40], 'signs_count': 1}
+
+
+class ReloadTest(unittest.TestCase):
+
+    def setUp(self):
+        self.service = ConstructorService(workers=1)
+        self.addCleanup(self.service.shutdown)
+
+        self.running = 0
+        self.max_running = 0
+        self.reloads = 0
+        self.lock = threading.Lock()
+        self.reload = registry.reload
+
+    def slow_reload(self):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.05)
+        try:
+            return self.reload()
+        finally:
+            with self.lock:
+                self.running -= 1
+                self.reloads += 1
+
+    def test_concurrent_reloads_are_serialized(self):
+        with mock.patch.object(registry, 'reload', self.slow_reload), \
+                self.assertLogs('smartz.serve', 'INFO') as logs:
+            threads = [threading.Thread(target=self.service.reload) for _ in range(3)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(self.max_running, 1)
+        self.assertEqual(self.reloads, 3)
+        # every reload sees the constructors warmed up by the previous one
+        expected = 'reloaded constructors: {}'.format(', '.join(registry.names()))
+        self.assertEqual([record.getMessage() for record in logs.records], [expected] * 3)
+
+    def test_requested_reloads_are_coalesced(self):
+        def wait_for(condition):
+            deadline = time.monotonic() + 10
+            while not condition() and time.monotonic() < deadline:
+                time.sleep(0.001)
+
+        with mock.patch.object(registry, 'reload', self.slow_reload):
+            self.service.request_reload()
+            wait_for(lambda: self.running)
+
+            # all of these are coalesced into one reload after the running one
+            for _ in range(5):
+                self.service.request_reload()
+            wait_for(lambda: self.reloads == 2)
+            time.sleep(0.2)
+
+        self.assertEqual(self.max_running, 1)
+        self.assertEqual(self.reloads, 2)
+
+    def test_reloaded_workers_are_spawned(self):
+        with mock.patch.object(serve.multiprocessing, 'get_context', wraps=multiprocessing.get_context) as get_context:
+            self.service.reload()
+
+        # the reload runs next to server threads, which must not be forked
+        get_context.assert_called_once_with('spawn')
+        self.assertEqual(self.service.call('multisig_wallet', 'construct', FIELDS)['result'], 'success')
+
+
+class RequestHandlerTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.service = ConstructorService(workers=1)
+        cls.server = make_server(cls.service, port=0)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.service.shutdown()
+
+    def post(self, path, body):
+        connection = http.client.HTTPConnection(*self.server.server_address)
+        self.addCleanup(connection.close)
+        connection.request('POST', path, body.encode('utf-8'), {'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        return response.status, json.loads(response.read().decode('utf-8'))
+
+    def test_construct(self):
+        status, result = self.post('/multisig_wallet/construct', json.dumps(FIELDS))
+        self.assertEqual(status, 200)
+        self.assertEqual(result['result'], 'success')
+
+        self.assertEqual(self.post('/multisig_wallet/construct', '{')[0], 400)
+        self.assertEqual(self.post('/unknown/construct', '{}')[0], 404)
+
+    def test_post_construct(self):
+        status, result = self.post('/multisig_wallet/post_construct', json.dumps({'fields': FIELDS, 'abi': None}))
+        self.assertEqual(status, 200)
+        self.assertEqual(result['result'], 'success')
+
+        for body in ('[]', '"fields"', 'null'):
+            self.assertEqual(self.post('/multisig_wallet/post_construct', body),
+                             (400, {'result': 'error', 'error': 'body must be an object'}))
+
+
+if __name__ == '__main__':
+    unittest.main()
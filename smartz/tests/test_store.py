@@ -0,0 +1,110 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from smartz.multisig_wallet_constructor import Constructor as MultisigWalletConstructor
+from smartz.store import SourceStore, template_prefixes
+
+
+PREFIX = 'pragma solidity ^0.4.24;\nlibrary SafeMath {}\n'
+
+
+class SourceStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.store = SourceStore(self.directory, [PREFIX])
+
+    def chunks(self):
+        return sorted(os.listdir(os.path.join(self.directory, 'chunks')))
+
+    def test_put(self):
+        source = PREFIX + 'contract A {}\n'
+        key = self.store.put(source)
+
+        self.assertEqual(key, SourceStore.key(source))
+        self.assertIn(key, self.store)
+        self.assertEqual(self.store.get(key), source)
+        with self.store.open(key) as stored:
+            self.assertEqual(len(stored), len(source))
+            self.assertEqual([bytes(segment) for segment in stored.segments()],
+                             [PREFIX.encode('utf-8'), b'contract A {}\n'])
+
+        # bytes and str are the same source
+        self.assertEqual(self.store.put(source.encode('utf-8')), key)
+        self.assertEqual(self.store.refs(key), 2)
+
+    def test_shared_prefix(self):
+        first = self.store.put(PREFIX + 'contract A {}\n')
+        second = self.store.put(PREFIX + 'contract B {}\n')
+        other = self.store.put('contract C {}\n')
+
+        self.assertEqual(len(self.chunks()), 4)
+        self.assertEqual(self.store.stats(), {
+            'sources': 3, 'chunks': 4,
+            'chunk_bytes': len(PREFIX) + 3 * len('contract A {}\n'),
+            'source_bytes': 2 * len(PREFIX) + 3 * len('contract A {}\n'),
+        })
+
+        self.assertEqual(self.store.release(first), 0)
+        self.assertNotIn(first, self.store)
+        # the prefix is still used by the second source
+        self.assertEqual(len(self.chunks()), 3)
+        self.assertEqual(self.store.get(second), PREFIX + 'contract B {}\n')
+
+        self.store.release(second)
+        self.store.release(other)
+        self.assertEqual(self.chunks(), [])
+
+    def test_release(self):
+        key = self.store.put('contract A {}')
+        self.store.put('contract A {}')
+
+        self.assertEqual(self.store.release(key), 1)
+        self.assertEqual(self.store.get(key), 'contract A {}')
+        self.assertEqual(self.store.release(key), 0)
+        self.assertEqual(self.store.refs(key), 0)
+
+        with self.assertRaises(KeyError):
+            self.store.release(key)
+        with self.assertRaises(KeyError):
+            self.store.open(key)
+
+    def test_artifacts(self):
+        key = self.store.put('contract A {}')
+        self.assertIsNone(self.store.artifacts(key, 'solc'))
+
+        self.store.put_artifacts(key, 'solc', {'abi': [], 'bytecode': '60'})
+        self.assertEqual(self.store.artifacts(key, 'solc'), {'abi': [], 'bytecode': '60'})
+        self.assertIsNone(self.store.artifacts(key, 'other'))
+
+        self.store.release(key)
+        self.assertIsNone(self.store.artifacts(key, 'solc'))
+        with self.assertRaises(KeyError):
+            self.store.put_artifacts(key, 'solc', {})
+
+    def test_collect(self):
+        key = self.store.put('contract A {}')
+        os.mkdir(os.path.join(self.directory, 'sources', '.tmp-interrupted'))
+        with open(os.path.join(self.directory, 'chunks', 'unreferenced'), 'w') as fh:
+            fh.write('x')
+
+        self.assertEqual(self.store.collect(), 1)
+        self.assertEqual(os.listdir(os.path.join(self.directory, 'sources')), [key])
+        self.assertEqual(self.store.get(key), 'contract A {}')
+
+
+class TemplatePrefixesTest(unittest.TestCase):
+
+    def test_constructor_sources_start_with_a_prefix(self):
+        prefixes = template_prefixes(['multisig_wallet'])
+        self.assertEqual(prefixes, sorted(prefixes, key=len, reverse=True))
+
+        source = MultisigWalletConstructor().construct({'owners': ['0x' + '1' * 40], 'signs_count': 1})['source']
+        self.assertTrue(any(source.encode('utf-8').startswith(prefix) for prefix in prefixes))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+
+from smartz.dividend_token_constructor import Constructor as DividendTokenConstructor
+from smartz.multisig_wallet_constructor import Constructor as MultisigWalletConstructor
+
+
+ADDRESS = '0x' + 'aB' * 20
+
+CASES = [
+    (DividendTokenConstructor, {'name': 'My Token', 'symbol': 'MTK', 'decimals': 2, 'premint': 5}),
+    (DividendTokenConstructor, {'name': 'My Token', 'symbol': 'MTK', 'decimals': 2, 'is_mintable': True,
+                                'max_tokens_count': 100, 'is_pull_dividends': True, 'is_packed_storage': True}),
+    (MultisigWalletConstructor, {'owners': [ADDRESS, '0x' + '1' * 40], 'signs_count': 2}),
+    (MultisigWalletConstructor, {'owners': [ADDRESS], 'signs_count': 1, 'thaw_ts': 10, 'is_packed_storage': True}),
+]
+
+
+class ConstructStreamTest(unittest.TestCase):
+
+    def test_text(self):
+        for cls, fields in CASES:
+            expected = cls().construct(fields)
+            result = cls().construct_stream(fields)
+
+            self.assertEqual(''.join(result.pop('segments')), expected.pop('source'))
+            self.assertEqual(result, expected)
+
+    def test_binary(self):
+        for cls, fields in CASES:
+            source = cls().construct(fields)['source']
+            segments = cls().construct_stream(fields, binary=True)['segments']
+
+            self.assertEqual(b''.join(bytes(segment) for segment in segments), source.encode('utf-8'))
+
+    def test_errors(self):
+        for cls, fields in ((DividendTokenConstructor, {'name': 'My Token'}), (MultisigWalletConstructor, None)):
+            expected = cls().construct(fields)
+            self.assertEqual(expected['result'], 'error')
+            self.assertEqual(cls().construct_stream(fields), expected)
+            self.assertEqual(cls().construct_stream(fields, binary=True), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from smartz import template
+from smartz.template import Template, TemplateVariants
+
+
+class TemplateTest(unittest.TestCase):
+
+    def test_render(self):
+        tpl = Template('contract %name% {%body%}\n', ['name', 'body'])
+        self.assertEqual(tpl.render({'name': 'A', 'body': 'uint x;'}), 'contract A {uint x;}\n')
+        # values may be iterables of segments
+        self.assertEqual(tpl.render({'name': 'B', 'body': ['uint x;', ' ', 'uint y;']}),
+                         'contract B {uint x; uint y;}\n')
+
+    def test_repeated_placeholder(self):
+        tpl = Template('%a%-%a%', ['a'])
+        self.assertEqual(tpl.render({'a': 'x'}), 'x-x')
+
+    def test_segments(self):
+        tpl = Template('contract %name% {%body%}', ['name', 'body'])
+        values = {'name': 'A', 'body': ['', 'uint x;']}
+
+        segments = list(tpl.segments(values))
+        self.assertEqual(''.join(segments), tpl.render(values))
+        # empty values are skipped
+        self.assertNotIn('', segments)
+
+        byte_segments = list(tpl.byte_segments(values))
+        self.assertEqual(b''.join(bytes(segment) for segment in byte_segments), tpl.render(values).encode('utf-8'))
+
+    def test_passthrough(self):
+        tpl = Template('a %payment_code% %b%', ['b'])
+        self.assertEqual(tpl.render({'b': 'c'}), 'a %payment_code% c')
+
+    def test_constants(self):
+        tpl = Template('%type% x = %type%(%value%);', ['value'], constants={'type': 'uint128'})
+        self.assertEqual(tpl.placeholders, frozenset(['value']))
+        self.assertEqual(tpl.render({'value': '1'}), 'uint128 x = uint128(1);')
+
+    def test_prefix(self):
+        self.assertEqual(Template('pragma solidity ^0.4.24;\n%code%', ['code']).prefix, b'pragma solidity ^0.4.24;\n')
+        self.assertEqual(Template('%code%', ['code']).prefix, b'')
+
+    def test_errors(self):
+        with self.assertRaisesRegex(AssertionError, 'not substituted: b'):
+            Template('%a% %b%', ['a'])
+        with self.assertRaisesRegex(AssertionError, 'failed to replace: c'):
+            Template('%a%', ['a', 'c'])
+        with self.assertRaisesRegex(AssertionError, 'failed to replace: unused'):
+            Template('%a%', ['a'], constants={'unused': ''})
+
+        tpl = Template('%a% %b%', ['a', 'b'])
+        with self.assertRaises(AssertionError):
+            tpl.render({'a': ''})
+        with self.assertRaises(AssertionError):
+            tpl.render({'a': '', 'b': '', 'c': ''})
+        with self.assertRaises(AssertionError):
+            tpl.segments({'a': ''})
+
+
+class FileTemplateTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        patcher = mock.patch.object(template, 'TEMPLATES_DIR', self.directory)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def write(self, name, text):
+        with open(os.path.join(self.directory, name), 'w') as fh:
+            fh.write(text)
+
+    def test_lazy_loading(self):
+        self.write('a.sol', 'contract A {}\n')
+        self.write('b.sol', 'contract %name% {}\n')
+        self.write('empty.sol', '')
+
+        tpl = Template.from_files(['a.sol', 'empty.sol', 'b.sol'], ['name'])
+        self.assertFalse(tpl.loaded)
+        self.assertEqual(tpl.render({'name': 'B'}), 'contract A {}\ncontract B {}\n')
+        self.assertTrue(tpl.loaded)
+
+        # literal parts of files are views of the mapping
+        self.assertIsInstance(next(tpl.byte_segments({'name': 'B'})), memoryview)
+
+    def test_errors_on_first_use(self):
+        self.write('a.sol', '%unknown%')
+        tpl = Template.from_files(['a.sol'], [])
+        with self.assertRaisesRegex(AssertionError, 'not substituted: unknown'):
+            tpl.load()
+
+    def test_variants(self):
+        self.write('a.sol', 'contract %name% {}')
+        variants = TemplateVariants({
+            'one': Template.from_files(['a.sol'], ['name']),
+            'two': Template('%name%', ['name']),
+        })
+
+        self.assertIn('one', variants)
+        self.assertNotIn('three', variants)
+        self.assertFalse(variants.loaded)
+        self.assertTrue(variants.load().loaded)
+        self.assertEqual(variants['one'].render({'name': 'X'}), 'contract X {}')
+        self.assertEqual(len(variants.templates()), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
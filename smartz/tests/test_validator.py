@@ -0,0 +1,150 @@
+import unittest
+
+from smartz.dividend_token_constructor import Constructor as DividendTokenConstructor
+from smartz.multisig_wallet_constructor import Constructor as MultisigWalletConstructor
+from smartz.validator import compile_schema, resolve_ref
+
+
+ADDRESS = '0x' + '1' * 40
+
+SCHEMA = {
+    'type': 'object',
+    'required': ['name', 'owners'],
+    'additionalProperties': False,
+    'properties': {
+        'name': {'type': 'string', 'minLength': 3, 'maxLength': 5, 'pattern': '^[a-z]+$'},
+        'count': {'type': 'integer', 'minimum': 1, 'maximum': 10, 'default': 2},
+        'flag': {'type': 'boolean'},
+        'owners': {'type': 'array', 'items': {'$ref': '#/definitions/address'}, 'minItems': 1, 'maxItems': 2},
+        'thaw_ts': {'title': 'Thaw time', '$ref': '#/definitions/unixTime'},
+    },
+}
+
+
+class CompileSchemaTest(unittest.TestCase):
+
+    def setUp(self):
+        self.validate = compile_schema(SCHEMA)
+
+    def test_valid(self):
+        self.assertEqual(self.validate({'name': 'abc', 'owners': [ADDRESS], 'count': 10, 'flag': False}), {})
+
+    def test_not_an_object(self):
+        for fields in (None, [1], 'abc', 5):
+            self.assertEqual(self.validate(fields), {'': 'must be an object'})
+
+    def test_required_and_unknown(self):
+        self.assertEqual(self.validate({'other': 1}), {
+            'name': 'This field is required',
+            'owners': 'This field is required',
+            'other': 'Unknown field',
+        })
+
+    def test_types(self):
+        errors = self.validate({'name': 5, 'owners': ADDRESS, 'count': True, 'flag': 1})
+        self.assertEqual(errors, {
+            'name': 'must be a string',
+            'owners': 'must be a list',
+            'count': 'must be an integer',
+            'flag': 'must be a boolean',
+        })
+
+    def test_limits(self):
+        self.assertEqual(self.validate({'name': 'ab', 'owners': [], 'count': 0}), {
+            'name': 'must be at least 3 characters long',
+            'owners': 'must contain at least 1 items',
+            'count': 'must be at least 1',
+        })
+        self.assertEqual(self.validate({'name': 'abcdef', 'owners': [ADDRESS] * 3, 'count': 11}), {
+            'name': 'must be at most 5 characters long',
+            'owners': 'must contain at most 2 items',
+            'count': 'must be at most 10',
+        })
+        self.assertEqual(self.validate({'name': 'ABC', 'owners': [ADDRESS]}), {'name': 'has invalid format'})
+
+    def test_refs(self):
+        self.assertEqual(self.validate({'name': 'abc', 'owners': [ADDRESS, '0x12']}), {
+            'owners': 'item 2: has invalid format',
+        })
+        self.assertEqual(self.validate({'name': 'abc', 'owners': [ADDRESS], 'thaw_ts': -1}), {
+            'thaw_ts': 'must be at least 0',
+        })
+        self.assertEqual(self.validate({'name': 'abc', 'owners': [ADDRESS], 'thaw_ts': '1'}), {
+            'thaw_ts': 'must be an integer',
+        })
+
+    def test_resolve_ref(self):
+        self.assertEqual(resolve_ref({'title': 'Thaw time', '$ref': '#/definitions/unixTime'}), {
+            'title': 'Thaw time', 'type': 'integer', 'minimum': 0,
+        })
+        self.assertEqual(resolve_ref({'type': 'string'}), {'type': 'string'})
+        with self.assertRaises(ValueError):
+            resolve_ref({'$ref': '#/definitions/unknown'})
+        with self.assertRaises(ValueError):
+            resolve_ref({'$ref': 'http://example.com/schema#/definitions/address'})
+
+    def test_unsupported_schemas(self):
+        with self.assertRaises(ValueError):
+            compile_schema({'type': 'array'})
+        with self.assertRaises(ValueError):
+            compile_schema({'type': 'object', 'properties': {'a': {'type': 'string', 'format': 'email'}}})
+        with self.assertRaises(ValueError):
+            compile_schema({'type': 'object', 'properties': {'a': {'minimum': 1}}})
+
+
+class ConstructorValidateTest(unittest.TestCase):
+
+    def test_not_an_object(self):
+        for constructor in (DividendTokenConstructor(), MultisigWalletConstructor()):
+            for fields in (None, [1], 'abc'):
+                expected = {'result': 'error', 'errors': {'': 'must be an object'}}
+                self.assertEqual(constructor.validate(fields), expected)
+                self.assertEqual(constructor.construct(fields), expected)
+
+    def test_dividend_token(self):
+        constructor = DividendTokenConstructor()
+        fields = {'name': 'My Token', 'symbol': 'MTK', 'decimals': 2}
+
+        self.assertEqual(constructor.validate(fields), {'result': 'success'})
+        self.assertEqual(constructor.validate(dict(fields, premint=10, max_tokens_count=5)), {
+            'result': 'error', 'errors': {'premint': "Premint count can't be more then maximum tokens count"},
+        })
+        self.assertEqual(constructor.validate(dict(fields, decimals=19)), {
+            'result': 'error', 'errors': {'decimals': 'must be at most 18'},
+        })
+
+    def test_dividends_gas_budget(self):
+        constructor = DividendTokenConstructor()
+        fields = {'name': 'My Token', 'symbol': 'MTK', 'decimals': 2, 'is_packed_storage': True}
+        costs = constructor.gas_model()['variants']['DividendToken.packed']
+        minimum = constructor.min_gas_budget('DividendToken.packed')
+
+        # the margin is reserved on top of the gas model estimate
+        self.assertGreater(minimum, costs['base'] + 2 * costs['iteration'])
+        self.assertEqual(constructor.validate(dict(fields, dividends_gas_budget=minimum - 1)), {
+            'result': 'error', 'errors': {'dividends_gas_budget': 'Gas budget must be at least {}'.format(minimum)},
+        })
+
+        # a request has to move past the emission it stopped on, the override is at least 1
+        result = constructor.construct(dict(fields, dividends_gas_budget=minimum))
+        self.assertIn('fits dividends requests into {} gas'.format(minimum), result['source'])
+        self.assertIn('return 1;', result['source'])
+
+        for variant in constructor.gas_model()['variants']:
+            self.assertEqual(constructor.max_iterations(variant, constructor.min_gas_budget(variant)), 2)
+            self.assertEqual(constructor.max_iterations(variant, constructor.min_gas_budget(variant) - 1), 1)
+
+    def test_multisig_wallet(self):
+        constructor = MultisigWalletConstructor()
+
+        self.assertEqual(constructor.validate({'signs_count': 1, 'owners': [ADDRESS]}), {'result': 'success'})
+        self.assertEqual(constructor.validate({'signs_count': 2, 'owners': [ADDRESS]}), {
+            'result': 'error', 'errors': {'signs_count': 'Signatures quorum is greater than total number of owners'},
+        })
+        self.assertEqual(constructor.validate({'signs_count': 1, 'owners': ['0x12'], 'thaw_ts': -1}), {
+            'result': 'error', 'errors': {'owners': 'item 1: has invalid format', 'thaw_ts': 'must be at least 0'},
+        })
+
+
+if __name__ == '__main__':
+    unittest.main()
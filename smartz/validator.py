@@ -0,0 +1,156 @@
+import re
+
+
+# definitions referenced by constructor schemas as #/definitions/<name>
+DEFINITIONS = {
+    'address': {
+        'type': 'string',
+        'pattern': '^0x[0-9a-fA-F]{40}$',
+    },
+    'unixTime': {
+        'type': 'integer',
+        'minimum': 0,
+    },
+}
+
+# keywords which do not affect validation
+_ANNOTATIONS = frozenset(('title', 'description', 'default'))
+
+
+def _is_integer(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+_TYPES = {
+    'object': (lambda value: isinstance(value, dict), 'must be an object'),
+    'array': (lambda value: isinstance(value, (list, tuple)), 'must be a list'),
+    'string': (lambda value: isinstance(value, str), 'must be a string'),
+    'integer': (_is_integer, 'must be an integer'),
+    'boolean': (lambda value: isinstance(value, bool), 'must be a boolean'),
+}
+
+
+def resolve_ref(schema, definitions=DEFINITIONS):
+    """Inlines #/definitions/ reference of a property schema."""
+    if '$ref' not in schema:
+        return schema
+
+    ref = schema['$ref']
+    prefix = '#/definitions/'
+    if not ref.startswith(prefix) or ref[len(prefix):] not in definitions:
+        raise ValueError('unsupported schema reference: {}'.format(ref))
+
+    # sibling keywords (title, description) are annotations only
+    resolved = dict(definitions[ref[len(prefix):]])
+    resolved.update((key, value) for key, value in schema.items() if key != '$ref')
+    return resolved
+
+
+def _compile_value(schema, definitions):
+    """Compiles a non-object schema into a function returning an error message or None."""
+    schema = resolve_ref(schema, definitions)
+    checks = []
+
+    for keyword, arg in schema.items():
+        if keyword in _ANNOTATIONS:
+            continue
+
+        if keyword == 'type':
+            type_check, message = _TYPES[arg]
+            checks.insert(0, (type_check, message))
+        elif keyword == 'minimum':
+            checks.append((lambda value, arg=arg: value >= arg, 'must be at least {}'.format(arg)))
+        elif keyword == 'maximum':
+            checks.append((lambda value, arg=arg: value <= arg, 'must be at most {}'.format(arg)))
+        elif keyword == 'minLength':
+            checks.append((lambda value, arg=arg: len(value) >= arg, 'must be at least {} characters long'.format(arg)))
+        elif keyword == 'maxLength':
+            checks.append((lambda value, arg=arg: len(value) <= arg, 'must be at most {} characters long'.format(arg)))
+        elif keyword == 'pattern':
+            search = re.compile(arg).search
+            checks.append((lambda value, search=search: search(value) is not None, 'has invalid format'))
+        elif keyword == 'minItems':
+            checks.append((lambda value, arg=arg: len(value) >= arg, 'must contain at least {} items'.format(arg)))
+        elif keyword == 'maxItems':
+            checks.append((lambda value, arg=arg: len(value) <= arg, 'must contain at most {} items'.format(arg)))
+        elif keyword == 'items':
+            item_check = _compile_value(arg, definitions)
+
+            def check_items(value, item_check=item_check):
+                for idx, item in enumerate(value):
+                    error = item_check(item)
+                    if error is not None:
+                        return 'item {}: {}'.format(idx + 1, error)
+                return None
+
+            checks.append((check_items, None))
+        else:
+            raise ValueError('unsupported schema keyword: {}'.format(keyword))
+
+    if 'type' not in schema:
+        raise ValueError('schema type is required')
+
+    checks = tuple(checks)
+
+    def check(value):
+        for predicate, message in checks:
+            if message is None:
+                error = predicate(value)
+                if error is not None:
+                    return error
+            elif not predicate(value):
+                return message
+        return None
+
+    return check
+
+
+def compile_schema(schema, definitions=DEFINITIONS):
+    """
+    Compiles a constructor json schema (object of flat properties) into a function which maps
+    `fields` to a dict of errors by field name (empty if fields are valid).
+    """
+    if schema.get('type') != 'object':
+        raise ValueError('constructor schema must describe an object')
+
+    property_checks = tuple(
+        (name, _compile_value(property_schema, definitions))
+        for name, property_schema in schema['properties'].items()
+    )
+    required = tuple(schema.get('required', ()))
+    known = frozenset(schema['properties'])
+    additional = schema.get('additionalProperties', True)
+
+    def validate(fields):
+        if not isinstance(fields, dict):
+            return {'': 'must be an object'}
+
+        errors = {}
+        for name in required:
+            if name not in fields:
+                errors[name] = 'This field is required'
+
+        if not additional:
+            for name in fields:
+                if name not in known:
+                    errors[name] = 'Unknown field'
+
+        for name, check in property_checks:
+            if name in fields and name not in errors:
+                error = check(fields[name])
+                if error is not None:
+                    errors[name] = error
+
+        return errors
+
+    return validate
+
+
+def schema_validator(constructor):
+    """Returns compiled validator of constructor's get_params() schema, compiled once per class."""
+    cls = constructor if isinstance(constructor, type) else constructor.__class__
+    validate = cls.__dict__.get('_compiled_validator')
+    if validate is None:
+        validate = compile_schema(cls.get_params.payload(cls).data['schema'])
+        cls._compiled_validator = validate
+    return validate
@@ -0,0 +1,173 @@
+'use strict';
+
+// Helpers for tests of contracts generated by the smartz constructors (see smartz/).
+//
+// Constructors are run with `python3 -m smartz.batch`, the interpreter can be changed with SMARTZ_PYTHON
+// (it must be able to import smartz.api, e.g. via PYTHONPATH). Suites using them call skipWithoutConstructors(),
+// so they are skipped where there is no such interpreter. Sources are compiled with solc-js
+// of node_modules, the same compiler and optimizer settings truffle uses.
+
+const childProcess = require('child_process');
+const path = require('path');
+const solc = require('solc');
+
+
+export const ROOT = path.resolve(__dirname, '..', '..');
+
+export const DEFAULT_GAS = 4000000;
+
+const OPTIMIZER_RUNS = 200;
+
+/// dividend_token fields selecting each parent contract of Token
+export const DIVIDEND_TOKEN_PARENT_FIELDS = {
+    'DividendToken': {},
+    'MintableDividendToken': {is_mintable: true},
+    'CappedDividendToken': {is_mintable: true, max_tokens_count: 10000},
+    'PausableDividendToken': {is_pausable: true},
+    'PausableMintableDividendToken': {is_pausable: true, is_mintable: true},
+    'PausableCappedDividendToken': {is_pausable: true, is_mintable: true, max_tokens_count: 10000}
+};
+
+
+const PYTHON = process.env.SMARTZ_PYTHON || 'python3';
+
+function python(args, input) {
+    return childProcess.execFileSync(PYTHON, args, {
+        cwd: ROOT,
+        input: input,
+        encoding: 'utf-8',
+        maxBuffer: 256 * 1024 * 1024
+    });
+}
+
+export function runPython(args) {
+    return python(args, '');
+}
+
+
+let unavailableReason;
+
+/// Why constructors can't be run here, or null if they can.
+export function constructorsUnavailable() {
+    if (unavailableReason === undefined) {
+        const result = childProcess.spawnSync(PYTHON, ['-c', 'import smartz.api.constructor_engine'], {
+            cwd: ROOT,
+            encoding: 'utf-8'
+        });
+        if (result.error)
+            unavailableReason = `${PYTHON} is not available (${result.error.code})`;
+        else if (result.status != 0)
+            unavailableReason = `${PYTHON} can't import smartz.api`;
+        else
+            unavailableReason = null;
+    }
+    return unavailableReason;
+}
+
+/// Skips tests of the calling contract() / describe() block if constructors can't be run.
+export function skipWithoutConstructors() {
+    before(function() {
+        const reason = constructorsUnavailable();
+        if (reason) {
+            console.log(`    skipping tests of generated contracts: ${reason}, set SMARTZ_PYTHON / PYTHONPATH`);
+            this.skip();
+        }
+    });
+}
+
+
+/// Constructs a contract for each fields object, returns list of construct() results.
+export function construct(constructorName, fieldsList) {
+    const input = fieldsList.map(fields => JSON.stringify(fields)).join('\n') + '\n';
+    const output = python(['-m', 'smartz.batch', constructorName, '--workers', '0'], input);
+
+    return output.split('\n').filter(line => line.trim()).map((line, i) => {
+        const result = JSON.parse(line).construct;
+        if (result.result != 'success')
+            throw new Error(`construct(${JSON.stringify(fieldsList[i])}) failed: ${JSON.stringify(result.errors)}`);
+
+        // payment code is substituted by the platform, there is none here
+        result.source = result.source.replace('%payment_code%', '');
+        return result;
+    });
+}
+
+
+const compiled = new Map();
+
+/// Compiles source with solc-js, returns {abi, bytecode} of contractName.
+export function compile(source, contractName) {
+    contractName = contractName || 'Token';
+    const key = contractName + '\n' + source;
+    if (compiled.has(key))
+        return compiled.get(key);
+
+    const input = {
+        language: 'Solidity',
+        sources: {'contract.sol': {content: source}},
+        settings: {
+            optimizer: {enabled: true, runs: OPTIMIZER_RUNS},
+            outputSelection: {'*': {'*': ['abi', 'evm.bytecode.object']}}
+        }
+    };
+    const output = JSON.parse(solc.compileStandardWrapper(JSON.stringify(input)));
+
+    const errors = (output.errors || []).filter(error => error.severity == 'error');
+    if (errors.length)
+        throw new Error(errors.map(error => error.formattedMessage).join('\n'));
+
+    const contract = output.contracts['contract.sol'][contractName];
+    const result = {abi: contract.abi, bytecode: contract.evm.bytecode.object};
+    compiled.set(key, result);
+    return result;
+}
+
+
+function promisify(fn) {
+    return (...args) => new Promise((resolve, reject) =>
+        fn(...args, (error, result) => error ? reject(error) : resolve(result)));
+}
+
+const sendTransaction = promisify(web3.eth.sendTransaction.bind(web3.eth));
+const getTransactionReceipt = promisify(web3.eth.getTransactionReceipt.bind(web3.eth));
+
+/// Sends a transaction, returns its receipt.
+export async function transact(txParams) {
+    return await getTransactionReceipt(await sendTransaction(Object.assign({gas: DEFAULT_GAS}, txParams)));
+}
+
+
+/**
+ * Deploys compiled contract (without constructor arguments), returns a wrapper which has:
+ *  - an async method for each function of the ABI: constant functions return the call result,
+ *    the others take transaction parameters as the last argument and return the receipt;
+ *  - address and sendTransaction(txParams), e.g. to send ether to the contract.
+ */
+export async function deploy(contract, txParams) {
+    const receipt = await transact(Object.assign({data: '0x' + contract.bytecode}, txParams));
+    const instance = web3.eth.contract(contract.abi).at(receipt.contractAddress);
+
+    const wrapper = {
+        address: receipt.contractAddress,
+        sendTransaction: params => transact(Object.assign({to: receipt.contractAddress}, params))
+    };
+
+    for (const entry of contract.abi) {
+        if (entry.type != 'function')
+            continue;
+
+        const method = instance[entry.name];
+        if (entry.constant) {
+            wrapper[entry.name] = promisify(method.call.bind(method));
+        }
+        else {
+            const send = promisify(method.sendTransaction.bind(method));
+            wrapper[entry.name] = async (...args) => {
+                const params = args.length > entry.inputs.length ? args.pop() : {};
+                return await getTransactionReceipt(await send(...args, Object.assign({gas: DEFAULT_GAS}, params)));
+            };
+        }
+    }
+
+    return wrapper;
+}
@@ -0,0 +1,58 @@
+'use strict';
+
+import '../helpers/typeExt';
+import {construct, compile, deploy, skipWithoutConstructors} from '../helpers/smartz';
+
+const l = console.log;
+
+
+contract('GeneratedMultiSigWalletGas', function(accounts) {
+
+    skipWithoutConstructors();
+
+    const role = {
+        owner1: accounts[0],
+        owner2: accounts[1],
+        owner3: accounts[2],
+        receiver: accounts[3]
+    };
+
+    /// gas of each owner's confirmation of an ether transfer by a 3 of 3 wallet
+    async function sendEtherGas(isPackedStorage) {
+        const fields = {
+            owners: [role.owner1, role.owner2, role.owner3],
+            signs_count: 3,
+            is_packed_storage: isPackedStorage
+        };
+        const wallet = await deploy(compile(construct('multisig_wallet', [fields])[0].source, 'MultiSigWallet'),
+                                    {from: role.owner1});
+        await wallet.sendTransaction({from: role.owner1, value: web3.toWei(10, 'finney')});
+
+        const receiverBalanceWas = web3.eth.getBalance(role.receiver);
+        const gas = [];
+        for (const owner of [role.owner1, role.owner2, role.owner3])
+            gas.push((await wallet.sendEther(role.receiver, web3.toWei(10, 'finney'), {from: owner})).gasUsed);
+
+        assert(web3.eth.getBalance(role.receiver).sub(receiverBalanceWas).eq(web3.toWei(10, 'finney')),
+               'Ether was sent after the last confirmation');
+        return gas;
+    }
+
+
+    it("Packed storage makes pending operations cheaper", async function() {
+        /* SCENARIO
+         *
+         * Creating an unpacked and a packed 3 of 3 wallet and sending ether from both.
+         * Creating the pending operation by the first confirmation saves a zero to nonzero SSTORE
+         * in the packed one, the next confirmation reads one storage slot less. Only the relation is checked,
+         * absolute costs depend on the gas schedule of the chain.
+         */
+        const [unpackedCreate, unpackedConfirm, ] = await sendEtherGas(false);
+        const [packedCreate, packedConfirm, ] = await sendEtherGas(true);
+        l('pending operation creation: {0} -> {1} gas, confirmation: {2} -> {3} gas'.format(
+            unpackedCreate, packedCreate, unpackedConfirm, packedConfirm));
+
+        assert(packedCreate < unpackedCreate, 'Packed pending operation saves a storage slot');
+        assert(packedConfirm < unpackedConfirm, 'Packed pending operation is cheaper to confirm');
+    });
+});
@@ -0,0 +1,183 @@
+'use strict';
+
+import expectThrow from 'openzeppelin-solidity/test/helpers/expectThrow';
+import '../helpers/typeExt';
+import {construct, compile, deploy, runPython, skipWithoutConstructors, DIVIDEND_TOKEN_PARENT_FIELDS}
+    from '../helpers/smartz';
+
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+
+const BASE_FIELDS = {name: 'Test Token', symbol: 'TTK', decimals: 0};
+
+const OPTION_FLAGS = ['is_constant_gas_dividends', 'is_pull_dividends', 'is_packed_storage'];
+
+
+/// fields of every option combination, optionally limited to the flags in `only` being set
+function allOptions(only) {
+    const result = [];
+    for (let mask = 0; mask < 1 << OPTION_FLAGS.length; mask++) {
+        const options = {};
+        OPTION_FLAGS.forEach((flag, i) => { if (mask & 1 << i) options[flag] = true; });
+        if (!only || Object.keys(only).every(flag => !!options[flag] == only[flag]))
+            result.push(options);
+    }
+    return result;
+}
+
+function describeOptions(options) {
+    return [
+        options.is_constant_gas_dividends ? 'per_share' : 'emissions',
+        options.is_pull_dividends ? 'pull' : 'push',
+        options.is_packed_storage ? 'packed' : 'unpacked'
+    ].join(', ');
+}
+
+function finney(amount) {
+    return new web3.BigNumber(web3.toWei(amount, 'finney'));
+}
+
+
+contract('GeneratedDividendToken', function(accounts) {
+
+    skipWithoutConstructors();
+
+    const role = {
+        owner: accounts[0],
+        holder1: accounts[1],
+        holder2: accounts[2],
+        investor: accounts[3],
+        minted: accounts[4]
+    };
+
+    /// requests dividends of holder, checks that dividendsOf() reported the amount paid, returns it
+    async function requestDividends(token, holder) {
+        const [pending, emissionsLeft] = await token.dividendsOf(holder);
+        const balanceWas = web3.eth.getBalance(holder);
+
+        await token.requestDividends({from: holder, gasPrice: 0});
+
+        const paid = web3.eth.getBalance(holder).sub(balanceWas);
+        assert(paid.eq(pending), 'dividendsOf() reported {0}, requestDividends() paid {1}'.format(pending, paid));
+        return [paid, emissionsLeft];
+    }
+
+
+    it("Compiles every variant", async function() {
+        /* SCENARIO
+         *
+         * Constructing a token for every parent contract and every dividends option and compiling it
+         * with solc of node_modules. Then precompiling all constructor_args variants.
+         */
+        const fieldsList = [];
+        for (const parentFields of Object.values(DIVIDEND_TOKEN_PARENT_FIELDS))
+            for (const options of allOptions())
+                fieldsList.push(Object.assign({premint: 100}, BASE_FIELDS, parentFields, options));
+
+        const sources = new Set(construct('dividend_token', fieldsList).map(result => result.source));
+        for (const source of sources)
+            compile(source);
+
+        // precompile exits with an error if any variant doesn't compile
+        const output = fs.mkdtempSync(path.join(os.tmpdir(), 'precompiled-'));
+        runPython(['-m', 'smartz.precompile', '--output', output]);
+        assert.equal(fs.readdirSync(output).length, 36, 'All constructor_args variants were precompiled');
+    });
+
+
+    it("Pays the same dividends in every variant", async function() {
+        /* SCENARIO
+         *
+         * For every dividends option: creating a mintable token with premint to owner.
+         * Investor sends some ether to token, owner transfers a part of tokens to holder1,
+         * tokens are minted to holder2 and investor sends some more ether.
+         * Every holder requests dividends: the amount reported by dividendsOf() is paid
+         * and every variant pays the same.
+         */
+        const expected = {owner: finney(160), holder1: finney(40), holder2: finney(100)};
+
+        for (const options of allOptions()) {
+            const fields = Object.assign({premint: 100, is_mintable: true}, BASE_FIELDS, options);
+            const token = await deploy(compile(construct('dividend_token', [fields])[0].source), {from: role.owner});
+
+            await token.sendTransaction({from: role.investor, value: finney(100)});
+            await token.transfer(role.holder1, 40, {from: role.owner, gasPrice: 0});
+            await token.mint(role.holder2, 100, {from: role.owner, gasPrice: 0});
+            await token.sendTransaction({from: role.investor, value: finney(200)});
+
+            const ownerBalanceWas = web3.eth.getBalance(role.owner);
+            // the transfer paid the owner in push variants
+            const pushed = options.is_pull_dividends ? 0 : finney(100);
+            const ownerBalanceDiff = () => web3.eth.getBalance(role.owner).sub(ownerBalanceWas).add(pushed);
+
+            for (const holder of ['owner', 'holder1', 'holder2']) {
+                const [paid, emissionsLeft] = await requestDividends(token, role[holder]);
+                assert(emissionsLeft.eq(0), 'No emissions are left for ' + holder);
+                if ('owner' != holder)
+                    assert(paid.eq(expected[holder]),
+                           '{0} got {1} ({2})'.format(holder, paid, describeOptions(options)));
+            }
+            assert(ownerBalanceDiff().eq(expected.owner), 'owner got dividends ({0})'.format(describeOptions(options)));
+
+            // nothing is left and nothing is paid twice
+            assert(web3.eth.getBalance(token.address).eq(0), 'All dividends were paid');
+            for (const holder of ['owner', 'holder1', 'holder2']) {
+                const [paid, ] = await requestDividends(token, role[holder]);
+                assert(paid.eq(0), 'Dividends are paid only once');
+            }
+        }
+    });
+
+
+    it("Splits dividends requests by gas budget", async function() {
+        /* SCENARIO
+         *
+         * For every 'emissions' option: creating a mintable token with a small dividends gas budget.
+         * Then many emissions happen, each followed by a deposit.
+         * Owner requests dividends until no emissions are left: every request pays what dividendsOf()
+         * reported, more than one request is needed and owner gets all dividends in the end.
+         */
+        const emissions = 30;
+
+        for (const options of allOptions({is_constant_gas_dividends: false})) {
+            const fields = Object.assign({premint: 100, is_mintable: true, dividends_gas_budget: 200000},
+                                         BASE_FIELDS, options);
+            const token = await deploy(compile(construct('dividend_token', [fields])[0].source), {from: role.owner});
+
+            for (let i = 1; i <= emissions; i++) {
+                await token.mint(role.minted, 1, {from: role.owner, gasPrice: 0});
+                // owner's share of each deposit is 1 finney
+                await token.sendTransaction({from: role.investor, value: finney(100 + i).div(100)});
+            }
+
+            let total = new web3.BigNumber(0);
+            let requests = 0;
+            for (;;) {
+                const [paid, emissionsLeft] = await requestDividends(token, role.owner);
+                total = total.add(paid);
+                requests++;
+                if (emissionsLeft.eq(0))
+                    break;
+                assert(requests < emissions, 'Every request processes emissions');
+            }
+
+            assert(requests > 1, 'Dividends were split into several requests ({0})'.format(describeOptions(options)));
+            assert(total.eq(finney(emissions)), 'Owner got all dividends ({0})'.format(describeOptions(options)));
+        }
+    });
+
+
+    it("Caps minting", async function() {
+        /* SCENARIO
+         *
+         * Creating a capped token with premint, minting up to the cap and checking that
+         * minting above it fails.
+         */
+        const fields = Object.assign({premint: 100, is_mintable: true, max_tokens_count: 150}, BASE_FIELDS);
+        const token = await deploy(compile(construct('dividend_token', [fields])[0].source), {from: role.owner});
+
+        await token.mint(role.holder1, 50, {from: role.owner});
+        await expectThrow(token.mint(role.holder1, 1, {from: role.owner}));
+    });
+});
@@ -0,0 +1,106 @@
+'use strict';
+
+import '../helpers/typeExt';
+import {construct, compile, deploy, skipWithoutConstructors, ROOT, DIVIDEND_TOKEN_PARENT_FIELDS}
+    from '../helpers/smartz';
+
+const fs = require('fs');
+const path = require('path');
+
+const GAS_MODEL_PATH = path.join(ROOT, 'smartz', 'templates', 'dividend_token', 'gas_model.json');
+
+const BASE_FIELDS = {name: 'Test Token', symbol: 'TTK', decimals: 0, premint: 100};
+
+// emissions every token has: the one of the constructor (zero supply) and the premint
+const INITIAL_EMISSIONS = 2;
+
+
+/// parent contract and dividend fields of a gas model variant, e.g. 'MintableDividendToken.pull.packed'
+function variantFields(variant) {
+    const [parent, ...options] = variant.split('.');
+    return Object.assign({}, BASE_FIELDS, DIVIDEND_TOKEN_PARENT_FIELDS[parent], {
+        is_pull_dividends: options.includes('pull'),
+        is_packed_storage: options.includes('packed')
+    });
+}
+
+/// payout and layout part of a gas model variant, e.g. '.pull.packed' ('' for push and unpacked)
+function variantOptions(variant) {
+    return variant.slice(variant.split('.')[0].length);
+}
+
+
+contract('GeneratedDividendTokenGas', function(accounts) {
+
+    skipWithoutConstructors();
+
+    const role = {
+        owner: accounts[0],
+        investor: accounts[3],
+        minted: accounts[4]
+    };
+
+    /// gas of the first dividends request of owner, after `mints` emissions each followed by a deposit
+    async function requestDividendsGas(fields, mints) {
+        const token = await deploy(compile(construct('dividend_token', [fields])[0].source), {from: role.owner});
+
+        await token.sendTransaction({from: role.investor, value: web3.toWei(1, 'finney')});
+        for (let i = 0; i < mints; i++) {
+            await token.mint(role.minted, 1, {from: role.owner});
+            await token.sendTransaction({from: role.investor, value: web3.toWei(1, 'finney')});
+        }
+
+        const [dividends, emissionsLeft] = await token.dividendsOf(role.owner);
+        assert(dividends.gt(0) && emissionsLeft.eq(0), 'Request pays dividends of all emissions');
+
+        return (await token.requestDividends({from: role.owner})).gasUsed;
+    }
+
+
+    it("Measures requestDividends() gas of the gas model variants", async function() {
+        /* SCENARIO
+         *
+         * For every variant of the gas model: measuring gas of the first dividends request of owner
+         * (first-time SSTOREs, all emissions processed by the request).
+         * The iteration gas is measured on mintable variants with a few and many emissions, the base
+         * is the rest of the gas of a request processing the initial emissions only.
+         * Set GAS_MODEL_OUTPUT=file to write the measured model. The gas model is for the London schedule
+         * while the test chain may run an older one, so measured costs aren't compared with the model here:
+         * regenerate it from a London node.
+         */
+        const emissions = 10;
+        const model = JSON.parse(fs.readFileSync(GAS_MODEL_PATH));
+        const variants = Object.keys(model.variants);
+
+        // iteration gas by variantOptions()
+        const iterations = {};
+        const initialGas = {};
+        for (const variant of variants.filter(variant => variantFields(variant).is_mintable)) {
+            const fields = variantFields(variant);
+            const options = variantOptions(variant);
+
+            initialGas[variant] = await requestDividendsGas(fields, 0);
+            const iteration = ((await requestDividendsGas(fields, emissions)) - initialGas[variant]) / emissions;
+            iterations[options] = Math.max(iterations[options] || 0, Math.ceil(iteration));
+        }
+
+        const measured = {};
+        for (const variant of variants) {
+            const iteration = iterations[variantOptions(variant)];
+            const gas = initialGas[variant] || await requestDividendsGas(variantFields(variant), 0);
+            measured[variant] = {base: gas - INITIAL_EMISSIONS * iteration, iteration: iteration};
+        }
+
+        if (process.env.GAS_MODEL_OUTPUT)
+            fs.writeFileSync(process.env.GAS_MODEL_OUTPUT,
+                             JSON.stringify({description: model.description, variants: measured}, null, 2) + '\n');
+
+        for (const variant of variants)
+            assert(measured[variant].base > 0 && measured[variant].iteration > 0,
+                   'measured costs of {0}: {1}'.format(variant, JSON.stringify(measured[variant])));
+
+        // a packed emission is one storage slot instead of two
+        assert(iterations['.packed'] < iterations[''], 'Packed layout makes emissions cheaper');
+        assert(iterations['.pull.packed'] < iterations['.pull'], 'Packed layout makes emissions cheaper');
+    });
+});